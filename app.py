@@ -1,27 +1,48 @@
-from flask import Flask, render_template
+from backend.core.startup import startup
+
+from flask import Flask, jsonify, render_template, request
 
 import os
 
-from backend.routes import system, edid, usb
-from backend.routes.pattern import pattern_bp
+from backend.core import assets, metrics
+from backend.core.owner import OwnerUnavailable
 from backend.core.system.version import get_version
 
-
+# Blueprint modules, imported (and timed) inside create_app
+BLUEPRINT_MODULES = (
+    ("backend.routes.system", "bp"),
+    ("backend.routes.edid", "bp"),
+    ("backend.routes.usb", "bp"),
+    ("backend.routes.pattern", "pattern_bp"),
+    ("backend.routes.events", "bp"),
+    ("backend.routes.metrics", "bp"),
+)
 
 
 def create_app():
-    app = Flask(
-        __name__,
-        template_folder="frontend/templates",
-        static_folder="frontend/static",
-    )
-
+    with startup.phase("flask_app"):
+        app = Flask(
+            __name__,
+            template_folder="frontend/templates",
+            static_folder="frontend/static",
+        )
+        assets.init_app(app)
+        metrics.init_app(app)
 
     # Register blueprints
-    app.register_blueprint(system.bp)
-    app.register_blueprint(edid.bp)
-    app.register_blueprint(usb.bp)
-    app.register_blueprint(pattern_bp)
+    with startup.phase("blueprints"):
+        for module, attr in BLUEPRINT_MODULES:
+            app.register_blueprint(getattr(startup.timed_import(module), attr))
+
+    @app.errorhandler(OwnerUnavailable)
+    def owner_unavailable(exc):
+        return jsonify({"ok": False, "error": str(exc)}), 503
+
+    @app.after_request
+    def record_first_request(response):
+        if not startup.served:
+            startup.first_request(request.path)
+        return response
 
     # --------------------
     # Routes
@@ -0,0 +1,200 @@
+"""
+Static asset pipeline.
+
+build_assets() copies every file under frontend/static to
+frontend/static/dist/ with a content hash in its name
+(css/kiosk.css -> css/kiosk.1a2b3c4d5e.css), writes .gz and .br
+variants of text assets, and records the mapping in dist/manifest.json.
+/static/ URLs inside CSS are rewritten to the fingerprinted names.
+
+init_app() makes url_for("static", ...) emit the fingerprinted names and
+serves them with immutable caching, precompressed variants and ETags.
+Without a manifest (pipeline not run) files are served as before, with
+ETag revalidation.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import request, send_from_directory
+
+DIST_DIRNAME = "dist"
+MANIFEST_FILENAME = "manifest.json"
+HASH_LENGTH = 10
+
+# Fingerprinted files never change, so browsers may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+COMPRESSIBLE = {".css", ".js", ".html", ".svg", ".json", ".txt", ".map"}
+# Served encodings in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_CSS_URL = re.compile(r"""url\(\s*(["']?)/static/([^"')?#]+)\1\s*\)""")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# ----------------------------
+# Build
+# ----------------------------
+
+def _fingerprinted(rel_path: str, digest: str) -> str:
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def _source_files(static_dir: str):
+    for root, dirs, files in os.walk(static_dir):
+        rel_root = os.path.relpath(root, static_dir)
+        if rel_root == DIST_DIRNAME or rel_root.startswith(DIST_DIRNAME + os.sep):
+            dirs[:] = []
+            continue
+        dirs.sort()
+        for name in sorted(files):
+            rel = os.path.normpath(os.path.join(rel_root, name))
+            yield rel.replace(os.sep, "/")
+
+
+def _rewrite_css(data: bytes, manifest: dict) -> bytes:
+    def sub(m):
+        target = manifest.get(m.group(2))
+        if target is None:
+            return m.group(0)
+        return f'url({m.group(1)}/static/{DIST_DIRNAME}/{target}{m.group(1)})'
+
+    return _CSS_URL.sub(sub, data.decode("utf-8")).encode("utf-8")
+
+
+def _write_variants(path: str, data: bytes):
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+
+    for suffix, compressed in variants.items():
+        # Only keep a variant that actually saves bytes
+        if len(compressed) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def build_assets(static_dir: str) -> dict:
+    """
+    Rebuild static_dir/dist and return the manifest
+    {source path: fingerprinted path}, both relative to static_dir.
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    tmp_dir = dist_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # CSS last, so url() references to images can be rewritten first
+    sources = sorted(
+        _source_files(static_dir),
+        key=lambda p: (p.endswith(".css"), p),
+    )
+
+    manifest = {}
+    for rel in sources:
+        with open(os.path.join(static_dir, rel), "rb") as f:
+            data = f.read()
+        if rel.endswith(".css"):
+            data = _rewrite_css(data, manifest)
+
+        target = _fingerprinted(rel, hashlib.sha256(data).hexdigest())
+        path = os.path.join(tmp_dir, target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+        if os.path.splitext(rel)[1].lower() in COMPRESSIBLE:
+            _write_variants(path, data)
+
+        manifest[rel] = target
+
+    with open(os.path.join(tmp_dir, MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    os.replace(tmp_dir, dist_dir)
+    return manifest
+
+
+# ----------------------------
+# Serve
+# ----------------------------
+
+def load_manifest(static_dir: str) -> dict:
+    try:
+        with open(os.path.join(static_dir, DIST_DIRNAME, MANIFEST_FILENAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _accepted_encodings():
+    accepted = request.accept_encodings
+    return [
+        (name, suffix) for name, suffix in ENCODINGS
+        if accepted[name] > 0
+    ]
+
+
+def init_app(app):
+    """
+    Serve fingerprinted, precompressed assets from app.static_folder.
+    """
+    static_dir = app.static_folder
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    manifest = load_manifest(static_dir)
+    fingerprinted = {f"{DIST_DIRNAME}/{target}" for target in manifest.values()}
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint != "static" or "filename" not in values:
+            return
+        target = manifest.get(values["filename"])
+        if target is not None:
+            values["filename"] = f"{DIST_DIRNAME}/{target}"
+
+    def static(filename):
+        if filename not in fingerprinted:
+            # Unversioned name: let the browser revalidate with its ETag
+            response = app.send_static_file(filename)
+            response.cache_control.no_cache = True
+            return response
+
+        rel = filename[len(DIST_DIRNAME) + 1:]
+        mimetype = encoding = None
+        for name, suffix in _accepted_encodings():
+            if os.path.isfile(os.path.join(dist_dir, rel + suffix)):
+                # Content-Type stays that of the uncompressed file
+                mimetype = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+                encoding = name
+                rel += suffix
+                break
+
+        # The hash in the name is the content hash, so it is also the ETag
+        digest = os.path.splitext(filename)[0].rsplit(".", 1)[-1]
+        response = send_from_directory(
+            dist_dir, rel,
+            mimetype=mimetype,
+            etag=f"{digest}-{encoding}" if encoding else digest,
+            max_age=IMMUTABLE_MAX_AGE,
+        )
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add("Accept-Encoding")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+    app.view_functions["static"] = static
+    return manifest
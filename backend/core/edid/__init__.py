@@ -1,43 +1,56 @@
-from .read import read_edid_drm
-from .write import write_edid_i2c
-from .save import save_edid
-from .checksum import validate_edid, validate_checksum
-from .decode import decode_basic, edid_to_hex
-from .i2c import read_edid_i2c, EDID_I2C_ADDR
-from .compare import (
-    find_matching_edid,
-    edid_hash,
-)
-from .diff import diff_edid
-from .exceptions import (
-    EDIDError,
-    EDIDReadError,
-    EDIDWriteError,
-)
-
-__all__ = [
+"""
+EDID package. Public names are resolved on first access so importing one
+submodule (e.g. backend.core.edid.read) does not also load smbus, numpy
+and the rest of the package.
+"""
+
+import importlib
+
+_EXPORTS = {
     # Read / Write
-    "read_edid_drm",
-    "write_edid_i2c",
-    "save_edid",
+    "read_edid_drm": "read",
+    "write_edid_i2c": "write",
+    "save_edid": "save",
 
     # Validation
-    "validate_edid",
-    "validate_checksum",
+    "validate_edid": "checksum",
+    "validate_checksum": "checksum",
 
     # Decode / display
-    "decode_basic",
-    "edid_to_hex",
+    "decode_basic": "decode",
+    "decode_edid": "decode",
+    "edid_to_hex": "decode",
+
+    # Low-level I2C
+    "read_edid_i2c": "i2c",
+    "EDID_I2C_ADDR": "i2c",
 
     # Compare / match
-    "find_matching_edid",
-    "edid_hash",
+    "find_matching_edid": "compare",
+    "edid_hash": "compare",
 
     # Diff
-    "diff_edid",
+    "diff_edid": "diff",
+    "diff_many": "diff",
+    "format_diff": "diff",
 
     # Errors
-    "EDIDError",
-    "EDIDReadError",
-    "EDIDWriteError",
-]
+    "EDIDError": "exceptions",
+    "EDIDReadError": "exceptions",
+    "EDIDWriteError": "exceptions",
+}
+
+__all__ = [name for name in _EXPORTS if name not in ("read_edid_i2c", "EDID_I2C_ADDR")]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,246 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from .hotplug import connector_monitor
+from .exceptions import EDIDWriteError
+from .write import write_edid_i2c
+from .write_i2c import write_edid_for_connector
+
+# Finished jobs kept for status queries
+MAX_JOBS = 20
+
+_job_ids = itertools.count(1)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+class BatchJob:
+    """
+    One batch programming run: targets grouped by physical i2c adapter,
+    one worker thread per adapter, targets on the same adapter written
+    one after another.
+    """
+
+    def __init__(self, targets, verify=True, delta=False, force=False,
+                 model=None):
+        self.id = next(_job_ids)
+        self.verify = verify
+        self.force = force
+        self.delta = delta
+        self.model = model
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._threads = []
+
+        self.targets = []
+        for i, t in enumerate(targets):
+            self.targets.append({
+                "index": i,
+                "connector": t.get("connector"),
+                "bus": t.get("bus"),
+                "filename": t.get("filename"),
+                "edid": t["edid"],
+                "state": "queued",
+                "progress": 0.0,
+                "bytes_written": None,
+                "bytes_skipped": None,
+                "verified": False,
+                "duration_ms": None,
+                "bytes_per_sec": None,
+                "error": None,
+            })
+
+    # ----------------------------
+    # Execution
+    # ----------------------------
+
+    def _groups(self):
+        """
+        Group targets by adapter. Connectors without a resolvable ddc link
+        share one group, since their bus is only known after probing.
+        """
+        groups = OrderedDict()
+        for target in self.targets:
+            bus = target["bus"]
+            if bus is None and target["connector"]:
+                bus = connector_monitor.ddc_bus(target["connector"])
+                target["bus"] = bus
+            groups.setdefault(bus, []).append(target)
+        return groups
+
+    def start(self):
+        self.started = time.time()
+        for bus, targets in self._groups().items():
+            name = f"edid-batch-{self.id}-i2c-{bus if bus is not None else 'probe'}"
+            thread = threading.Thread(
+                target=self._run_group, args=(targets,), name=name, daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+        threading.Thread(
+            target=self._wait, name=f"edid-batch-{self.id}", daemon=True
+        ).start()
+
+    def _wait(self):
+        for thread in self._threads:
+            thread.join()
+        self.finished = time.time()
+
+    def _run_group(self, targets):
+        for target in targets:
+            self._run_target(target)
+
+    def _run_target(self, target):
+        def progress(done, total):
+            with self._lock:
+                target["progress"] = round(done / total, 3) if total else 1.0
+
+        with self._lock:
+            target["state"] = "running"
+
+        t0 = time.perf_counter()
+        try:
+            if target["connector"]:
+                result = write_edid_for_connector(
+                    connector=target["connector"],
+                    edid=target["edid"],
+                    verify=self.verify,
+                    force=self.force,
+                    model=self.model,
+                    delta=self.delta,
+                    progress=progress,
+                )
+                verified = result["verified_i2c"]
+            else:
+                result = write_edid_i2c(
+                    edid=target["edid"],
+                    bus=target["bus"],
+                    verify=self.verify,
+                    force=self.force,
+                    model=self.model,
+                    delta=self.delta,
+                    progress=progress,
+                )
+                verified = result["verified"]
+        except Exception as e:
+            # Anything else (a bus lock or sysfs OSError) must not kill the
+            # bus thread: the rest of its targets still have to run
+            with self._lock:
+                target["state"] = "error"
+                target["error"] = str(e)
+                target["duration_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            return
+
+        duration = time.perf_counter() - t0
+        with self._lock:
+            target.update({
+                "state": "done",
+                "progress": 1.0,
+                "bus": result["bus"],
+                "bytes_written": result["bytes_written"],
+                "bytes_skipped": result["bytes_skipped"],
+                "verified": verified,
+                "duration_ms": round(duration * 1000, 1),
+                "bytes_per_sec": result["timing"]["bytes_per_sec"],
+            })
+
+    # ----------------------------
+    # Status
+    # ----------------------------
+
+    def status(self):
+        with self._lock:
+            targets = [
+                {k: v for k, v in t.items() if k != "edid"}
+                for t in self.targets
+            ]
+
+        done = [t for t in targets if t["state"] in ("done", "error")]
+        written = sum(t["bytes_written"] or 0 for t in targets)
+        end = self.finished or time.time()
+        elapsed = end - self.started if self.started else 0
+
+        if self.finished:
+            state = "error" if any(t["state"] == "error" for t in targets) else "done"
+        else:
+            state = "running" if self.started else "queued"
+
+        return {
+            "job_id": self.id,
+            "state": state,
+            "created": self.created,
+            "elapsed_s": round(elapsed, 3),
+            "completed": len(done),
+            "total": len(targets),
+            "failed": sum(1 for t in targets if t["state"] == "error"),
+            "buses": sorted(
+                {t["bus"] for t in targets if t["bus"] is not None}
+            ),
+            "bytes_written": written,
+            "bytes_per_sec": round(written / elapsed, 1) if elapsed else None,
+            "targets": targets,
+        }
+
+
+def start_batch(targets, verify=True, delta=False, force=False,
+                model=None) -> BatchJob:
+    """
+    Start programming several emulators concurrently.
+
+    targets: [{"connector": "HDMI-A-1" | "bus": 3, "edid": bytes,
+               "filename": optional label}, ...]
+    """
+    if not targets:
+        raise EDIDWriteError("No batch targets supplied")
+
+    for t in targets:
+        if not t.get("connector") and t.get("bus") is None:
+            raise EDIDWriteError("Each target needs a connector or a bus")
+
+    job = BatchJob(targets, verify=verify, delta=delta, force=force,
+                   model=model)
+
+    with _jobs_lock:
+        _jobs[job.id] = job
+        finished = [j for j in _jobs.values() if j.finished]
+        for old in finished[:max(0, len(_jobs) - MAX_JOBS)]:
+            del _jobs[old.id]
+
+    job.start()
+    return job
+
+
+def get_batch(job_id: int):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def list_batches():
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    return [job.status() for job in jobs]
+
+
+class BatchService:
+    """
+    Batch jobs as plain status dicts, so they can be served from the
+    hardware owner process (backend/core/owner.py).
+    """
+
+    def start(self, targets, verify=True, delta=False, force=False,
+              model=None):
+        job = start_batch(targets, verify=verify, delta=delta, force=force,
+                          model=model)
+        return job.status()
+
+    def status(self, job_id: int):
+        job = get_batch(job_id)
+        return job.status() if job else None
+
+    def list(self):
+        return list_batches()
@@ -0,0 +1,95 @@
+"""
+Single-file EDID bundle for USB transfer.
+
+A bundle is an uncompressed zip holding index.json plus one member per
+distinct EDID (named by content hash), written in one sequential stream.
+On FAT sticks this replaces thousands of small file creations with one.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+
+from .exceptions import EDIDError
+
+BUNDLE_FILENAME = "edid_bundle.zip"
+BUNDLE_INDEX = "index.json"
+BUNDLE_VERSION = 1
+
+
+def _member(digest: str) -> str:
+    return f"edid/{digest}.bin"
+
+
+def read_bundle_index(path) -> dict:
+    """
+    Return {name: {"hash", "size"}} from a bundle without extracting it.
+    """
+    try:
+        with zipfile.ZipFile(path) as zf:
+            raw = json.loads(zf.read(BUNDLE_INDEX))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        raise EDIDError(f"Unreadable EDID bundle {path}: {e}")
+
+    if raw.get("version") != BUNDLE_VERSION:
+        raise EDIDError(f"Unsupported EDID bundle version: {raw.get('version')}")
+    return raw.get("files", {})
+
+
+def write_bundle(path, entries: dict, read) -> int:
+    """
+    Write every EDID in entries ({name: {"hash", "size", ...}}, as from a
+    library's entries()) into a bundle at path, fetching content with
+    read(name). Content shared by several names is stored once. Returns
+    bytes written.
+    """
+    path = Path(path)
+    files = {
+        name: {"hash": e["hash"], "size": e["size"]}
+        for name, e in sorted(entries.items())
+    }
+
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED) as zf:
+            zf.writestr(BUNDLE_INDEX, json.dumps({
+                "version": BUNDLE_VERSION,
+                "files": files,
+            }, sort_keys=True))
+
+            stored = set()
+            for name, entry in files.items():
+                if entry["hash"] in stored:
+                    continue
+                zf.writestr(_member(entry["hash"]), read(name))
+                stored.add(entry["hash"])
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    return path.stat().st_size
+
+
+def read_entries(path, names: dict) -> dict:
+    """
+    Read {name: hash} from the bundle at path, checking each member
+    against its hash. Returns {name: bytes}.
+    """
+    entries = {}
+
+    with zipfile.ZipFile(path) as zf:
+        for name, digest in names.items():
+            if os.path.basename(name) != name or not name.endswith(".bin"):
+                raise EDIDError(f"Invalid bundle entry name: {name}")
+            try:
+                data = zf.read(_member(digest))
+            except KeyError:
+                raise EDIDError(f"Missing bundle entry: {name}")
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise EDIDError(f"Corrupt bundle entry: {name}")
+            entries[name] = data
+
+    return entries
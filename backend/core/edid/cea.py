@@ -0,0 +1,351 @@
+"""
+CEA-861 extension block decoding.
+"""
+
+CEA_EXTENSION_TAG = 0x02
+
+# VIC -> (width, height, refresh Hz, interlaced, aspect)
+VIC_MODES = {
+    1: (640, 480, 60, False, "4:3"),
+    2: (720, 480, 60, False, "4:3"),
+    3: (720, 480, 60, False, "16:9"),
+    4: (1280, 720, 60, False, "16:9"),
+    5: (1920, 1080, 60, True, "16:9"),
+    6: (1440, 480, 60, True, "4:3"),
+    7: (1440, 480, 60, True, "16:9"),
+    8: (1440, 240, 60, False, "4:3"),
+    9: (1440, 240, 60, False, "16:9"),
+    10: (2880, 480, 60, True, "4:3"),
+    11: (2880, 480, 60, True, "16:9"),
+    12: (2880, 240, 60, False, "4:3"),
+    13: (2880, 240, 60, False, "16:9"),
+    14: (1440, 480, 60, False, "4:3"),
+    15: (1440, 480, 60, False, "16:9"),
+    16: (1920, 1080, 60, False, "16:9"),
+    17: (720, 576, 50, False, "4:3"),
+    18: (720, 576, 50, False, "16:9"),
+    19: (1280, 720, 50, False, "16:9"),
+    20: (1920, 1080, 50, True, "16:9"),
+    21: (1440, 576, 50, True, "4:3"),
+    22: (1440, 576, 50, True, "16:9"),
+    23: (1440, 288, 50, False, "4:3"),
+    24: (1440, 288, 50, False, "16:9"),
+    25: (2880, 576, 50, True, "4:3"),
+    26: (2880, 576, 50, True, "16:9"),
+    27: (2880, 288, 50, False, "4:3"),
+    28: (2880, 288, 50, False, "16:9"),
+    29: (1440, 576, 50, False, "4:3"),
+    30: (1440, 576, 50, False, "16:9"),
+    31: (1920, 1080, 50, False, "16:9"),
+    32: (1920, 1080, 24, False, "16:9"),
+    33: (1920, 1080, 25, False, "16:9"),
+    34: (1920, 1080, 30, False, "16:9"),
+    35: (2880, 480, 60, False, "4:3"),
+    36: (2880, 480, 60, False, "16:9"),
+    37: (2880, 576, 50, False, "4:3"),
+    38: (2880, 576, 50, False, "16:9"),
+    39: (1920, 1080, 50, True, "16:9"),
+    40: (1920, 1080, 100, True, "16:9"),
+    41: (1280, 720, 100, False, "16:9"),
+    42: (720, 576, 100, False, "4:3"),
+    43: (720, 576, 100, False, "16:9"),
+    44: (1440, 576, 100, True, "4:3"),
+    45: (1440, 576, 100, True, "16:9"),
+    46: (1920, 1080, 120, True, "16:9"),
+    47: (1280, 720, 120, False, "16:9"),
+    48: (720, 480, 120, False, "4:3"),
+    49: (720, 480, 120, False, "16:9"),
+    50: (1440, 480, 120, True, "4:3"),
+    51: (1440, 480, 120, True, "16:9"),
+    52: (720, 576, 200, False, "4:3"),
+    53: (720, 576, 200, False, "16:9"),
+    54: (1440, 576, 200, True, "4:3"),
+    55: (1440, 576, 200, True, "16:9"),
+    56: (720, 480, 240, False, "4:3"),
+    57: (720, 480, 240, False, "16:9"),
+    58: (1440, 480, 240, True, "4:3"),
+    59: (1440, 480, 240, True, "16:9"),
+    60: (1280, 720, 24, False, "16:9"),
+    61: (1280, 720, 25, False, "16:9"),
+    62: (1280, 720, 30, False, "16:9"),
+    63: (1920, 1080, 120, False, "16:9"),
+    64: (1920, 1080, 100, False, "16:9"),
+    93: (3840, 2160, 24, False, "16:9"),
+    94: (3840, 2160, 25, False, "16:9"),
+    95: (3840, 2160, 30, False, "16:9"),
+    96: (3840, 2160, 50, False, "16:9"),
+    97: (3840, 2160, 60, False, "16:9"),
+    98: (4096, 2160, 24, False, "256:135"),
+    99: (4096, 2160, 25, False, "256:135"),
+    100: (4096, 2160, 30, False, "256:135"),
+    101: (4096, 2160, 50, False, "256:135"),
+    102: (4096, 2160, 60, False, "256:135"),
+    103: (3840, 2160, 24, False, "64:27"),
+    104: (3840, 2160, 25, False, "64:27"),
+    105: (3840, 2160, 30, False, "64:27"),
+    106: (3840, 2160, 50, False, "64:27"),
+    107: (3840, 2160, 60, False, "64:27"),
+}
+
+DATA_BLOCK_NAMES = {
+    1: "Audio",
+    2: "Video",
+    3: "Vendor-Specific",
+    4: "Speaker Allocation",
+    5: "VESA Display Transfer Characteristic",
+    7: "Extended",
+}
+
+EXTENDED_TAG_NAMES = {
+    0: "Video Capability",
+    1: "Vendor-Specific Video",
+    2: "VESA Display Device",
+    5: "Colorimetry",
+    6: "HDR Static Metadata",
+    7: "HDR Dynamic Metadata",
+    13: "Video Format Preference",
+    14: "YCbCr 4:2:0 Video",
+    15: "YCbCr 4:2:0 Capability Map",
+    17: "Vendor-Specific Audio",
+    18: "Room Configuration",
+    19: "Speaker Location",
+    32: "InfoFrame",
+    120: "HDMI Forum EDID Extension Override",
+    121: "HDMI Forum Sink Capability",
+}
+
+AUDIO_FORMATS = {
+    1: "LPCM",
+    2: "AC-3",
+    3: "MPEG-1",
+    4: "MP3",
+    5: "MPEG-2",
+    6: "AAC LC",
+    7: "DTS",
+    8: "ATRAC",
+    9: "One Bit Audio",
+    10: "Enhanced AC-3",
+    11: "DTS-HD",
+    12: "MAT (MLP)",
+    13: "DST",
+    14: "WMA Pro",
+}
+
+AUDIO_RATES_KHZ = (32, 44.1, 48, 88.2, 96, 176.4, 192)
+
+SPEAKERS = (
+    "FL/FR", "LFE", "FC", "RL/RR", "RC", "FLC/FRC", "RLC/RRC",
+)
+
+OUI_HDMI = 0x000C03
+OUI_HDMI_FORUM = 0xC45DD8
+
+
+def vic_mode(vic: int):
+    mode = VIC_MODES.get(vic)
+    if not mode:
+        return {"vic": vic}
+    width, height, refresh, interlaced, aspect = mode
+    return {
+        "vic": vic,
+        "width": width,
+        "height": height,
+        "refresh_hz": refresh,
+        "interlaced": interlaced,
+        "aspect": aspect,
+    }
+
+
+def _decode_audio(payload: bytes):
+    descriptors = []
+    for i in range(0, len(payload) - 2, 3):
+        b0, b1, b2 = payload[i:i + 3]
+        fmt = (b0 >> 3) & 0x0F
+        sad = {
+            "format": AUDIO_FORMATS.get(fmt, f"Reserved ({fmt})"),
+            "channels": (b0 & 0x07) + 1,
+            "rates_khz": [
+                rate for bit, rate in enumerate(AUDIO_RATES_KHZ)
+                if b1 & (1 << bit)
+            ],
+        }
+        if fmt == 1:
+            sad["bit_depths"] = [
+                depth for bit, depth in enumerate((16, 20, 24))
+                if b2 & (1 << bit)
+            ]
+        elif 2 <= fmt <= 8:
+            sad["max_bitrate_kbps"] = b2 * 8
+        descriptors.append(sad)
+    return {"descriptors": descriptors}
+
+
+def _decode_video(payload: bytes):
+    modes = []
+    for b in payload:
+        if 1 <= b <= 64 or 129 <= b <= 192:
+            vic = b & 0x7F
+            native = b >= 129
+        else:
+            vic = b
+            native = False
+        mode = vic_mode(vic)
+        mode["native"] = native
+        modes.append(mode)
+    return {"modes": modes}
+
+
+def _decode_vendor(payload: bytes):
+    if len(payload) < 3:
+        return {"oui": None}
+
+    oui = payload[0] | (payload[1] << 8) | (payload[2] << 16)
+    result = {"oui": f"{oui:06X}"}
+
+    if oui == OUI_HDMI:
+        result["name"] = "HDMI"
+        if len(payload) >= 5:
+            a, b = payload[3], payload[4]
+            result["physical_address"] = (
+                f"{a >> 4}.{a & 0x0F}.{b >> 4}.{b & 0x0F}"
+            )
+        if len(payload) >= 6:
+            flags = payload[5]
+            result["supports_ai"] = bool(flags & 0x80)
+            result["deep_color"] = [
+                depth for bit, depth in ((6, 48), (5, 36), (4, 30))
+                if flags & (1 << bit)
+            ]
+            result["dvi_dual"] = bool(flags & 0x01)
+        if len(payload) >= 7 and payload[6]:
+            result["max_tmds_mhz"] = payload[6] * 5
+    elif oui == OUI_HDMI_FORUM:
+        result["name"] = "HDMI Forum"
+        if len(payload) >= 4:
+            result["version"] = payload[3]
+        if len(payload) >= 5 and payload[4]:
+            result["max_tmds_mhz"] = payload[4] * 5
+        if len(payload) >= 6:
+            result["scdc_present"] = bool(payload[5] & 0x80)
+
+    return result
+
+
+def _decode_speakers(payload: bytes):
+    if not payload:
+        return {"speakers": []}
+    return {
+        "speakers": [
+            name for bit, name in enumerate(SPEAKERS)
+            if payload[0] & (1 << bit)
+        ]
+    }
+
+
+def _decode_extended(payload: bytes):
+    if not payload:
+        return {"extended_tag": None}
+
+    ext_tag = payload[0]
+    body = payload[1:]
+    result = {
+        "extended_tag": ext_tag,
+        "name": EXTENDED_TAG_NAMES.get(ext_tag, f"Extended tag {ext_tag}"),
+    }
+
+    if ext_tag == 0 and body:
+        result["quantization_rgb_selectable"] = bool(body[0] & 0x40)
+        result["quantization_ycc_selectable"] = bool(body[0] & 0x80)
+    elif ext_tag == 5 and body:
+        names = ("xvYCC601", "xvYCC709", "sYCC601", "opYCC601",
+                 "opRGB", "BT2020cYCC", "BT2020YCC", "BT2020RGB")
+        result["colorimetry"] = [
+            name for bit, name in enumerate(names)
+            if body[0] & (1 << bit)
+        ]
+    elif ext_tag == 6 and body:
+        eotfs = ("SDR", "HDR", "SMPTE ST2084", "HLG")
+        result["eotf"] = [
+            name for bit, name in enumerate(eotfs)
+            if body[0] & (1 << bit)
+        ]
+    elif ext_tag == 14:
+        result["modes"] = [vic_mode(vic) for vic in body]
+
+    return result
+
+
+_BLOCK_DECODERS = {
+    1: _decode_audio,
+    2: _decode_video,
+    3: _decode_vendor,
+    4: _decode_speakers,
+    7: _decode_extended,
+}
+
+
+def iter_data_blocks(block: bytes):
+    """
+    Yield (offset, tag, length) for each data block in a CEA extension.
+
+    offset is relative to the start of the 128-byte block and points at the
+    data block header byte.
+    """
+    dtd_offset = block[2]
+    end = dtd_offset if 4 <= dtd_offset <= 127 else 4
+    pos = 4
+    while pos < end:
+        header = block[pos]
+        tag = header >> 5
+        length = header & 0x1F
+        if pos + 1 + length > end:
+            break
+        yield pos, tag, length
+        pos += 1 + length
+
+
+def decode_cea_block(block: bytes, decode_dtd):
+    """
+    Decode one 128-byte CEA-861 extension block.
+
+    decode_dtd is the detailed timing decoder from decode.py, shared with
+    the base block.
+    """
+    revision = block[1]
+    dtd_offset = block[2]
+    flags = block[3]
+
+    data_blocks = []
+    for pos, tag, length in iter_data_blocks(block):
+        payload = block[pos + 1:pos + 1 + length]
+        entry = {
+            "offset": pos,
+            "tag": tag,
+            "type": DATA_BLOCK_NAMES.get(tag, f"Reserved ({tag})"),
+            "length": length,
+        }
+        decoder = _BLOCK_DECODERS.get(tag)
+        if decoder:
+            entry.update(decoder(payload))
+        data_blocks.append(entry)
+
+    timings = []
+    if 4 <= dtd_offset <= 127:
+        for pos in range(dtd_offset, 127 - 17, 18):
+            timing = decode_dtd(block[pos:pos + 18])
+            if timing is None:
+                break
+            timing["offset"] = pos
+            timings.append(timing)
+
+    return {
+        "type": "CEA-861",
+        "revision": revision,
+        "underscan": bool(flags & 0x80),
+        "basic_audio": bool(flags & 0x40),
+        "ycbcr444": bool(flags & 0x20),
+        "ycbcr422": bool(flags & 0x10),
+        "native_dtds": flags & 0x0F,
+        "data_blocks": data_blocks,
+        "detailed_timings": timings,
+    }
@@ -1,6 +1,6 @@
 import hashlib
-from pathlib import Path
 from .exceptions import EDIDError
+from .library import open_library
 
 
 def edid_hash(edid: bytes) -> str:
@@ -10,29 +10,21 @@ def edid_hash(edid: bytes) -> str:
 def find_matching_edid(edid: bytes, directory: str):
     """
     Return a list of exact EDID matches in directory.
+
+    Answered from the library's content index, so no EDIDs are read here.
     """
     if not edid or len(edid) < 128:
         raise EDIDError("Invalid EDID supplied for comparison")
 
-    base = Path(directory)
-    if not base.exists():
-        return []
-
-    matches = []
+    library = open_library(directory)
     target_hash = edid_hash(edid)
 
-    for file in sorted(base.glob("*.bin")):
-        try:
-            data = file.read_bytes()
-        except OSError:
-            continue
-
-        if data == edid:
-            matches.append({
-                "filename": file.name,
-                "path": str(file),
-                "exact": True,
-                "hash": target_hash,
-            })
-
-    return matches
+    return [
+        {
+            "filename": name,
+            "path": library.path_of(name),
+            "exact": True,
+            "hash": target_hash,
+        }
+        for name in library.lookup(target_hash)
+    ]
@@ -1,10 +1,39 @@
-import subprocess
-import tempfile
-from pathlib import Path
+import threading
+from collections import OrderedDict
 
+from .cea import CEA_EXTENSION_TAG, decode_cea_block
+from .checksum import validate_checksum
+from .compare import edid_hash
+from .displayid import DISPLAYID_EXTENSION_TAG, decode_displayid_block
 
+EDID_HEADER = b"\x00\xff\xff\xff\xff\xff\xff\x00"
 
+# Decoded EDIDs keyed by SHA-256; the same monitors are read over and over
+_DECODE_CACHE_SIZE = 256
+_decode_cache = OrderedDict()
+_decode_cache_lock = threading.Lock()
 
+ESTABLISHED_TIMINGS = (
+    # byte 35
+    (720, 400, 70), (720, 400, 88), (640, 480, 60), (640, 480, 67),
+    (640, 480, 72), (640, 480, 75), (800, 600, 56), (800, 600, 60),
+    # byte 36
+    (800, 600, 72), (800, 600, 75), (832, 624, 75), (1024, 768, 87),
+    (1024, 768, 60), (1024, 768, 70), (1024, 768, 75), (1280, 1024, 75),
+    # byte 37 (bit 7 only)
+    (1152, 870, 75),
+)
+
+EXTENSION_NAMES = {
+    0x02: "CEA-861",
+    0x10: "Video Timing Block",
+    0x40: "Display Information",
+    0x50: "Localized String",
+    0x60: "Digital Packet Video Link",
+    0x70: "DisplayID",
+    0xF0: "Block Map",
+    0xFF: "Manufacturer",
+}
 
 
 def decode_basic(edid: bytes) -> dict:
@@ -35,25 +64,416 @@ def edid_to_hex(edid: bytes, width: int = 16) -> str:
         lines.append(line)
     return "\n".join(lines)
 
-def decode_full_text(edid: bytes) -> str:
+
+# --------------------------------------------------
+# Base block
+# --------------------------------------------------
+
+def decode_dtd(desc: bytes):
     """
-    Decode EDID using system edid-decode tool.
-    Returns full human-readable text.
+    Decode an 18-byte detailed timing descriptor.
+    Returns None for display descriptors (pixel clock 0).
     """
-    with tempfile.NamedTemporaryFile(delete=False) as f:
-        f.write(edid)
-        temp_path = f.name
+    pixel_clock = desc[0] | (desc[1] << 8)
+    if pixel_clock == 0:
+        return None
+
+    hactive = desc[2] | ((desc[4] & 0xF0) << 4)
+    hblank = desc[3] | ((desc[4] & 0x0F) << 8)
+    vactive = desc[5] | ((desc[7] & 0xF0) << 4)
+    vblank = desc[6] | ((desc[7] & 0x0F) << 8)
+    hsync_offset = desc[8] | ((desc[11] & 0xC0) << 2)
+    hsync_width = desc[9] | ((desc[11] & 0x30) << 4)
+    vsync_offset = (desc[10] >> 4) | ((desc[11] & 0x0C) << 2)
+    vsync_width = (desc[10] & 0x0F) | ((desc[11] & 0x03) << 4)
+    flags = desc[17]
+
+    htotal = hactive + hblank
+    vtotal = vactive + vblank
+    refresh = (pixel_clock * 10000) / (htotal * vtotal) if htotal and vtotal else 0
+
+    timing = {
+        "pixel_clock_khz": pixel_clock * 10,
+        "width": hactive,
+        "height": vactive,
+        "refresh_hz": round(refresh, 3),
+        "interlaced": bool(flags & 0x80),
+        "hblank": hblank,
+        "hsync_offset": hsync_offset,
+        "hsync_width": hsync_width,
+        "vblank": vblank,
+        "vsync_offset": vsync_offset,
+        "vsync_width": vsync_width,
+        "image_size_mm": [
+            desc[12] | ((desc[14] & 0xF0) << 4),
+            desc[13] | ((desc[14] & 0x0F) << 8),
+        ],
+        "hborder": desc[15],
+        "vborder": desc[16],
+    }
+
+    if (flags & 0x18) == 0x18:
+        timing["hsync_positive"] = bool(flags & 0x02)
+        timing["vsync_positive"] = bool(flags & 0x04)
+
+    return timing
+
+
+def _decode_standard_timing(b1: int, b2: int, version: tuple):
+    if (b1, b2) in ((0x01, 0x01), (0x00, 0x00), (0x20, 0x20)):
+        return None
+
+    width = (b1 + 31) * 8
+    aspect = b2 >> 6
+    if aspect == 0:
+        ratio = (16, 10) if version >= (1, 3) else (1, 1)
+    else:
+        ratio = ((4, 3), (5, 4), (16, 9))[aspect - 1]
+
+    return {
+        "width": width,
+        "height": width * ratio[1] // ratio[0],
+        "refresh_hz": (b2 & 0x3F) + 60,
+        "aspect": f"{ratio[0]}:{ratio[1]}",
+    }
+
+
+def _decode_descriptor_text(desc: bytes) -> str:
+    return (
+        desc[5:18]
+        .split(b"\x0a", 1)[0]
+        .decode("cp437", errors="replace")
+        .rstrip()
+    )
+
+
+def _decode_range_limits(desc: bytes):
+    offsets = desc[4]
+    return {
+        "min_vfreq_hz": desc[5] + (255 if offsets & 0x01 else 0),
+        "max_vfreq_hz": desc[6] + (255 if offsets & 0x02 else 0),
+        "min_hfreq_khz": desc[7] + (255 if offsets & 0x04 else 0),
+        "max_hfreq_khz": desc[8] + (255 if offsets & 0x08 else 0),
+        "max_pixel_clock_mhz": desc[9] * 10,
+    }
+
 
-    try:
-        result = subprocess.run(
-            ["edid-decode", temp_path],
-            capture_output=True,
-            text=True
+def _decode_descriptor(desc: bytes, version: tuple):
+    timing = decode_dtd(desc)
+    if timing is not None:
+        return {"type": "detailed_timing", "timing": timing}
+
+    tag = desc[3]
+    if tag == 0xFF:
+        return {"type": "serial_number", "value": _decode_descriptor_text(desc)}
+    if tag == 0xFE:
+        return {"type": "text", "value": _decode_descriptor_text(desc)}
+    if tag == 0xFC:
+        return {"type": "product_name", "value": _decode_descriptor_text(desc)}
+    if tag == 0xFD:
+        return {"type": "range_limits", **_decode_range_limits(desc)}
+    if tag == 0xFA:
+        timings = [
+            _decode_standard_timing(desc[i], desc[i + 1], version)
+            for i in range(5, 17, 2)
+        ]
+        return {
+            "type": "standard_timings",
+            "timings": [t for t in timings if t],
+        }
+    if tag == 0x10:
+        return {"type": "dummy"}
+    return {"type": f"descriptor_0x{tag:02X}"}
+
+
+def _decode_chromaticity(edid: bytes):
+    lo_rg, lo_bw = edid[25], edid[26]
+
+    def coord(hi, lo):
+        return round(((hi << 2) | lo) / 1024, 4)
+
+    return {
+        "red": [coord(edid[27], lo_rg >> 6), coord(edid[28], (lo_rg >> 4) & 3)],
+        "green": [coord(edid[29], (lo_rg >> 2) & 3), coord(edid[30], lo_rg & 3)],
+        "blue": [coord(edid[31], lo_bw >> 6), coord(edid[32], (lo_bw >> 4) & 3)],
+        "white": [coord(edid[33], (lo_bw >> 2) & 3), coord(edid[34], lo_bw & 3)],
+    }
+
+
+def _decode_display(edid: bytes, version: tuple):
+    video_input = edid[20]
+    digital = bool(video_input & 0x80)
+    display = {
+        "digital": digital,
+        "width_cm": edid[21],
+        "height_cm": edid[22],
+        "gamma": round((edid[23] + 100) / 100, 2) if edid[23] != 0xFF else None,
+        "dpms_standby": bool(edid[24] & 0x80),
+        "dpms_suspend": bool(edid[24] & 0x40),
+        "dpms_active_off": bool(edid[24] & 0x20),
+        "srgb_default": bool(edid[24] & 0x04),
+        "preferred_timing_native": bool(edid[24] & 0x02),
+        "continuous_frequency": bool(edid[24] & 0x01),
+    }
+
+    if digital and version >= (1, 4):
+        depth = (video_input >> 4) & 0x07
+        display["bits_per_color"] = (
+            (None, 6, 8, 10, 12, 14, 16, None)[depth]
         )
+        display["interface"] = {
+            1: "DVI", 2: "HDMI-a", 3: "HDMI-b", 4: "MDDI", 5: "DisplayPort",
+        }.get(video_input & 0x0F)
+
+    return display
+
+
+def _decode_base_block(edid: bytes):
+    version = (edid[18], edid[19])
+    basic = decode_basic(edid)
+
+    if edid[16] == 0xFF:
+        basic["model_year"] = basic.pop("year")
+        basic["week"] = None
+
+    established = [
+        {"width": w, "height": h, "refresh_hz": hz}
+        for bit, (w, h, hz) in enumerate(ESTABLISHED_TIMINGS)
+        if (edid[35 + bit // 8] >> (7 - bit % 8)) & 1
+    ]
+
+    standard = [
+        t for t in (
+            _decode_standard_timing(edid[i], edid[i + 1], version)
+            for i in range(38, 54, 2)
+        )
+        if t
+    ]
+
+    descriptors = []
+    timings = []
+    for n, offset in enumerate(range(54, 126, 18)):
+        desc = _decode_descriptor(edid[offset:offset + 18], version)
+        desc["offset"] = offset
+        descriptors.append(desc)
+        if desc["type"] == "detailed_timing":
+            timing = dict(desc["timing"], offset=offset)
+            timing["preferred"] = n == 0
+            timings.append(timing)
+
+    names = [d["value"] for d in descriptors if d["type"] == "product_name"]
+    serials = [d["value"] for d in descriptors if d["type"] == "serial_number"]
+
+    return {
+        **basic,
+        "header_valid": edid[:8] == EDID_HEADER,
+        "version": f"{version[0]}.{version[1]}",
+        "product_name": names[0] if names else None,
+        "serial_string": serials[0] if serials else None,
+        "display": _decode_display(edid, version),
+        "chromaticity": _decode_chromaticity(edid),
+        "established_timings": established,
+        "standard_timings": standard,
+        "descriptors": descriptors,
+        "detailed_timings": timings,
+        "checksum_valid": validate_checksum(edid[:128]),
+    }
 
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr.strip())
 
-        return result.stdout
-    finally:
-        Path(temp_path).unlink(missing_ok=True)
\ No newline at end of file
+def _decode_extension(block: bytes):
+    tag = block[0]
+    if tag == CEA_EXTENSION_TAG:
+        ext = decode_cea_block(block, decode_dtd)
+    elif tag == DISPLAYID_EXTENSION_TAG:
+        ext = decode_displayid_block(block)
+    else:
+        ext = {"type": EXTENSION_NAMES.get(tag, f"Unknown (0x{tag:02X})")}
+
+    ext["tag"] = tag
+    ext["checksum_valid"] = validate_checksum(block)
+    return ext
+
+
+def _decode(edid: bytes) -> dict:
+    base = _decode_base_block(edid)
+
+    extensions = []
+    for i in range(1, len(edid) // 128):
+        block = edid[i * 128:(i + 1) * 128]
+        ext = _decode_extension(block)
+        ext["block"] = i
+        extensions.append(ext)
+
+    modes = list(base["detailed_timings"])
+    for ext in extensions:
+        modes.extend(ext.get("detailed_timings", ()))
+
+    preferred = next((m for m in modes if m.get("preferred")), None)
+    if preferred is None and modes:
+        preferred = modes[0]
+
+    return {
+        "hash": edid_hash(edid),
+        "length": len(edid),
+        "base": base,
+        "extensions": extensions,
+        "preferred_mode": preferred,
+    }
+
+
+def decode_edid(edid: bytes) -> dict:
+    """
+    Fully decode an EDID in-process: base block, detailed/standard timings,
+    CEA-861 data blocks and DisplayID.
+
+    Results are memoized by EDID hash; treat the returned dict as read-only.
+    """
+    if not edid or len(edid) < 128:
+        raise ValueError("EDID too short")
+
+    key = edid_hash(edid)
+    with _decode_cache_lock:
+        decoded = _decode_cache.get(key)
+        if decoded is not None:
+            _decode_cache.move_to_end(key)
+            return decoded
+
+    decoded = _decode(edid)
+
+    with _decode_cache_lock:
+        _decode_cache[key] = decoded
+        while len(_decode_cache) > _DECODE_CACHE_SIZE:
+            _decode_cache.popitem(last=False)
+
+    return decoded
+
+
+# --------------------------------------------------
+# Text rendering
+# --------------------------------------------------
+
+def _format_timing(t: dict) -> str:
+    scan = "i" if t.get("interlaced") else "p"
+    line = f"{t['width']}x{t['height']}{scan} @ {t['refresh_hz']:g} Hz"
+    if "pixel_clock_khz" in t:
+        line += f"  ({t['pixel_clock_khz'] / 1000:g} MHz)"
+    if t.get("preferred"):
+        line += "  [preferred]"
+    return line
+
+
+def format_decoded(decoded: dict) -> str:
+    """
+    Render a decode_edid() result as human-readable text.
+    """
+    base = decoded["base"]
+    display = base["display"]
+    lines = [
+        "Block 0: Base EDID",
+        "----------------------------",
+        f"EDID Version      : {base['version']}",
+        f"Manufacturer      : {base['manufacturer']}",
+        f"Product Code      : {base['product_code']}",
+        f"Serial Number     : {base['serial']}",
+    ]
+    if base.get("model_year") is not None:
+        lines.append(f"Model Year        : {base['model_year']}")
+    else:
+        lines.append(f"Manufactured Date : Week {base['week']} / {base['year']}")
+    if base["product_name"]:
+        lines.append(f"Product Name      : {base['product_name']}")
+    if base["serial_string"]:
+        lines.append(f"Serial String     : {base['serial_string']}")
+
+    lines.append(
+        f"Input             : {'Digital' if display['digital'] else 'Analog'}"
+        + (f" ({display['interface']})" if display.get("interface") else "")
+    )
+    lines.append(f"Screen Size       : {display['width_cm']} x {display['height_cm']} cm")
+    if display["gamma"]:
+        lines.append(f"Gamma             : {display['gamma']}")
+    lines.append(f"Extensions        : {base['extensions']}")
+    lines.append(
+        f"Checksum          : {'OK' if base['checksum_valid'] else 'INVALID'}"
+    )
+
+    if base["established_timings"]:
+        lines += ["", "Established Timings:"]
+        lines += [
+            f"  {t['width']}x{t['height']} @ {t['refresh_hz']} Hz"
+            for t in base["established_timings"]
+        ]
+
+    if base["standard_timings"]:
+        lines += ["", "Standard Timings:"]
+        lines += [
+            f"  {t['width']}x{t['height']} @ {t['refresh_hz']} Hz ({t['aspect']})"
+            for t in base["standard_timings"]
+        ]
+
+    if base["detailed_timings"]:
+        lines += ["", "Detailed Timings:"]
+        lines += [f"  {_format_timing(t)}" for t in base["detailed_timings"]]
+
+    for desc in base["descriptors"]:
+        if desc["type"] == "range_limits":
+            lines += [
+                "",
+                "Range Limits:",
+                f"  V: {desc['min_vfreq_hz']}-{desc['max_vfreq_hz']} Hz, "
+                f"H: {desc['min_hfreq_khz']}-{desc['max_hfreq_khz']} kHz, "
+                f"max {desc['max_pixel_clock_mhz']} MHz",
+            ]
+
+    for ext in decoded["extensions"]:
+        lines += [
+            "",
+            f"Block {ext['block']}: {ext['type']}",
+            "----------------------------",
+        ]
+        if not ext["checksum_valid"]:
+            lines.append("Checksum          : INVALID")
+
+        for block in ext.get("data_blocks", ()):
+            title = block.get("name") or block["type"]
+            lines.append(f"{title} Data Block")
+
+            for mode in block.get("modes", ()):
+                if "width" in mode:
+                    scan = "i" if mode["interlaced"] else "p"
+                    native = "  [native]" if mode.get("native") else ""
+                    lines.append(
+                        f"  VIC {mode['vic']:3}: {mode['width']}x{mode['height']}"
+                        f"{scan} @ {mode['refresh_hz']} Hz{native}"
+                    )
+                else:
+                    lines.append(f"  VIC {mode['vic']:3}")
+
+            for sad in block.get("descriptors", ()):
+                rates = ", ".join(f"{r:g}" for r in sad["rates_khz"])
+                lines.append(
+                    f"  {sad['format']}, {sad['channels']} ch, {rates} kHz"
+                )
+
+            if "physical_address" in block:
+                lines.append(f"  Physical Address: {block['physical_address']}")
+            if "max_tmds_mhz" in block:
+                lines.append(f"  Max TMDS Clock: {block['max_tmds_mhz']} MHz")
+            if block.get("speakers"):
+                lines.append(f"  Speakers: {', '.join(block['speakers'])}")
+            if block.get("product_name"):
+                lines.append(f"  Product Name: {block['product_name']}")
+
+        if ext.get("detailed_timings"):
+            lines.append("Detailed Timings:")
+            lines += [f"  {_format_timing(t)}" for t in ext["detailed_timings"]]
+
+    return "\n".join(lines)
+
+
+def decode_full_text(edid: bytes) -> str:
+    """
+    Decode EDID and return full human-readable text.
+    """
+    return format_decoded(decode_edid(edid))
+
@@ -1,6 +1,358 @@
-def diff_edid(a: bytes, b: bytes) -> str:
-    diffs = []
-    for i, (x, y) in enumerate(zip(a, b)):
-        if x != y:
-            diffs.append(f"0x{i:02X}: {x:02X} != {y:02X}")
-    return "\n".join(diffs)
+"""
+Field-aware EDID diff.
+
+Byte comparison is done on NumPy arrays (one vectorised pass, also across
+many EDIDs at once); only the differing offsets are then labelled with the
+EDID field they belong to. NumPy is imported on first use rather than
+with the module, since it dominates cold-start time on a Pi 3.
+"""
+
+import threading
+from collections import OrderedDict
+
+from .cea import (
+    CEA_EXTENSION_TAG,
+    DATA_BLOCK_NAMES,
+    EXTENDED_TAG_NAMES,
+    OUI_HDMI,
+    OUI_HDMI_FORUM,
+    iter_data_blocks,
+)
+from .compare import edid_hash
+from .decode import EXTENSION_NAMES
+from .displayid import BLOCK_NAMES as DISPLAYID_BLOCK_NAMES
+from .displayid import DISPLAYID_EXTENSION_TAG
+
+EDID_BLOCK_SIZE = 128
+
+_LAYOUT_CACHE_SIZE = 256
+_layout_cache = OrderedDict()
+_layout_cache_lock = threading.Lock()
+
+# Base block: (start, end exclusive, label)
+BASE_FIELDS = (
+    (0, 8, "Header"),
+    (8, 10, "Manufacturer ID"),
+    (10, 12, "Product code"),
+    (12, 16, "Serial number"),
+    (16, 17, "Week of manufacture"),
+    (17, 18, "Year of manufacture"),
+    (18, 20, "EDID version"),
+    (20, 21, "Video input definition"),
+    (21, 23, "Screen size"),
+    (23, 24, "Gamma"),
+    (24, 25, "Feature support"),
+    (25, 35, "Chromaticity"),
+    (35, 38, "Established timings"),
+)
+
+# 18-byte detailed timing descriptor: relative offset -> field
+DTD_FIELDS = (
+    (0, 2, "pixel clock"),
+    (2, 3, "horizontal active"),
+    (3, 4, "horizontal blanking"),
+    (4, 5, "horizontal active/blanking high bits"),
+    (5, 6, "vertical active"),
+    (6, 7, "vertical blanking"),
+    (7, 8, "vertical active/blanking high bits"),
+    (8, 9, "horizontal sync offset"),
+    (9, 10, "horizontal sync width"),
+    (10, 11, "vertical sync offset/width"),
+    (11, 12, "sync offset/width high bits"),
+    (12, 13, "horizontal image size"),
+    (13, 14, "vertical image size"),
+    (14, 15, "image size high bits"),
+    (15, 16, "horizontal border"),
+    (16, 17, "vertical border"),
+    (17, 18, "flags"),
+)
+
+DESCRIPTOR_NAMES = {
+    0xFF: "Serial number",
+    0xFE: "Text",
+    0xFD: "Range limits",
+    0xFC: "Product name",
+    0xFB: "Color point",
+    0xFA: "Standard timings",
+    0xF9: "Color management",
+    0xF8: "CVT timing codes",
+    0xF7: "Established timings III",
+    0x10: "Dummy",
+}
+
+
+# ----------------------------
+# Field layout
+# ----------------------------
+
+def _label_dtd(labels, start, prefix):
+    for lo, hi, name in DTD_FIELDS:
+        for i in range(start + lo, start + hi):
+            labels[i] = f"{prefix}: {name}"
+
+
+def _label_descriptors(labels, edid, base, count, dtd_prefix, start):
+    dtd_no = 0
+    for n in range(count):
+        pos = start + n * 18
+        if pos + 18 > base + 127:
+            break
+        desc = edid[pos:pos + 18]
+        if desc[0] or desc[1]:
+            dtd_no += 1
+            _label_dtd(labels, pos, f"{dtd_prefix} {dtd_no}")
+        else:
+            if dtd_prefix != "Detailed timing":
+                # CEA: a zero pixel clock ends the DTD list (padding)
+                break
+            name = DESCRIPTOR_NAMES.get(desc[3], f"Descriptor 0x{desc[3]:02X}")
+            for i in range(pos, pos + 18):
+                labels[i] = f"Display descriptor {n + 1} ({name})"
+
+
+def _label_base(labels, edid):
+    for lo, hi, name in BASE_FIELDS:
+        for i in range(lo, hi):
+            labels[i] = name
+    for n in range(8):
+        labels[38 + 2 * n] = labels[39 + 2 * n] = f"Standard timing {n + 1}"
+    _label_descriptors(labels, edid, 0, 4, "Detailed timing", 54)
+    labels[126] = "Extension count"
+    labels[127] = "Base block checksum"
+
+
+def _cea_block_name(block, pos, tag, length):
+    if tag == 3 and length >= 3:
+        oui = block[pos + 1] | (block[pos + 2] << 8) | (block[pos + 3] << 16)
+        if oui == OUI_HDMI:
+            return "VSDB (HDMI)"
+        if oui == OUI_HDMI_FORUM:
+            return "VSDB (HDMI Forum)"
+        return f"VSDB (OUI {oui:06X})"
+    if tag == 7 and length >= 1:
+        ext_tag = block[pos + 1]
+        return EXTENDED_TAG_NAMES.get(ext_tag, f"Extended tag {ext_tag}")
+    return DATA_BLOCK_NAMES.get(tag, f"Reserved ({tag})")
+
+
+def _label_cea(labels, edid, base, prefix):
+    block = edid[base:base + EDID_BLOCK_SIZE]
+    labels[base + 1] = f"{prefix}: revision"
+    labels[base + 2] = f"{prefix}: DTD offset"
+    labels[base + 3] = f"{prefix}: flags"
+
+    for pos, tag, length in iter_data_blocks(block):
+        label = f"CEA block: {_cea_block_name(block, pos, tag, length)}"
+        for i in range(base + pos, base + pos + 1 + length):
+            labels[i] = label
+
+    dtd_offset = block[2]
+    if 4 <= dtd_offset <= 127:
+        _label_descriptors(
+            labels, edid, base, (127 - dtd_offset) // 18,
+            "CEA detailed timing", base + dtd_offset,
+        )
+
+
+def _label_displayid(labels, edid, base, prefix):
+    block = edid[base:base + EDID_BLOCK_SIZE]
+    labels[base + 1] = f"{prefix}: version"
+    labels[base + 2] = f"{prefix}: section length"
+    labels[base + 3] = f"{prefix}: product type"
+    labels[base + 4] = f"{prefix}: extension count"
+
+    pos = 5
+    end = min(5 + block[2], 127)
+    while pos + 3 <= end:
+        tag, length = block[pos], block[pos + 2]
+        if tag == 0 and length == 0 and block[pos + 1] == 0:
+            break
+        name = DISPLAYID_BLOCK_NAMES.get(tag, f"Unknown (0x{tag:02X})")
+        for i in range(base + pos, min(base + pos + 3 + length, base + 127)):
+            labels[i] = f"DisplayID block: {name}"
+        pos += 3 + length
+
+
+def field_layout(edid: bytes) -> tuple:
+    """
+    Label for every byte offset of edid, e.g. "Detailed timing 1: pixel
+    clock" or "CEA block: VSDB (HDMI)". Cached per EDID hash.
+    """
+    key = edid_hash(edid)
+    with _layout_cache_lock:
+        labels = _layout_cache.get(key)
+        if labels is not None:
+            _layout_cache.move_to_end(key)
+            return labels
+
+    labels = [None] * len(edid)
+    if len(edid) >= EDID_BLOCK_SIZE:
+        _label_base(labels, edid)
+
+    for n in range(1, len(edid) // EDID_BLOCK_SIZE):
+        base = n * EDID_BLOCK_SIZE
+        tag = edid[base]
+        name = EXTENSION_NAMES.get(tag, f"Unknown (0x{tag:02X})")
+        prefix = f"Extension {n} ({name})"
+        labels[base] = f"{prefix}: tag"
+        if tag == CEA_EXTENSION_TAG:
+            _label_cea(labels, edid, base, prefix)
+        elif tag == DISPLAYID_EXTENSION_TAG:
+            _label_displayid(labels, edid, base, prefix)
+        labels[base + 127] = f"{prefix}: checksum"
+
+    for i, label in enumerate(labels):
+        if label is None:
+            n, offset = divmod(i, EDID_BLOCK_SIZE)
+            block = "Base block" if n == 0 else f"Extension {n}"
+            labels[i] = f"{block}: byte 0x{offset:02X}"
+
+    labels = tuple(labels)
+    with _layout_cache_lock:
+        _layout_cache[key] = labels
+        while len(_layout_cache) > _LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    return labels
+
+
+# ----------------------------
+# Comparison
+# ----------------------------
+
+def _matrix(edids):
+    """
+    Stack byte strings into a zero-padded uint8 matrix plus lengths.
+    """
+    import numpy as np
+
+    lengths = np.fromiter((len(e) for e in edids), dtype=np.int64,
+                          count=len(edids))
+    width = int(lengths.max()) if len(edids) else 0
+    matrix = np.zeros((len(edids), width), dtype=np.uint8)
+    for row, edid in enumerate(edids):
+        matrix[row, :len(edid)] = np.frombuffer(edid, dtype=np.uint8)
+    return matrix, lengths
+
+
+def _mismatch(matrix, lengths):
+    """
+    Row 0 is the reference. Returns a bool matrix of rows 1.. marking
+    differing bytes, including bytes present in only one of the pair.
+    """
+    import numpy as np
+
+    cols = np.arange(matrix.shape[1])
+    present = cols[None, :] < lengths[:, None]
+    differs = matrix[1:] != matrix[0]
+    return (differs & present[1:] & present[0]) | (present[1:] != present[0])
+
+
+def diff_offsets(a: bytes, b: bytes) -> list:
+    """
+    Offsets at which a and b differ, including any length mismatch.
+    """
+    import numpy as np
+
+    matrix, lengths = _matrix([a, b])
+    return np.flatnonzero(_mismatch(matrix, lengths)[0]).tolist()
+
+
+def _hex(data, start, end):
+    """
+    Hex bytes of data[start:end], padded with None past its end.
+    """
+    chunk = data[start:end].hex(" ").upper().split()
+    return chunk + [None] * (end - start - len(chunk))
+
+
+def _report(a: bytes, b: bytes, offsets) -> dict:
+    """
+    Structured result for one pair, differences grouped into runs of
+    consecutive offsets that share a field label.
+    """
+    import numpy as np
+
+    layout = field_layout(a)
+    if len(b) > len(a):
+        layout = layout + field_layout(b)[len(a):]
+
+    # Split into runs of consecutive offsets first (vectorised), then by
+    # field label within each run
+    runs = np.split(offsets, np.flatnonzero(np.diff(offsets) != 1) + 1)
+
+    differences = []
+    for run in runs:
+        if not len(run):
+            continue
+        pos = int(run[0])
+        stop = int(run[-1]) + 1
+        while pos < stop:
+            label = layout[pos]
+            end = pos + 1
+            while end < stop and layout[end] == label:
+                end += 1
+            differences.append({
+                "field": label,
+                "block": pos // EDID_BLOCK_SIZE,
+                "start": pos,
+                "end": end - 1,
+                "a": _hex(a, pos, end),
+                "b": _hex(b, pos, end),
+            })
+            pos = end
+
+    return {
+        "identical": not len(offsets),
+        "length_a": len(a),
+        "length_b": len(b),
+        "changed_bytes": int(len(offsets)),
+        "fields": sorted({d["field"] for d in differences}),
+        "differences": differences,
+    }
+
+
+def diff_edid(a: bytes, b: bytes) -> dict:
+    """
+    Compare two EDIDs over all blocks.
+
+    Fields are labelled using a's layout (bytes only b has use b's).
+    "differences" holds one entry per run of changed bytes [start, end]
+    within a field, with the hex bytes from each side (None where a side
+    is too short).
+    """
+    return diff_many(a, [b])[0]
+
+
+def diff_many(reference: bytes, others) -> list:
+    """
+    Compare many EDIDs against one reference in a single vectorised pass.
+    Returns one diff_edid-style result per entry of others.
+    """
+    import numpy as np
+
+    others = list(others)
+    if not others:
+        return []
+
+    matrix, lengths = _matrix([reference] + others)
+    mismatch = _mismatch(matrix, lengths)
+
+    return [
+        _report(reference, other, np.flatnonzero(row))
+        for other, row in zip(others, mismatch)
+    ]
+
+
+def format_diff(result: dict) -> str:
+    """
+    Human-readable one-line-per-field summary of a diff_edid result.
+    """
+    lines = []
+    for d in result["differences"]:
+        span = f"0x{d['start']:03X}"
+        if d["end"] != d["start"]:
+            span += f"-0x{d['end']:03X}"
+        a = " ".join(x or "--" for x in d["a"])
+        b = " ".join(x or "--" for x in d["b"])
+        lines.append(f"{span} {d['field']}: {a} != {b}")
+    return "\n".join(lines)
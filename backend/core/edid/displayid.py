@@ -0,0 +1,155 @@
+"""
+DisplayID extension block decoding (DisplayID 1.3 and 2.0).
+"""
+
+DISPLAYID_EXTENSION_TAG = 0x70
+
+BLOCK_NAMES = {
+    0x00: "Product Identification",
+    0x01: "Display Parameters",
+    0x02: "Color Characteristics",
+    0x03: "Type I Detailed Timing",
+    0x04: "Type II Detailed Timing",
+    0x05: "Type III Short Timing",
+    0x06: "Type IV Short Timing",
+    0x07: "VESA Timing",
+    0x08: "CTA Timing",
+    0x09: "Video Timing Range",
+    0x0A: "Product Serial Number",
+    0x0B: "ASCII String",
+    0x0C: "Display Device Data",
+    0x0D: "Interface Power Sequencing",
+    0x0E: "Transfer Characteristics",
+    0x0F: "Display Interface",
+    0x10: "Stereo Display Interface",
+    0x12: "Tiled Display Topology",
+    0x20: "Product Identification",
+    0x21: "Display Parameters",
+    0x22: "Type VII Detailed Timing",
+    0x23: "Type VIII Enumerated Timing",
+    0x25: "Type IX Formula Timing",
+    0x26: "Dynamic Video Timing Range",
+    0x27: "Display Interface Features",
+    0x28: "Stereo Display Interface",
+    0x29: "Tiled Display Topology",
+    0x2B: "ContainerID",
+    0x7E: "Vendor-Specific",
+    0x81: "CTA DisplayID",
+}
+
+ASPECTS = ("1:1", "5:4", "4:3", "15:9", "16:9", "16:10", "64:27", "256:135")
+
+
+def decode_detailed_timing(desc: bytes, clock_unit_khz: int):
+    """
+    Decode a 20-byte Type I / Type VII detailed timing descriptor.
+    """
+    pixel_clock_khz = (
+        (desc[0] | (desc[1] << 8) | (desc[2] << 16)) + 1
+    ) * clock_unit_khz
+    flags = desc[3]
+
+    def field(i):
+        return (desc[i] | (desc[i + 1] << 8))
+
+    hactive = field(4) + 1
+    hblank = field(6) + 1
+    hsync_offset = (field(8) & 0x7FFF) + 1
+    hsync_width = field(10) + 1
+    vactive = field(12) + 1
+    vblank = field(14) + 1
+    vsync_offset = (field(16) & 0x7FFF) + 1
+    vsync_width = field(18) + 1
+
+    htotal = hactive + hblank
+    vtotal = vactive + vblank
+    refresh = (pixel_clock_khz * 1000) / (htotal * vtotal)
+
+    aspect = flags & 0x0F
+    return {
+        "pixel_clock_khz": pixel_clock_khz,
+        "width": hactive,
+        "height": vactive,
+        "refresh_hz": round(refresh, 3),
+        "preferred": bool(flags & 0x80),
+        "interlaced": bool(flags & 0x10),
+        "aspect": ASPECTS[aspect] if aspect < len(ASPECTS) else None,
+        "hblank": hblank,
+        "hsync_offset": hsync_offset,
+        "hsync_width": hsync_width,
+        "hsync_positive": bool(field(8) & 0x8000),
+        "vblank": vblank,
+        "vsync_offset": vsync_offset,
+        "vsync_width": vsync_width,
+        "vsync_positive": bool(field(16) & 0x8000),
+    }
+
+
+def _decode_product_id(payload: bytes, year_base: int):
+    if len(payload) < 12:
+        return {}
+    vendor = bytes(payload[0:3])
+    if all(0x41 <= c <= 0x5A for c in vendor):
+        vendor_id = vendor.decode("ascii")
+    else:
+        vendor_id = vendor.hex().upper()
+    name_len = payload[11]
+    name = payload[12:12 + name_len].decode("ascii", errors="replace")
+    return {
+        "vendor": vendor_id,
+        "product_code": payload[3] | (payload[4] << 8),
+        "serial": int.from_bytes(payload[5:9], "little"),
+        "week": payload[9],
+        "year": year_base + payload[10],
+        "product_name": name,
+    }
+
+
+def decode_displayid_block(block: bytes):
+    """
+    Decode one 128-byte DisplayID extension block.
+    """
+    version = block[1]
+    section_length = block[2]
+    product_type = block[3]
+    is_v2 = version >= 0x20
+
+    data_blocks = []
+    timings = []
+
+    pos = 5
+    end = min(5 + section_length, 127)
+    while pos + 3 <= end:
+        tag, revision, length = block[pos], block[pos + 1], block[pos + 2]
+        if tag == 0 and length == 0 and revision == 0:
+            break  # padding
+        payload = block[pos + 3:pos + 3 + length]
+
+        entry = {
+            "offset": pos,
+            "tag": tag,
+            "type": BLOCK_NAMES.get(tag, f"Unknown (0x{tag:02X})"),
+            "revision": revision,
+            "length": length,
+        }
+
+        if tag in (0x03, 0x22):
+            unit = 1 if tag == 0x22 else 10
+            for i in range(0, len(payload) - 19, 20):
+                timing = decode_detailed_timing(payload[i:i + 20], unit)
+                timing["offset"] = pos + 3 + i
+                timings.append(timing)
+        elif tag in (0x00, 0x20):
+            entry.update(_decode_product_id(payload, 2000))
+
+        data_blocks.append(entry)
+        pos += 3 + length
+
+    return {
+        "type": "DisplayID",
+        "version": f"{version >> 4}.{version & 0x0F}",
+        "v2": is_v2,
+        "product_type": product_type,
+        "data_blocks": data_blocks,
+        "detailed_timings": timings,
+    }
@@ -1,30 +1,44 @@
+import os
 from pathlib import Path
 
+# Overridable for running against a simulated sysfs tree
+DRM_SYSFS_PATH = os.environ.get("DRM_SYSFS_PATH", "/sys/class/drm")
+
 def is_connector_connected(connector: str) -> bool:
     if not isinstance(connector, str):
         raise ValueError("connector must be a string")
     """
     Check if DRM connector exists and is connected.
+
+    Answered from the shared DRM topology snapshot (hotplug.py).
     """
-    drm = Path("/sys/class/drm")
+    from .hotplug import connector_monitor
 
-    for card in drm.glob("card*-*"):
-        if card.name.endswith(connector):
-            status = card / "status"
-            if status.exists():
-                return status.read_text().strip() == "connected"
+    return connector_monitor.is_connected(connector)
+
+
+def _ddc_link_bus(card: Path):
+    """
+    Resolve a connector's DDC i2c bus through its sysfs 'ddc' link
+    (/sys/class/drm/cardN-<connector>/ddc -> .../i2c-N). Returns None if
+    the driver exposes no ddc link.
+    """
+    try:
+        target = os.path.basename(os.readlink(card / "ddc"))
+        if target.startswith("i2c-"):
+            return int(target.split("-", 1)[1])
+    except (OSError, ValueError):
+        pass
+    return None
 
-    return False
-    
-from pathlib import Path
 
 def list_connectors():
     """
-    Enumerate DRM connectors from /sys/class/drm.
+    Enumerate DRM connectors from /sys/class/drm (DRM_SYSFS_PATH).
     Returns connector info including EDID presence and path.
     """
     connectors = []
-    drm = Path("/sys/class/drm")
+    drm = Path(DRM_SYSFS_PATH)
 
     for card in drm.glob("card*-*"):
         status_file = card / "status"
@@ -48,10 +62,12 @@ def list_connectors():
         connectors.append({
             "name": name,
             "connector_id": connector_id,
+            "status": status,
             "connected": status == "connected",
             "sysfs_path": str(card),
             "edid_present": edid_present,
             "edid_path": str(edid_file) if edid_present else None,
+            "ddc_bus": _ddc_link_bus(card),
         })
 
     return sorted(connectors, key=lambda c: c["name"])
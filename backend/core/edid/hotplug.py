@@ -0,0 +1,264 @@
+import os
+import select
+import socket
+import threading
+import time
+
+from backend.core.events import event_bus
+
+from .compare import edid_hash
+from .drm import list_connectors
+from .read import EDID_HEADER
+
+# linux/netlink.h
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+# Coalesce the burst of uevents a single plug/unplug produces
+DEBOUNCE_SECONDS = 0.2
+# Used only when the netlink socket cannot be opened
+FALLBACK_POLL_SECONDS = 5.0
+# Safety net: a snapshot older than this is rescanned on access, in case
+# a hotplug event was missed
+SNAPSHOT_TTL_SECONDS = 30.0
+
+
+def _open_uevent_socket():
+    sock = socket.socket(
+        socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT
+    )
+    sock.bind((0, UEVENT_KERNEL_GROUP))
+    return sock
+
+
+def parse_uevent(message: bytes) -> dict:
+    """
+    Parse a kernel uevent: "action@devpath\\0KEY=VALUE\\0..."
+    """
+    fields = {}
+    for part in message.split(b"\0")[1:]:
+        key, sep, value = part.partition(b"=")
+        if sep:
+            fields[key.decode(errors="replace")] = value.decode(errors="replace")
+    return fields
+
+
+def _scan():
+    """
+    One pass over /sys/class/drm: connector list plus each EDID.
+    """
+    connectors = []
+    edids = {}
+
+    for conn in list_connectors():
+        entry = dict(conn)
+        entry["sysfs_name"] = os.path.basename(conn["sysfs_path"])
+        entry["edid_hash"] = None
+        entry["edid_valid"] = False
+
+        if conn["edid_present"]:
+            try:
+                with open(conn["edid_path"], "rb") as f:
+                    edid = f.read()
+            except OSError:
+                edid = b""
+            if edid:
+                edids[conn["name"]] = edid
+                entry["edid_hash"] = edid_hash(edid)
+                entry["edid_valid"] = (
+                    len(edid) >= 128 and edid.startswith(EDID_HEADER)
+                )
+
+        connectors.append(entry)
+
+    return connectors, edids
+
+
+def _matches(entry: dict, connector: str) -> bool:
+    return connector in (entry["name"], entry["sysfs_name"])
+
+
+class ConnectorMonitor:
+    """
+    The DRM topology model: one in-memory snapshot of connectors (name,
+    id, status, EDID hash, DDC bus) and their EDIDs, shared by every
+    connector lookup. Refreshed on kernel DRM hotplug uevents (or after
+    SNAPSHOT_TTL_SECONDS) and pushed to the event bus as "connectors"
+    events.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._connectors = []
+        self._edids = {}
+        # connector name -> bus found by probing (no ddc link)
+        self._probed_buses = {}
+        self._thread = None
+        self._netlink = False
+        self._last_scan = None
+
+    # ----------------------------
+    # Snapshot access (no sysfs I/O once started)
+    # ----------------------------
+
+    def _snapshot(self):
+        self.start()
+        with self._lock:
+            stale = (
+                self._last_scan is None
+                or time.time() - self._last_scan > SNAPSHOT_TTL_SECONDS
+            )
+        if stale:
+            self._safe_rescan()
+        with self._lock:
+            return self._connectors
+
+    def connectors(self):
+        return [dict(c) for c in self._snapshot()]
+
+    def find(self, connector: str):
+        """
+        Snapshot entry for a connector, by name ("HDMI-A-1") or sysfs
+        name ("card0-HDMI-A-1").
+        """
+        for entry in self._snapshot():
+            if _matches(entry, connector):
+                return dict(entry)
+        return None
+
+    def by_id(self, connector_id: int):
+        for entry in self._snapshot():
+            if entry["connector_id"] == connector_id:
+                return dict(entry)
+        return None
+
+    def is_connected(self, connector: str) -> bool:
+        entry = self.find(connector)
+        return bool(entry and entry["connected"])
+
+    def edid(self, connector: str):
+        entry = self.find(connector)
+        if entry is None:
+            return None
+        with self._lock:
+            return self._edids.get(entry["name"])
+
+    # ----------------------------
+    # DDC bus
+    # ----------------------------
+
+    def ddc_bus(self, connector: str):
+        """
+        The connector's i2c bus: its sysfs ddc link, else a bus remembered
+        from an earlier probe. None if neither is known.
+        """
+        entry = self.find(connector)
+        if entry is None:
+            return None
+        if entry["ddc_bus"] is not None:
+            return entry["ddc_bus"]
+        with self._lock:
+            return self._probed_buses.get(entry["name"])
+
+    def remember_ddc_bus(self, connector: str, bus: int):
+        """
+        Cache a bus found by probing, for connectors without a ddc link.
+        Kept until the topology changes.
+        """
+        entry = self.find(connector)
+        with self._lock:
+            self._probed_buses[entry["name"] if entry else connector] = bus
+
+    def forget_ddc_bus(self, connector: str):
+        entry = self.find(connector)
+        with self._lock:
+            self._probed_buses.pop(entry["name"] if entry else connector, None)
+
+    def status(self):
+        with self._lock:
+            return {
+                "running": bool(self._thread and self._thread.is_alive()),
+                "source": "netlink" if self._netlink else "poll",
+                "last_scan": self._last_scan,
+                "connectors": len(self._connectors),
+            }
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+
+            # Initial snapshot before anyone reads it
+            self.rescan(publish=False)
+
+            thread = threading.Thread(
+                target=self._run, name="drm-hotplug", daemon=True
+            )
+            thread.start()
+            with self._lock:
+                self._thread = thread
+
+    def rescan(self, publish: bool = True) -> bool:
+        connectors, edids = _scan()
+
+        with self._lock:
+            changed = connectors != self._connectors
+            self._connectors = connectors
+            self._edids = edids
+            self._last_scan = time.time()
+
+        if changed:
+            with self._lock:
+                self._probed_buses.clear()
+            if publish:
+                event_bus.publish("connectors", connectors)
+        return changed
+
+    def _run(self):
+        try:
+            sock = _open_uevent_socket()
+        except (OSError, AttributeError):
+            sock = None
+
+        if sock is None:
+            while True:
+                time.sleep(FALLBACK_POLL_SECONDS)
+                self._safe_rescan()
+
+        with self._lock:
+            self._netlink = True
+
+        poller = select.poll()
+        poller.register(sock, select.POLLIN)
+
+        while True:
+            poller.poll()
+            if not self._drain(sock):
+                continue
+
+            # Let the rest of the burst arrive, then scan once
+            while poller.poll(DEBOUNCE_SECONDS * 1000):
+                self._drain(sock)
+            self._safe_rescan()
+
+    @staticmethod
+    def _drain(sock) -> bool:
+        try:
+            message = sock.recv(65536)
+        except OSError:
+            return False
+        return parse_uevent(message).get("SUBSYSTEM") == "drm"
+
+    def _safe_rescan(self):
+        try:
+            self.rescan()
+        except OSError:
+            pass
+
+
+connector_monitor = ConnectorMonitor()
@@ -1,12 +1,269 @@
+import ctypes
+import fcntl
 import os
+import threading
+from contextlib import contextmanager
 from smbus import SMBus
 
+from backend.core.metrics import i2c_bytes, i2c_naks, i2c_retries, i2c_transactions
+
 from .checksum import validate_edid
-from .exceptions import EDIDWriteError
+from .exceptions import EDIDError, EDIDReadError, EDIDWriteError
 
 EDID_I2C_ADDR = 0x50
 EDID_HEADER = b"\x00\xff\xff\xff\xff\xff\xff\x00"
 
+# E-DDC segment pointer: selects which 256-byte segment 0x50 serves
+DDC_SEGMENT_ADDR = 0x30
+DDC_SEGMENT_SIZE = 256
+EDID_BLOCK_SIZE = 128
+MAX_EDID_BLOCKS = 256
+
+# SMBus "I2C block read" is limited to 32 bytes per transaction
+SMBUS_BLOCK_MAX = 32
+
+# linux/i2c-dev.h, linux/i2c.h
+I2C_RDWR = 0x0707
+I2C_M_RD = 0x0001
+
+READ_METHODS = ("rdwr", "block", "byte")
+
+# Fastest method known to work per bus, so failed probes are not repeated
+_bus_methods = {}
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
+
+
+def _default_lock_dir():
+    """
+    A directory only this user can write: the systemd user runtime dir,
+    else one inside the app. A shared /tmp would let another user (or a
+    script run with sudo) own the lock files first.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    if os.path.isdir(runtime):
+        return os.path.join(runtime, "amuse-i2c")
+    return os.path.join(APP_DIR, ".run", "i2c")
+
+
+# Web workers run in separate processes, so the per-bus lock is also
+# held as an flock on a lock file shared by every process of this user.
+BUS_LOCK_DIR = os.environ.get("I2C_BUS_LOCK_DIR") or _default_lock_dir()
+
+_bus_locks = {}
+_bus_locks_guard = threading.Lock()
+
+
+class _BusLock:
+    """
+    Re-entrant within a thread, exclusive across threads and processes.
+    """
+
+    def __init__(self, bus: int):
+        self.path = os.path.join(BUS_LOCK_DIR, f"i2c-{bus}.lock")
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._lock.acquire()
+        try:
+            if self._depth == 0:
+                os.makedirs(BUS_LOCK_DIR, mode=0o700, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except OSError:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._lock.release()
+            raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+@contextmanager
+def bus_lock(bus: int, error=EDIDReadError):
+    """
+    Hold the lock serialising multi-transaction operations on one i2c
+    adapter. A lock file that cannot be opened raises error.
+    """
+    with _bus_locks_guard:
+        lock = _bus_locks.get(bus)
+        if lock is None:
+            lock = _bus_locks[bus] = _BusLock(bus)
+    try:
+        lock.acquire()
+    except OSError as exc:
+        raise error(f"i2c-{bus}: cannot take bus lock {lock.path}: {exc}") from exc
+    try:
+        yield lock
+    finally:
+        lock.release()
+
+
+class _I2CMsg(ctypes.Structure):
+    _fields_ = [
+        ("addr", ctypes.c_uint16),
+        ("flags", ctypes.c_uint16),
+        ("len", ctypes.c_uint16),
+        ("buf", ctypes.POINTER(ctypes.c_uint8)),
+    ]
+
+
+class _I2CRdwrData(ctypes.Structure):
+    _fields_ = [
+        ("msgs", ctypes.POINTER(_I2CMsg)),
+        ("nmsgs", ctypes.c_uint32),
+    ]
+
+
+def _msg(addr, flags, buf):
+    return _I2CMsg(
+        addr, flags, len(buf),
+        ctypes.cast(buf, ctypes.POINTER(ctypes.c_uint8)),
+    )
+
+
+def _read_rdwr(bus: int, segment: int, offset: int, length: int) -> bytes:
+    """
+    One combined i2c-dev transaction:
+    [S 0x30 W seg] [Sr 0x50 W offset] [Sr 0x50 R length] P
+    """
+    seg_buf = (ctypes.c_uint8 * 1)(segment)
+    off_buf = (ctypes.c_uint8 * 1)(offset)
+    data_buf = (ctypes.c_uint8 * length)()
+
+    msgs = []
+    if segment:
+        msgs.append(_msg(DDC_SEGMENT_ADDR, 0, seg_buf))
+    msgs.append(_msg(EDID_I2C_ADDR, 0, off_buf))
+    msgs.append(_msg(EDID_I2C_ADDR, I2C_M_RD, data_buf))
+
+    arr = (_I2CMsg * len(msgs))(*msgs)
+    request = _I2CRdwrData(arr, len(msgs))
+
+    fd = os.open(f"/dev/i2c-{bus}", os.O_RDWR)
+    try:
+        fcntl.ioctl(fd, I2C_RDWR, request)
+    finally:
+        os.close(fd)
+
+    return bytes(data_buf)
+
+
+def _read_smbus(bus: int, offset: int, length: int, block: bool) -> bytes:
+    smb = SMBus(bus)
+    try:
+        if not block:
+            return bytes(
+                smb.read_byte_data(EDID_I2C_ADDR, offset + i)
+                for i in range(length)
+            )
+
+        data = bytearray()
+        while len(data) < length:
+            n = min(SMBUS_BLOCK_MAX, length - len(data))
+            chunk = smb.read_i2c_block_data(
+                EDID_I2C_ADDR, offset + len(data), n
+            )
+            if len(chunk) != n:
+                raise OSError(f"short block read ({len(chunk)}/{n} bytes)")
+            data.extend(chunk)
+        return bytes(data)
+    finally:
+        smb.close()
+
+
+def _transaction_count(method: str, length: int) -> int:
+    if method == "rdwr":
+        return 1
+    if method == "block":
+        return -(-length // SMBUS_BLOCK_MAX)
+    return length
+
+
+def _read_segment(bus: int, segment: int, offset: int, length: int,
+                  method: str = "auto") -> bytes:
+    """
+    Read length bytes starting at offset within one E-DDC segment.
+
+    method="auto" tries a combined i2c-dev read first, then SMBus block
+    reads, then single-byte reads, and remembers what worked per bus.
+    Segments above 0 need the combined read: the segment pointer resets
+    on STOP, which SMBus transfers always issue.
+    """
+    if offset + length > DDC_SEGMENT_SIZE:
+        raise ValueError("read crosses a DDC segment boundary")
+
+    if method == "auto":
+        start = READ_METHODS.index(_bus_methods.get(bus, "rdwr"))
+        methods = READ_METHODS[start:]
+    else:
+        methods = (method,)
+
+    last_error = None
+    for m in methods:
+        if segment and m != "rdwr":
+            break
+        if last_error is not None:
+            i2c_retries.inc(bus=bus)
+        try:
+            if m == "rdwr":
+                data = _read_rdwr(bus, segment, offset, length)
+            else:
+                data = _read_smbus(bus, offset, length, block=(m == "block"))
+        except (OSError, IOError) as e:
+            i2c_transactions.inc(bus=bus, op="read")
+            i2c_naks.inc(bus=bus)
+            last_error = e
+            continue
+
+        i2c_transactions.inc(_transaction_count(m, length), bus=bus, op="read")
+        i2c_bytes.inc(length, bus=bus, direction="read")
+        if method == "auto":
+            _bus_methods[bus] = m
+        return data
+
+    if segment and last_error is None:
+        last_error = OSError("E-DDC segment read requires I2C_RDWR support")
+    raise OSError(
+        f"i2c-{bus} segment {segment} read failed: {last_error}"
+    )
+
+
+def read_i2c_range(bus: int, start: int, length: int,
+                   method: str = "auto") -> bytes:
+    """
+    Read an arbitrary byte range of the DDC address space, splitting it
+    into per-segment reads.
+    """
+    data = bytearray()
+    pos = start
+    end = start + length
+    with bus_lock(bus):
+        while pos < end:
+            segment, offset = divmod(pos, DDC_SEGMENT_SIZE)
+            n = min(DDC_SEGMENT_SIZE - offset, end - pos)
+            data.extend(_read_segment(bus, segment, offset, n, method))
+            pos += n
+    return bytes(data)
+
 
 def find_ddc_i2c_buses():
     buses = []
@@ -17,14 +274,7 @@ def find_ddc_i2c_buses():
 
         try:
             busnum = int(dev.split("-")[1])
-            bus = SMBus(busnum)
-
-            header = bytes(
-                bus.read_byte_data(EDID_I2C_ADDR, i)
-                for i in range(8)
-            )
-
-            bus.close()
+            header = read_i2c_range(busnum, 0, len(EDID_HEADER))
 
             if header == EDID_HEADER:
                 buses.append(busnum)
@@ -39,30 +289,47 @@ def read_edid_i2c(
     bus: int,
     length: int = 128,
     strict: bool = True,
+    method: str = "auto",
 ):
     """
     Read EDID bytes directly from a DDC I2C bus.
 
     strict=True  -> validate EDID header + checksum
     strict=False -> raw read (used for EEPROM verification)
+
+    length=None reads the whole EDID: the full first segment in one
+    transaction, then any further E-DDC segments the extension count asks
+    for. method is "auto", "rdwr", "block" or "byte".
     """
 
     try:
-        smb = SMBus(bus)
-        edid = bytes(
-            smb.read_byte_data(EDID_I2C_ADDR, i)
-            for i in range(length)
-        )
-        smb.close()
+        if length is None:
+            first = read_i2c_range(bus, 0, DDC_SEGMENT_SIZE, method)
+            blocks = min(1 + first[126], MAX_EDID_BLOCKS)
+            total = blocks * EDID_BLOCK_SIZE
+            if total > DDC_SEGMENT_SIZE:
+                rest = read_i2c_range(
+                    bus, DDC_SEGMENT_SIZE, total - DDC_SEGMENT_SIZE, method
+                )
+                edid = first + rest
+            else:
+                edid = first[:total]
+        else:
+            edid = read_i2c_range(bus, 0, length, method)
     except Exception as e:
         raise EDIDWriteError(
             f"I2C EDID read failed on i2c-{bus}: {e}"
         )
 
-    if strict and not validate_edid(edid):
-        raise EDIDWriteError(
-            f"Invalid EDID read from i2c-{bus}"
-        )
+    if strict:
+        try:
+            if not edid.startswith(EDID_HEADER):
+                raise EDIDError("Invalid EDID header")
+            validate_edid(edid)
+        except EDIDError as e:
+            raise EDIDWriteError(
+                f"Invalid EDID read from i2c-{bus}: {e}"
+            )
 
     return {
         "bus": bus,
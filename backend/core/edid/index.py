@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from backend.core.metrics import edid_bytes_hashed
+
+INDEX_FILENAME = ".edid_index.json"
+INDEX_VERSION = 1
+
+# Files are hashed concurrently so per-file latency on slow media (FAT
+# USB sticks) overlaps instead of adding up
+HASH_WORKERS = 4
+
+
+def file_digest(path) -> str:
+    """
+    SHA-256 of a file, read in chunks.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class EDIDIndex:
+    """
+    Content-addressed index of the *.bin files in one directory.
+
+    Maps SHA-256 -> filenames and keeps size + mtime per file so that only
+    new or changed files are ever rehashed. The directory mtime is checked
+    before every query; when it has not moved the in-memory index is
+    answered directly without listing the directory.
+    """
+
+    def __init__(self, directory, source: str = "library"):
+        self.directory = Path(directory)
+        # Label for the bytes-hashed metric ("library" or "usb")
+        self.source = source
+        self.path = self.directory / INDEX_FILENAME
+        self._lock = threading.RLock()
+        self._files = {}      # name -> {"hash", "size", "mtime_ns"}
+        self._by_hash = {}    # hash -> set(names)
+        self._dir_mtime_ns = None
+        self._loaded = False
+        # Bumped on every change so derived indexes know when to rebuild
+        self.generation = 0
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+
+    def names(self):
+        with self._lock:
+            self.refresh()
+            return sorted(self._files)
+
+    def lookup(self, digest: str):
+        with self._lock:
+            self.refresh()
+            return sorted(self._by_hash.get(digest, ()))
+
+    def hash_of(self, name: str):
+        with self._lock:
+            self.refresh()
+            entry = self._files.get(name)
+            return entry["hash"] if entry else None
+
+    def entries(self):
+        """
+        Return {name: {"hash", "size", "mtime_ns"}} for every indexed file.
+        """
+        with self._lock:
+            self.refresh()
+            return {name: dict(entry) for name, entry in self._files.items()}
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+
+    def add(self, name: str, data: bytes = None):
+        """
+        Record a file that was just written into the directory.
+        """
+        digest = hashlib.sha256(data).hexdigest() if data is not None else None
+        self.add_many({name: digest})
+
+    def add_many(self, files: dict):
+        """
+        Record several files just written into the directory, as
+        {name: known hash or None}. Files with a known hash (e.g. copied
+        from another indexed directory) are not read again.
+        """
+        with self._lock:
+            self._load()
+            for name, digest in files.items():
+                path = self.directory / name
+                st = path.stat()
+                if digest is None:
+                    digest = file_digest(path)
+                    edid_bytes_hashed.inc(st.st_size, source=self.source)
+                self._set(name, digest, st.st_size, st.st_mtime_ns)
+            # Rescan too, so other changes alongside this write are not masked
+            self._sync(force=True, dirty=True)
+
+    def remove(self, name: str):
+        with self._lock:
+            self._load()
+            dirty = self._drop(name)
+            self._sync(force=True, dirty=dirty)
+
+    def refresh(self, force: bool = False):
+        """
+        Bring the index up to date with the directory.
+
+        force=False -> rescan only if the directory mtime changed
+        force=True  -> always stat every file (catches in-place edits)
+        """
+        with self._lock:
+            self._load()
+            self._sync(force=force)
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+
+    def _sync(self, force=False, dirty=False):
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            if self._files:
+                self._files.clear()
+                self._by_hash.clear()
+                self.generation += 1
+            self._dir_mtime_ns = None
+            return
+
+        if not force and dir_mtime == self._dir_mtime_ns:
+            return
+
+        if self._rescan() or dirty:
+            self._save()
+        # The mtime from before the scan: a file added during it changes
+        # the directory again and is picked up next time. Our own save
+        # does too, which costs one extra stat-only pass.
+        self._dir_mtime_ns = dir_mtime
+
+    def _rescan(self) -> bool:
+        seen = set()
+        stale = []
+
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".bin") or not entry.is_file():
+                    continue
+
+                seen.add(entry.name)
+                st = entry.stat()
+                known = self._files.get(entry.name)
+                if (
+                    known
+                    and known["size"] == st.st_size
+                    and known["mtime_ns"] == st.st_mtime_ns
+                ):
+                    continue
+                stale.append((entry, st))
+
+        changed = False
+        hashed = 0
+        for (entry, st), digest in zip(stale, self._hash_all(stale)):
+            if digest is None:
+                continue
+            hashed += st.st_size
+            self._set(entry.name, digest, st.st_size, st.st_mtime_ns)
+            changed = True
+
+        for name in set(self._files) - seen:
+            self._drop(name)
+            changed = True
+
+        if hashed:
+            edid_bytes_hashed.inc(hashed, source=self.source)
+        return changed
+
+    @staticmethod
+    def _hash_all(stale):
+        def digest(item):
+            try:
+                return file_digest(item[0].path)
+            except OSError:
+                return None
+
+        if len(stale) < 2:
+            return [digest(item) for item in stale]
+
+        workers = min(HASH_WORKERS, len(stale))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(digest, stale))
+
+    def _set(self, name, digest, size, mtime_ns):
+        self._drop(name)
+        self.generation += 1
+        self._files[name] = {
+            "hash": digest,
+            "size": size,
+            "mtime_ns": mtime_ns,
+        }
+        self._by_hash.setdefault(digest, set()).add(name)
+
+    def _drop(self, name) -> bool:
+        entry = self._files.pop(name, None)
+        if not entry:
+            return False
+        self.generation += 1
+        names = self._by_hash.get(entry["hash"])
+        if names:
+            names.discard(name)
+            if not names:
+                del self._by_hash[entry["hash"]]
+        return True
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            raw = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+
+        if raw.get("version") != INDEX_VERSION:
+            return
+
+        for name, entry in raw.get("files", {}).items():
+            try:
+                self._set(name, entry["hash"], entry["size"], entry["mtime_ns"])
+            except (KeyError, TypeError):
+                continue
+
+    def _save(self):
+        payload = {
+            "version": INDEX_VERSION,
+            "files": self._files,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, sort_keys=True))
+            os.replace(tmp, self.path)
+        except OSError:
+            # Read-only media: keep the in-memory index only
+            tmp.unlink(missing_ok=True)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(directory) -> EDIDIndex:
+    """
+    Return the shared index for a directory (one per process).
+    """
+    key = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = EDIDIndex(key)
+        return index
@@ -0,0 +1,405 @@
+"""
+EDID library storage backends behind one interface.
+
+DirectoryLibrary  one .bin file per EDID (the original layout)
+PackLibrary       one append-only pack file plus an offset/hash index,
+                  read through mmap
+
+The backend is chosen with EDID_LIBRARY_BACKEND ("dir" or "pack").
+"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from .exceptions import EDIDError
+from .index import get_index
+
+LIBRARY_BACKEND_ENV = "EDID_LIBRARY_BACKEND"
+BACKENDS = ("dir", "pack")
+
+PACK_FILENAME = ".edid_library.pack"
+PACK_INDEX_FILENAME = ".edid_library.idx"
+PACK_MAGIC = b"EDIDPK01"
+PACK_INDEX_VERSION = 1
+
+# Record header: op, name length, data length, SHA-256 of data
+_RECORD = struct.Struct("<BHI32s")
+OP_PUT = 1
+OP_DELETE = 2
+
+
+def _check_name(name: str):
+    if not name or os.path.basename(name) != name or not name.endswith(".bin"):
+        raise EDIDError(f"Invalid EDID filename: {name}")
+
+
+class DirectoryLibrary:
+    """
+    EDIDs stored as individual .bin files, indexed by EDIDIndex.
+    """
+
+    backend = "dir"
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._index = get_index(directory)
+
+    @property
+    def generation(self) -> int:
+        return self._index.generation
+
+    def refresh(self, force: bool = False):
+        self._index.refresh(force=force)
+
+    def names(self):
+        return self._index.names()
+
+    def entries(self):
+        return self._index.entries()
+
+    def lookup(self, digest: str):
+        return self._index.lookup(digest)
+
+    def hash_of(self, name: str):
+        return self._index.hash_of(name)
+
+    def exists(self, name: str) -> bool:
+        return self.hash_of(name) is not None
+
+    def path_of(self, name: str) -> str:
+        return str(self.directory / name)
+
+    def read(self, name: str) -> bytes:
+        _check_name(name)
+        try:
+            return (self.directory / name).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(name)
+
+    def read_all(self) -> dict:
+        out = {}
+        for name in self.names():
+            try:
+                out[name] = self.read(name)
+            except KeyError:
+                continue
+        return out
+
+    def add(self, name: str, data: bytes, overwrite: bool = False):
+        self.add_many({name: data}, overwrite=overwrite)
+
+    def add_many(self, files: dict, overwrite: bool = False):
+        for name in files:
+            _check_name(name)
+            if not overwrite and (self.directory / name).exists():
+                raise EDIDError(f"Filename already exists: {name}")
+
+        os.makedirs(self.directory, exist_ok=True)
+        for name, data in files.items():
+            (self.directory / name).write_bytes(data)
+        self._index.add_many({
+            name: hashlib.sha256(data).hexdigest()
+            for name, data in files.items()
+        })
+
+    def remove(self, name: str):
+        _check_name(name)
+        try:
+            (self.directory / name).unlink()
+        except FileNotFoundError:
+            pass
+        self._index.remove(name)
+
+
+class PackLibrary:
+    """
+    EDIDs stored as records appended to a single pack file.
+
+    Records are never rewritten: saving a name again or deleting it
+    appends a newer record. The index (name -> offset, size, hash) is
+    kept in memory and persisted beside the pack together with the pack
+    length it covers, so startup only replays records appended since.
+    Reads slice an mmap of the pack, and read_all() is one sequential
+    pass over it. Appends take an flock so several processes can share
+    one pack.
+    """
+
+    backend = "pack"
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.path = self.directory / PACK_FILENAME
+        self.index_path = self.directory / PACK_INDEX_FILENAME
+        self._lock = threading.RLock()
+        self._files = {}      # name -> {"offset", "size", "hash"}
+        self._by_hash = {}    # hash -> set(names)
+        self._end = 0         # pack length covered by the index
+        self._map = None
+        self._fd = None
+        self.generation = 0
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+
+    def names(self):
+        with self._lock:
+            self.refresh()
+            return sorted(self._files)
+
+    def entries(self):
+        with self._lock:
+            self.refresh()
+            return {name: dict(e) for name, e in self._files.items()}
+
+    def lookup(self, digest: str):
+        with self._lock:
+            self.refresh()
+            return sorted(self._by_hash.get(digest, ()))
+
+    def hash_of(self, name: str):
+        with self._lock:
+            self.refresh()
+            entry = self._files.get(name)
+            return entry["hash"] if entry else None
+
+    def exists(self, name: str) -> bool:
+        return self.hash_of(name) is not None
+
+    def path_of(self, name: str) -> str:
+        return f"{self.path}#{name}"
+
+    def read(self, name: str) -> bytes:
+        with self._lock:
+            self.refresh()
+            entry = self._files.get(name)
+            if entry is None:
+                raise KeyError(name)
+            return self._map[entry["offset"]:entry["offset"] + entry["size"]]
+
+    def read_all(self) -> dict:
+        with self._lock:
+            self.refresh()
+            data = self._map[:self._end]
+            return {
+                name: data[e["offset"]:e["offset"] + e["size"]]
+                for name, e in sorted(self._files.items())
+            }
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+
+    def add(self, name: str, data: bytes, overwrite: bool = False):
+        self.add_many({name: data}, overwrite=overwrite)
+
+    def add_many(self, files: dict, overwrite: bool = False):
+        for name in files:
+            _check_name(name)
+
+        with self._lock:
+            self._open()
+            with self._locked():
+                self._replay()
+                if not overwrite:
+                    for name in files:
+                        if name in self._files:
+                            raise EDIDError(f"Filename already exists: {name}")
+                self._append([
+                    (OP_PUT, name, data) for name, data in files.items()
+                ])
+
+    def remove(self, name: str):
+        with self._lock:
+            self._open()
+            with self._locked():
+                self._replay()
+                if name in self._files:
+                    self._append([(OP_DELETE, name, b"")])
+
+    def refresh(self, force: bool = False):
+        """
+        Pick up records appended by other processes.
+        """
+        with self._lock:
+            self._open()
+            if force or os.fstat(self._fd).st_size != self._end:
+                with self._locked():
+                    self._replay()
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+
+    def _open(self):
+        if self._fd is not None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        created = not self.path.exists()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        with self._locked():
+            if os.fstat(self._fd).st_size == 0:
+                os.write(self._fd, PACK_MAGIC)
+            self._load_index()
+            self._replay()
+            if created:
+                self._seed_from_directory()
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _remap(self):
+        size = os.fstat(self._fd).st_size
+        if self._map is not None and len(self._map) == size:
+            return
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+
+    def _load_index(self):
+        try:
+            raw = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return
+        if raw.get("version") != PACK_INDEX_VERSION:
+            return
+        if raw.get("pack_size", 0) > os.fstat(self._fd).st_size:
+            return  # pack was truncated or replaced: replay it all
+
+        try:
+            for name, e in raw["files"].items():
+                self._set(name, e["offset"], e["size"], e["hash"])
+            self._end = raw["pack_size"]
+        except (KeyError, TypeError, AttributeError):
+            self._files.clear()
+            self._by_hash.clear()
+            self._end = 0
+
+    def _save_index(self):
+        payload = {
+            "version": PACK_INDEX_VERSION,
+            "pack_size": self._end,
+            "files": self._files,
+        }
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, sort_keys=True))
+            os.replace(tmp, self.index_path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def _replay(self):
+        """
+        Apply records between the indexed end and the end of the pack.
+        A torn record at the tail (interrupted append) is cut off.
+        """
+        self._remap()
+        size = len(self._map)
+        if self._end == 0:
+            if self._map[:len(PACK_MAGIC)] != PACK_MAGIC:
+                raise EDIDError(f"Not an EDID pack: {self.path}")
+            self._end = len(PACK_MAGIC)
+
+        pos = self._end
+        changed = False
+        while pos + _RECORD.size <= size:
+            op, name_len, data_len, digest = _RECORD.unpack_from(self._map, pos)
+            start = pos + _RECORD.size + name_len
+            end = start + data_len
+            if op not in (OP_PUT, OP_DELETE) or end > size:
+                break
+            name = self._map[pos + _RECORD.size:start].decode("utf-8", "replace")
+            if op == OP_PUT:
+                self._set(name, start, data_len, digest.hex())
+            else:
+                self._drop(name)
+            pos = end
+            changed = True
+
+        if pos < size:
+            os.ftruncate(self._fd, pos)
+            self._remap()
+
+        self._end = pos
+        if changed:
+            self._save_index()
+
+    def _append(self, records):
+        chunks = []
+        for op, name, data in records:
+            raw_name = name.encode("utf-8")
+            digest = hashlib.sha256(data).digest()
+            chunks.append(_RECORD.pack(op, len(raw_name), len(data), digest))
+            chunks.append(raw_name)
+            chunks.append(data)
+
+        os.lseek(self._fd, self._end, os.SEEK_SET)
+        os.write(self._fd, b"".join(chunks))
+        os.fsync(self._fd)
+        self._replay()
+
+    def _seed_from_directory(self):
+        """
+        First use of a pack in an existing library: import the .bin files.
+        """
+        records = []
+        for path in sorted(self.directory.glob("*.bin")):
+            try:
+                records.append((OP_PUT, path.name, path.read_bytes()))
+            except OSError:
+                continue
+        if records:
+            self._append(records)
+
+    def _set(self, name, offset, size, digest):
+        self._drop(name)
+        self.generation += 1
+        self._files[name] = {"offset": offset, "size": size, "hash": digest}
+        self._by_hash.setdefault(digest, set()).add(name)
+
+    def _drop(self, name):
+        entry = self._files.pop(name, None)
+        if not entry:
+            return
+        self.generation += 1
+        names = self._by_hash.get(entry["hash"])
+        if names:
+            names.discard(name)
+            if not names:
+                del self._by_hash[entry["hash"]]
+
+
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+
+def open_library(directory, backend: str = None):
+    """
+    Return the shared library for a directory (one per process).
+    backend defaults to $EDID_LIBRARY_BACKEND, then "dir".
+    """
+    backend = backend or os.environ.get(LIBRARY_BACKEND_ENV) or "dir"
+    if backend not in BACKENDS:
+        raise EDIDError(f"Unknown EDID library backend: {backend}")
+
+    key = (os.path.abspath(directory), backend)
+    with _libraries_lock:
+        library = _libraries.get(key)
+        if library is None:
+            cls = PackLibrary if backend == "pack" else DirectoryLibrary
+            library = _libraries[key] = cls(key[0])
+        return library
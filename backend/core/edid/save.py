@@ -4,7 +4,8 @@ from typing import Optional
 
 from .checksum import validate_checksum, validate_edid
 from .compare import find_matching_edid
-from .exceptions import EDIDWriteError
+from .exceptions import EDIDError, EDIDWriteError
+from .library import open_library
 
 
 _SAFE_NAME_RE = re.compile(r"[^a-zA-Z0-9._-]+")
@@ -55,16 +56,15 @@ def save_edid(
     # ---- Filename handling ----
     safe = sanitize_filename(name)
     filename = ensure_bin_extension(safe)
-    path = os.path.join(directory, filename)
+    library = open_library(directory)
 
-    if os.path.exists(path) and not overwrite:
+    if library.exists(filename) and not overwrite:
         raise EDIDWriteError(f"Filename already exists: {filename}")
 
     # ---- Write file ----
     try:
-        with open(path, "wb") as f:
-            f.write(edid)
-    except OSError as e:
+        library.add(filename, edid, overwrite=overwrite)
+    except (OSError, EDIDError) as e:
         raise EDIDWriteError(f"Failed to write EDID: {e}") from e
 
-    return path
+    return library.path_of(filename)
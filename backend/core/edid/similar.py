@@ -0,0 +1,300 @@
+import heapq
+import json
+import os
+import threading
+from pathlib import Path
+
+from .compare import edid_hash
+from .decode import decode_edid
+from .exceptions import EDIDError
+from .library import open_library
+
+FEATURES_FILENAME = ".edid_features.json"
+FEATURES_VERSION = 1
+
+METRICS = ("field", "hamming")
+
+# Largest k a search returns
+MAX_K = 50
+
+# Field-aware distance weights (sum to 1.0). Serial number, date and
+# checksum are deliberately ignored: they differ between units of the
+# same monitor model.
+W_MANUFACTURER = 0.30
+W_PRODUCT_CODE = 0.20
+W_PRODUCT_NAME = 0.10
+W_TIMINGS = 0.25
+W_BLOCKS = 0.15
+
+
+def _timing_token(t: dict) -> str:
+    scan = "i" if t.get("interlaced") else "p"
+    return f"{t['width']}x{t['height']}{scan}@{round(t['refresh_hz'])}"
+
+
+def extract_features(edid: bytes) -> dict:
+    """
+    Comparable features of one EDID: identity fields plus the set of
+    supported timings and extension data blocks.
+    """
+    decoded = decode_edid(edid)
+    base = decoded["base"]
+
+    timings = set()
+    for t in (
+        base["established_timings"]
+        + base["standard_timings"]
+        + base["detailed_timings"]
+    ):
+        timings.add(_timing_token(t))
+
+    blocks = set()
+    for ext in decoded["extensions"]:
+        blocks.add(f"ext:{ext['type']}")
+        for t in ext.get("detailed_timings", ()):
+            timings.add(_timing_token(t))
+        for block in ext.get("data_blocks", ()):
+            name = block.get("name") or block["type"]
+            if block.get("oui"):
+                name = f"{name}:{block['oui']}"
+            blocks.add(f"{ext['type']}:{name}")
+            for mode in block.get("modes", ()):
+                if "width" in mode:
+                    timings.add(_timing_token(mode))
+
+    return {
+        "manufacturer": base["manufacturer"],
+        "product_code": base["product_code"],
+        "product_name": base["product_name"],
+        "timings": sorted(timings),
+        "blocks": sorted(blocks),
+    }
+
+
+def hamming_distance(a: int, a_len: int, b: int, b_len: int) -> int:
+    """
+    Bit distance between two byte strings held as big-endian ints.
+    Bytes present in only one of them count as fully different.
+    """
+    n = min(a_len, b_len)
+    x = (a >> (8 * (a_len - n))) ^ (b >> (8 * (b_len - n)))
+    return x.bit_count() + 8 * abs(a_len - b_len)
+
+
+class FeatureIndex:
+    """
+    Precomputed features for every EDID in a library directory.
+
+    Features are keyed by content hash and persisted next to the content
+    index, so each EDID is read and decoded once. Token sets are encoded
+    as bitmasks over a shared vocabulary, which makes the Jaccard terms
+    of the distance two popcounts.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.path = self.directory / FEATURES_FILENAME
+        self._content = open_library(directory)
+        self._lock = threading.Lock()
+        self._features = {}      # hash -> features (+ "raw" hex)
+        self._loaded = False
+        self._vocab = {}         # token -> bit
+        self._rows = []
+        self._generation = None
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            raw = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if raw.get("version") == FEATURES_VERSION:
+            self._features = raw.get("features", {})
+
+    def _save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps({
+                "version": FEATURES_VERSION,
+                "features": self._features,
+            }))
+            os.replace(tmp, self.path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def _mask(self, tokens, grow: bool):
+        mask = 0
+        unknown = 0
+        for token in tokens:
+            bit = self._vocab.get(token)
+            if bit is None:
+                if not grow:
+                    unknown += 1
+                    continue
+                bit = self._vocab[token] = len(self._vocab)
+            mask |= 1 << bit
+        return mask, unknown
+
+    def _sync(self):
+        self._load()
+        self._content.refresh()
+        if self._generation == self._content.generation:
+            return
+
+        entries = self._content.entries()
+
+        added = False
+        for name, entry in entries.items():
+            digest = entry["hash"]
+            if digest in self._features:
+                continue
+            try:
+                data = self._content.read(name)
+                features = extract_features(data)
+            except (KeyError, OSError, ValueError, IndexError):
+                continue
+            features["raw"] = data.hex()
+            self._features[digest] = features
+            added = True
+
+        live = {e["hash"] for e in entries.values()}
+        stale = set(self._features) - live
+        for digest in stale:
+            del self._features[digest]
+
+        if added or stale:
+            self._save()
+
+        rows = []
+        for name, entry in sorted(entries.items()):
+            f = self._features.get(entry["hash"])
+            if f is None:
+                continue
+            raw = bytes.fromhex(f["raw"])
+            rows.append((
+                name,
+                entry["hash"],
+                f["manufacturer"],
+                f["product_code"],
+                f["product_name"],
+                self._mask(f["timings"], grow=True)[0],
+                self._mask(f["blocks"], grow=True)[0],
+                int.from_bytes(raw, "big"),
+                len(raw),
+            ))
+
+        self._rows = rows
+        self._generation = self._content.generation
+
+    # ----------------------------
+    # Query
+    # ----------------------------
+
+    def search(self, edid: bytes, k: int = 5, metric: str = "field",
+               exclude_exact: bool = True):
+        if metric not in METRICS:
+            raise EDIDError(f"Unknown similarity metric: {metric}")
+        if not 1 <= k <= MAX_K:
+            raise EDIDError(f"k must be between 1 and {MAX_K}")
+
+        with self._lock:
+            self._sync()
+            rows = self._rows
+            target = edid_hash(edid) if exclude_exact else None
+
+            if metric == "hamming":
+                q_raw = int.from_bytes(edid, "big")
+                q_len = len(edid)
+                scored = (
+                    (hamming_distance(row[7], row[8], q_raw, q_len), row)
+                    for row in rows
+                    if row[1] != target
+                )
+            else:
+                q = extract_features(edid)
+                q_tm, q_tm_extra = self._mask(q["timings"], grow=False)
+                q_bm, q_bm_extra = self._mask(q["blocks"], grow=False)
+                scored = (
+                    (
+                        self._field_distance(
+                            row, q, q_tm, q_tm_extra, q_bm, q_bm_extra
+                        ),
+                        row,
+                    )
+                    for row in rows
+                    if row[1] != target
+                )
+
+            best = heapq.nsmallest(k, scored, key=lambda s: (s[0], s[1][0]))
+
+        results = []
+        for distance, row in best:
+            item = {
+                "filename": row[0],
+                "path": self._content.path_of(row[0]),
+                "hash": row[1],
+                "exact": False,
+                "metric": metric,
+                "distance": round(distance, 4) if metric == "field" else distance,
+            }
+            if metric == "field":
+                item["similarity"] = round(1.0 - distance, 4)
+            else:
+                bits = 8 * max(row[8], len(edid))
+                item["similarity"] = round(1.0 - distance / bits, 4)
+            results.append(item)
+        return results
+
+    @staticmethod
+    def _field_distance(row, q, q_tm, q_tm_extra, q_bm, q_bm_extra):
+        d = 0.0
+        if row[2] != q["manufacturer"]:
+            d += W_MANUFACTURER
+        if row[3] != q["product_code"]:
+            d += W_PRODUCT_CODE
+        if row[4] != q["product_name"]:
+            d += W_PRODUCT_NAME
+
+        union = (row[5] | q_tm).bit_count() + q_tm_extra
+        if union:
+            d += W_TIMINGS * (1 - (row[5] & q_tm).bit_count() / union)
+
+        union = (row[6] | q_bm).bit_count() + q_bm_extra
+        if union:
+            d += W_BLOCKS * (1 - (row[6] & q_bm).bit_count() / union)
+
+        return d
+
+
+_feature_indexes = {}
+_feature_indexes_lock = threading.Lock()
+
+
+def get_feature_index(directory) -> FeatureIndex:
+    key = os.path.abspath(directory)
+    with _feature_indexes_lock:
+        index = _feature_indexes.get(key)
+        if index is None:
+            index = _feature_indexes[key] = FeatureIndex(key)
+        return index
+
+
+def find_similar_edid(edid: bytes, directory, k: int = 5,
+                      metric: str = "field"):
+    """
+    Return the k nearest EDIDs in directory, excluding exact matches.
+
+    metric="field"   -> weighted distance over manufacturer, product,
+                        timings and extension blocks (0.0 .. 1.0)
+    metric="hamming" -> raw bit distance
+    """
+    if not edid or len(edid) < 128:
+        raise EDIDError("Invalid EDID supplied for comparison")
+
+    return get_feature_index(directory).search(edid, k=k, metric=metric)
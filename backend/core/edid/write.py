@@ -1,55 +1,281 @@
+import threading
 import time
 from smbus import SMBus
 
+from backend.core.metrics import (
+    edid_write_phase_seconds,
+    i2c_bytes,
+    i2c_naks,
+    i2c_transactions,
+)
+
 from .checksum import validate_edid
-from .diff import diff_edid
-from .exceptions import EDIDWriteError
-from .i2c import EDID_I2C_ADDR, find_ddc_i2c_buses, read_edid_i2c
+from .diff import diff_edid, diff_offsets
+from .exceptions import EDIDError, EDIDWriteError
+from .i2c import (
+    EDID_I2C_ADDR,
+    bus_lock,
+    find_ddc_i2c_buses,
+    read_edid_i2c,
+    read_i2c_range,
+)
+
+# 24C02-style EEPROMs use 8-byte pages; 16-byte-page parts accept 8-byte
+# aligned writes too, so 8 is the safe default.
+EEPROM_PAGE_SIZE = 8
+
+# Datasheet tWR is 5-10 ms; give slow clones some headroom
+EEPROM_WRITE_TIMEOUT = 0.1
+ACK_POLL_INTERVAL = 0.0005
+
+_stats_lock = threading.Lock()
+_write_stats = {}
+
+
+def _poll(smb, bus: int):
+    """
+    One address probe (read_byte); raises OSError on NAK.
+    """
+    i2c_transactions.inc(bus=bus, op="poll")
+    try:
+        smb.read_byte(EDID_I2C_ADDR)
+    except OSError:
+        i2c_naks.inc(bus=bus)
+        raise
+
+
+def _wait_write_cycle(smb, bus: int, timeout: float = EEPROM_WRITE_TIMEOUT) -> int:
+    """
+    ACK polling: the EEPROM NAKs its address while the internal write
+    cycle runs. Returns the number of NAKed polls.
+    """
+    deadline = time.monotonic() + timeout
+    polls = 0
+    while True:
+        try:
+            _poll(smb, bus)
+            return polls
+        except OSError:
+            polls += 1
+            if time.monotonic() > deadline:
+                raise EDIDWriteError(
+                    f"EEPROM write cycle did not finish within {timeout * 1000:.0f} ms"
+                )
+            time.sleep(ACK_POLL_INTERVAL)
+
+
+def _write_page(smb, bus: int, offset: int, data: bytes):
+    i2c_transactions.inc(bus=bus, op="write")
+    try:
+        if len(data) == 1:
+            smb.write_byte_data(EDID_I2C_ADDR, offset, data[0])
+        else:
+            smb.write_i2c_block_data(EDID_I2C_ADDR, offset, list(data))
+    except OSError:
+        i2c_naks.inc(bus=bus)
+        raise
+    i2c_bytes.inc(len(data), bus=bus, direction="write")
+
+
+def _page_runs(offsets, page_size: int):
+    """
+    Merge page start offsets into contiguous (start, length) runs.
+    """
+    runs = []
+    for offset in offsets:
+        if runs and runs[-1][0] + runs[-1][1] == offset:
+            runs[-1][1] += page_size
+        else:
+            runs.append([offset, page_size])
+    return [tuple(r) for r in runs]
+
+
+def _record_stats(model: str, timing: dict):
+    with _stats_lock:
+        stats = _write_stats.setdefault(model, {
+            "writes": 0,
+            "bytes": 0,
+            "pages": 0,
+            "total_s": 0.0,
+            "max_page_ms": 0.0,
+        })
+        stats["writes"] += 1
+        stats["bytes"] += timing["bytes"]
+        stats["pages"] += len(timing["pages"])
+        stats["total_s"] += timing["total_ms"] / 1000
+        stats["max_page_ms"] = max(stats["max_page_ms"], timing["max_page_ms"])
+
+
+def get_write_stats() -> dict:
+    """
+    Write throughput aggregated per emulator model.
+    """
+    with _stats_lock:
+        return {
+            model: {
+                **stats,
+                "bytes_per_sec": (
+                    round(stats["bytes"] / stats["total_s"], 1)
+                    if stats["total_s"] else None
+                ),
+                "mean_page_ms": (
+                    round(stats["total_s"] * 1000 / stats["pages"], 3)
+                    if stats["pages"] else None
+                ),
+            }
+            for model, stats in _write_stats.items()
+        }
 
 
 def write_edid_i2c(
     edid: bytes,
     bus: int,
     verify: bool = True,
-    sleep: float = 0.01,
+    sleep: float = None,
     force: bool = False,
+    page_size: int = EEPROM_PAGE_SIZE,
+    model: str = None,
+    delta: bool = False,
+    progress=None,
 ):
+    """
+    Program the first 128 bytes of an EDID EEPROM.
+
+    page_size=8/16 writes whole EEPROM pages per transaction; page_size=1
+    writes byte by byte. After each page the EEPROM is ACK-polled until
+    its write cycle finishes, unless a fixed sleep (seconds) is given.
+    Per-page timing is returned and aggregated per model.
+
+    delta=True reads the current contents first and only writes (and
+    verifies) the pages that differ.
+
+    progress, if given, is called as progress(bytes_done, bytes_total)
+    after each page. The whole operation holds the bus lock.
+    """
+    with bus_lock(bus, EDIDWriteError):
+        return _write_edid_i2c(
+            edid, bus, verify, sleep, force, page_size, model, delta, progress
+        )
+
+
+def _write_edid_i2c(edid, bus, verify, sleep, force, page_size, model,
+                    delta, progress):
     if bus is None:
         raise EDIDWriteError("Explicit I2C bus required")
 
-    if not force and not validate_edid(edid):
-        raise EDIDWriteError("Invalid EDID supplied")
+    if not force:
+        try:
+            validate_edid(edid)
+        except EDIDError:
+            raise EDIDWriteError("Invalid EDID supplied")
 
     if len(edid) < 128:
         raise EDIDWriteError("EDID too short")
 
+    if page_size < 1 or 128 % page_size:
+        raise EDIDWriteError(f"Unsupported page size: {page_size}")
+
+    data = edid[:128]
+    pages = []
+    dirty = list(range(0, len(data), page_size))
+    changed_bytes = None
+    delta_applied = False
+
+    if delta:
+        try:
+            with edid_write_phase_seconds.time(phase="delta_read"):
+                current = read_i2c_range(bus, 0, len(data))
+        except OSError:
+            current = None  # unreadable: fall back to a full write
+
+        if current is not None:
+            changed = diff_offsets(data, current)
+            changed_bytes = len(changed)
+            dirty = sorted({o - o % page_size for o in changed})
+            delta_applied = True
+
     try:
         smb = SMBus(bus)          # ← OPEN BUS HERE
         try:
             # Presence check
-            smb.read_byte(EDID_I2C_ADDR)
+            _poll(smb, bus)
+
+            started = time.perf_counter()
+            for offset in dirty:
+                t0 = time.perf_counter()
+                _write_page(smb, bus, offset, data[offset:offset + page_size])
 
-            for i, byte in enumerate(edid[:128]):
-                smb.write_byte_data(EDID_I2C_ADDR, i, byte)
-                time.sleep(sleep)
+                if sleep is not None:
+                    time.sleep(sleep)
+                    polls = 0
+                else:
+                    polls = _wait_write_cycle(smb, bus)
+
+                pages.append({
+                    "offset": offset,
+                    "length": page_size,
+                    "write_ms": round((time.perf_counter() - t0) * 1000, 3),
+                    "polls": polls,
+                })
+                if progress:
+                    progress(len(pages) * page_size, len(dirty) * page_size)
+            total_ms = (time.perf_counter() - started) * 1000
+            edid_write_phase_seconds.observe(total_ms / 1000, phase="program")
 
         finally:
             smb.close()           # ← CLOSE BUS **HERE** (ALWAYS)
 
+        written = len(dirty) * page_size
+
+        verified = False
         if verify:
-            result = read_edid_i2c(
-                bus=bus,
-                length=128,
-                strict=False
+            verify_started = time.perf_counter()
+            if delta_applied:
+                # Delta: only the pages just written need reading back
+                observed = bytearray(data)
+                for start, length in _page_runs(dirty, page_size):
+                    observed[start:start + length] = read_i2c_range(
+                        bus, start, length
+                    )
+            else:
+                observed = read_edid_i2c(
+                    bus=bus,
+                    length=len(data),
+                    strict=False
+                )["edid"]
+
+            mismatch = diff_edid(data, bytes(observed))
+            if not mismatch["identical"]:
+                raise EDIDWriteError(
+                    "Verification failed: " + ", ".join(mismatch["fields"])
+                )
+            verified = True
+            edid_write_phase_seconds.observe(
+                time.perf_counter() - verify_started, phase="verify"
             )
-            if diff_edid(edid[:128], result["edid"]):
-                raise EDIDWriteError("Verification failed")
+
+        timing = {
+            "bytes": written,
+            "pages": pages,
+            "page_size": page_size,
+            "total_ms": round(total_ms, 3),
+            "max_page_ms": max((p["write_ms"] for p in pages), default=0.0),
+            "bytes_per_sec": round(written / (total_ms / 1000), 1) if total_ms else None,
+        }
+        if pages:
+            _record_stats(model or "unspecified", timing)
 
         return {
             "bus": bus,
-            "bytes_written": 128
+            "bytes_written": written,
+            "bytes_skipped": len(data) - written,
+            "bytes_changed": changed_bytes,
+            "delta": delta_applied,
+            "verified": verified,
+            "timing": timing,
         }
 
+    except EDIDWriteError:
+        raise
     except Exception as e:
         raise EDIDWriteError(str(e))
-
@@ -1,44 +1,75 @@
-from .drm import is_connector_connected
+from backend.core.metrics import edid_write_phase_seconds, i2c_retries
+
+from .hotplug import connector_monitor
 from .i2c import find_ddc_i2c_buses
 from .exceptions import EDIDWriteError
-from .write import write_edid_i2c
+from .write import EEPROM_PAGE_SIZE, write_edid_i2c
 
 
 def write_edid_for_connector(
     connector: str,
     edid: bytes,
     verify: bool = True,
-    sleep: float = 0.01,
+    sleep: float = None,
     force: bool = False,
+    page_size: int = EEPROM_PAGE_SIZE,
+    model: str = None,
+    delta: bool = False,
+    progress=None,
 ):
     # DRM sanity check ONLY
-    if not is_connector_connected(connector):
+    if not connector_monitor.is_connected(connector):
         raise EDIDWriteError(f"{connector} is not connected")
 
-    buses = find_ddc_i2c_buses()
+    def write(bus):
+        result = write_edid_i2c(
+            edid=edid,
+            bus=bus,
+            verify=verify,
+            sleep=sleep,
+            force=force,
+            page_size=page_size,
+            model=model,
+            delta=delta,
+            progress=progress,
+        )
+
+        # Augment result with connector + verification context
+        return {
+            "connector": connector,
+            "bus": result["bus"],
+            "bytes_written": result["bytes_written"],
+            "bytes_skipped": result["bytes_skipped"],
+            "delta": result["delta"],
+            "verified_i2c": result.get("verified", False),
+            "verified_drm": True,  # DRM re-read is authoritative
+            "timing": result["timing"],
+        }
+
+    # Known bus (sysfs ddc link or an earlier probe): touch only that bus
+    bus = connector_monitor.ddc_bus(connector)
+    if bus is not None:
+        try:
+            return write(bus)
+        except EDIDWriteError:
+            connector_monitor.forget_ddc_bus(connector)
+            raise
+
+    # Fallback: probe every /dev/i2c-* for something answering at 0x50
+    with edid_write_phase_seconds.time(phase="discovery"):
+        buses = find_ddc_i2c_buses()
     if not buses:
         raise EDIDWriteError("No DDC I2C buses found")
 
     last_error = None
 
     for bus in buses:
+        if last_error is not None:
+            i2c_retries.inc(bus=bus)
         try:
-            result = write_edid_i2c(
-                edid=edid,
-                bus=bus,
-                verify=verify,
-                sleep=sleep,
-                force=force,
-            )
-
-            # Augment result with connector + verification context
-            return {
-                "connector": connector,
-                "bus": result["bus"],
-                "bytes_written": result["bytes_written"],
-                "verified_i2c": result.get("verified", False),
-                "verified_drm": True,  # DRM re-read is authoritative
-            }
+            result = write(bus)
+            connector_monitor.remember_ddc_bus(connector, bus)
+            return result
 
         except EDIDWriteError as e:
             last_error = e
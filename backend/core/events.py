@@ -0,0 +1,53 @@
+import json
+import queue
+import threading
+
+
+class EventBus:
+    """
+    In-process publish/subscribe used to push state changes to browsers
+    (Server-Sent Events). Each subscriber gets its own bounded queue; a
+    subscriber that stops reading loses old events rather than blocking
+    publishers.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._maxsize = maxsize
+
+    def subscribe(self, topics=None):
+        q = queue.Queue(maxsize=self._maxsize)
+        with self._lock:
+            self._subscribers.append((q, set(topics) if topics else None))
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers = [
+                (sub, topics) for sub, topics in self._subscribers
+                if sub is not q
+            ]
+
+    def publish(self, topic: str, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for q, topics in subscribers:
+            if topics is not None and topic not in topics:
+                continue
+            try:
+                q.put_nowait((topic, data))
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                    q.put_nowait((topic, data))
+                except (queue.Empty, queue.Full):
+                    pass
+
+
+def format_sse(topic: str, data) -> str:
+    return f"event: {topic}\ndata: {json.dumps(data)}\n\n"
+
+
+event_bus = EventBus()
@@ -0,0 +1,377 @@
+"""
+Prometheus-format metrics.
+
+Counters and histograms are kept in plain dicts behind one lock, so an
+update costs a dict lookup and an add. Rendered as text exposition
+format 0.0.4 at /metrics.
+
+Under gunicorn several processes record metrics (web workers and the
+hardware owner). When METRICS_DIR is set each process writes a snapshot
+there every FLUSH_SECONDS, and /metrics adds the snapshots of the other
+live processes to its own values.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+
+METRICS_DIR_ENV = "METRICS_DIR"
+FLUSH_SECONDS = 5.0
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics = {}
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 3)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+def _register(metric):
+    with _lock:
+        existing = _metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        _metrics[metric.name] = metric
+    _start_flusher()
+    return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+# ----------------------------
+# Cross-process snapshots
+# ----------------------------
+
+_flusher = None
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+def _snapshot():
+    with _lock:
+        return {
+            name: [[list(key), _copy(value)] for key, value in m._values.items()]
+            for name, m in _metrics.items()
+        }
+
+
+def _snapshot_path(directory, pid):
+    return os.path.join(directory, f"metrics-{pid}.json")
+
+
+def _flush(directory):
+    path = _snapshot_path(directory, os.getpid())
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(_snapshot(), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _flush_loop(directory):
+    while True:
+        time.sleep(FLUSH_SECONDS)
+        _flush(directory)
+
+
+def _start_flusher():
+    global _flusher
+    directory = os.environ.get(METRICS_DIR_ENV)
+    if not directory:
+        return
+    with _lock:
+        # A forked child inherits the variable but not the thread
+        if _flusher is not None and _flusher[0] == os.getpid():
+            return
+        thread = threading.Thread(
+            target=_flush_loop, args=(directory,), name="metrics-flush", daemon=True
+        )
+        _flusher = (os.getpid(), thread)
+    os.makedirs(directory, exist_ok=True)
+    thread.start()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _other_snapshots():
+    directory = os.environ.get(METRICS_DIR_ENV)
+    if not directory:
+        return []
+
+    snapshots = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+
+    for name in names:
+        if not (name.startswith("metrics-") and name.endswith(".json")):
+            continue
+        try:
+            pid = int(name[len("metrics-"):-len(".json")])
+        except ValueError:
+            continue
+        if pid == os.getpid():
+            continue
+        path = os.path.join(directory, name)
+        if not _pid_alive(pid):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+# ----------------------------
+# Exposition
+# ----------------------------
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _merged(metric, values, others):
+    for snapshot in others:
+        for key, value in snapshot.get(metric.name, ()):
+            key = tuple(key)
+            if isinstance(value, list):
+                if key not in values:
+                    values[key] = [0] * len(value)
+                if len(values[key]) == len(value):
+                    values[key] = [a + b for a, b in zip(values[key], value)]
+            else:
+                values[key] = values.get(key, 0) + value
+    return values
+
+
+def render() -> str:
+    """
+    All metrics in Prometheus text format, summed across processes.
+    """
+    others = _other_snapshots()
+    with _lock:
+        metrics = [
+            (m, {key: _copy(v) for key, v in m._values.items()})
+            for m in _metrics.values()
+        ]
+
+    lines = []
+    for metric, own in sorted(metrics, key=lambda item: item[0].name):
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        values = _merged(metric, own, others)
+
+        for key in sorted(values):
+            value = values[key]
+            if metric.kind == "counter":
+                lines.append(f"{metric.name}{_labels(metric.labelnames, key)} {_number(value)}")
+                continue
+
+            cumulative = 0
+            bounds = list(metric.buckets) + [math.inf]
+            for bound, count in zip(bounds, value):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else repr(float(bound))
+                lines.append(
+                    f"{metric.name}_bucket"
+                    f"{_labels(metric.labelnames, key, ('le', le))} {cumulative}"
+                )
+            lines.append(f"{metric.name}_sum{_labels(metric.labelnames, key)} {_number(value[-2])}")
+            lines.append(f"{metric.name}_count{_labels(metric.labelnames, key)} {value[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    """
+    Record every request in http_request_duration_seconds.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_time(response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            rule = request.url_rule.rule if request.url_rule else "unmatched"
+            http_request_seconds.observe(
+                time.perf_counter() - start,
+                method=request.method, route=rule, status=response.status_code,
+            )
+        return response
+
+
+# ----------------------------
+# Metrics used across the app
+# ----------------------------
+
+http_request_seconds = histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response, by route template.",
+    ("method", "route", "status"),
+)
+
+i2c_transactions = counter(
+    "i2c_transactions_total",
+    "I2C transactions issued, by bus and operation (read, write, poll).",
+    ("bus", "op"),
+)
+i2c_bytes = counter(
+    "i2c_bytes_total",
+    "Payload bytes moved over I2C, by bus and direction.",
+    ("bus", "direction"),
+)
+i2c_naks = counter(
+    "i2c_naks_total",
+    "I2C transactions that failed (NAK or adapter error), by bus.",
+    ("bus",),
+)
+i2c_retries = counter(
+    "i2c_retries_total",
+    "Read method fallbacks and write retries on another bus, by bus.",
+    ("bus",),
+)
+edid_write_phase_seconds = histogram(
+    "edid_write_phase_seconds",
+    "Time spent in each phase of an EDID write.",
+    ("phase",),
+)
+
+pattern_process_starts = counter(
+    "pattern_process_starts_total",
+    "Pattern pipelines (in-process or gst-launch children) started, by connector.",
+    ("connector",),
+)
+pattern_process_restarts = counter(
+    "pattern_process_restarts_total",
+    "Pattern pipelines replaced or found dead and restarted, by connector.",
+    ("connector",),
+)
+pattern_process_lifetime_seconds = histogram(
+    "pattern_process_lifetime_seconds",
+    "How long pattern pipelines ran.",
+    ("connector",),
+    buckets=(1, 10, 60, 300, 900, 3600, 4 * 3600, 24 * 3600),
+)
+pattern_frames = counter(
+    "pattern_frames_total",
+    "Test-pattern frame lookups, by result (hit: served from cache, miss: rendered).",
+    ("result",),
+)
+
+edid_bytes_hashed = counter(
+    "edid_bytes_hashed_total",
+    "Bytes read for content hashing, by source (library, usb).",
+    ("source",),
+)
+usb_bytes_copied = counter(
+    "usb_bytes_copied_total",
+    "EDID bytes copied between a USB stick and the library, by direction.",
+    ("direction",),
+)
@@ -0,0 +1,189 @@
+import os
+import select
+import threading
+import time
+
+from backend.core.events import event_bus
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+SYS_DEV_BLOCK = "/sys/dev/block"
+
+# Used only when mountinfo cannot be polled for changes
+FALLBACK_POLL_SECONDS = 5.0
+
+
+def _unescape(field: str) -> str:
+    """
+    mountinfo escapes space, tab, newline and backslash as \\ooo.
+    """
+    if "\\" not in field:
+        return field
+    out = []
+    i = 0
+    while i < len(field):
+        if field[i] == "\\" and field[i + 1:i + 4].isdigit():
+            out.append(chr(int(field[i + 1:i + 4], 8)))
+            i += 4
+        else:
+            out.append(field[i])
+            i += 1
+    return "".join(out)
+
+
+def parse_mountinfo(text: str):
+    """
+    Parse /proc/self/mountinfo lines:
+    id parent major:minor root mount_point options [optional...] - fstype source super_options
+    """
+    mounts = []
+    for line in text.splitlines():
+        fields = line.split()
+        try:
+            sep = fields.index("-")
+        except ValueError:
+            continue
+        if sep < 6 or len(fields) < sep + 3:
+            continue
+        mounts.append({
+            "device": fields[2],
+            "root": _unescape(fields[3]),
+            "mount_point": _unescape(fields[4]),
+            "options": fields[5],
+            "fstype": fields[sep + 1],
+            "source": _unescape(fields[sep + 2]),
+        })
+    return mounts
+
+
+def is_removable(device: str) -> bool:
+    """
+    True if the block device major:minor is removable media or sits on
+    USB. Partitions inherit the answer from their parent disk.
+    """
+    try:
+        path = os.path.realpath(os.path.join(SYS_DEV_BLOCK, device))
+    except OSError:
+        return False
+    if not os.path.isdir(path):
+        return False
+
+    if "/usb" in path:
+        return True
+
+    disk = path
+    if os.path.exists(os.path.join(path, "partition")):
+        disk = os.path.dirname(path)
+    try:
+        with open(os.path.join(disk, "removable")) as f:
+            return f.read().strip() == "1"
+    except OSError:
+        return False
+
+
+def _scan():
+    with open(MOUNTINFO_PATH) as f:
+        mounts = parse_mountinfo(f.read())
+
+    removable = []
+    seen = set()
+    for m in mounts:
+        if not m["source"].startswith("/dev/") or m["root"] != "/":
+            continue
+        if m["mount_point"] in seen or not is_removable(m["device"]):
+            continue
+        seen.add(m["mount_point"])
+        removable.append({
+            "path": m["mount_point"],
+            "name": os.path.basename(m["mount_point"]) or m["mount_point"],
+            "device": m["source"],
+            "fstype": m["fstype"],
+            "read_only": "ro" in m["options"].split(","),
+        })
+
+    return sorted(removable, key=lambda m: m["path"])
+
+
+class MountMonitor:
+    """
+    Keeps the list of mounted removable block devices in memory.
+
+    The kernel flags /proc/self/mountinfo with POLLPRI whenever the mount
+    table changes, so the list is only rebuilt on an actual mount or
+    unmount, and pushed to the event bus as a "usb" event.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._mounts = []
+        self._thread = None
+        self._last_scan = None
+
+    def mounts(self):
+        self.start()
+        with self._lock:
+            return [dict(m) for m in self._mounts]
+
+    def status(self):
+        with self._lock:
+            return {
+                "running": bool(self._thread and self._thread.is_alive()),
+                "last_scan": self._last_scan,
+                "mounts": len(self._mounts),
+            }
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+
+            self._safe_rescan(publish=False)
+
+            thread = threading.Thread(
+                target=self._run, name="usb-mounts", daemon=True
+            )
+            thread.start()
+            with self._lock:
+                self._thread = thread
+
+    def rescan(self, publish: bool = True) -> bool:
+        mounts = _scan()
+
+        with self._lock:
+            changed = mounts != self._mounts
+            self._mounts = mounts
+            self._last_scan = time.time()
+
+        if changed and publish:
+            event_bus.publish("usb", mounts)
+        return changed
+
+    def _run(self):
+        try:
+            f = open(MOUNTINFO_PATH)
+        except OSError:
+            f = None
+
+        if f is None:
+            while True:
+                time.sleep(FALLBACK_POLL_SECONDS)
+                self._safe_rescan()
+
+        poller = select.poll()
+        poller.register(f, select.POLLPRI | select.POLLERR)
+
+        while True:
+            poller.poll()
+            # Reading to EOF re-arms the notification
+            f.seek(0)
+            f.read()
+            self._safe_rescan()
+
+    def _safe_rescan(self, publish: bool = True):
+        try:
+            self.rescan(publish)
+        except OSError:
+            pass
+
+
+mount_monitor = MountMonitor()
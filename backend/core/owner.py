@@ -0,0 +1,267 @@
+"""
+Hardware owner process.
+
+State that must exist once per machine (pattern connector ownership and
+pipelines, EDID batch jobs) lives in a single owner process. Web workers
+reach it through multiprocessing manager proxies over a Unix socket.
+
+When HARDWARE_OWNER_SOCKET is unset (the Flask dev server) the same
+objects are created in-process instead, so both modes run the same code.
+
+The owner is started by supervise_owner(), which starts a new one on the
+same socket if it dies (e.g. a GStreamer or pykms crash). Its state
+(taken connectors, batch jobs) is lost; until it is back, calls raise
+OwnerUnavailable, which the app answers with a 503.
+"""
+
+import os
+import threading
+
+OWNER_SOCKET_ENV = "HARDWARE_OWNER_SOCKET"
+OWNER_AUTHKEY_ENV = "HARDWARE_OWNER_AUTHKEY"
+
+# Seconds before restarting a dead owner, doubled while it keeps dying
+# within OWNER_STABLE_SECONDS of starting
+OWNER_RESTART_DELAY = 1.0
+OWNER_RESTART_DELAY_MAX = 30.0
+OWNER_STABLE_SECONDS = 60.0
+
+# Calls that only read owner state, so repeating one whose reply was lost
+# is harmless. Anything else may already have run.
+READ_ONLY_CALLS = frozenset({
+    "owned", "output_modes", "patterns", "playlist_status", "status", "list",
+})
+
+
+class OwnerUnavailable(Exception):
+    """
+    The hardware owner process cannot be reached (it may be restarting).
+    """
+
+
+_local = {}
+_local_lock = threading.Lock()
+
+
+def _singleton(name, factory):
+    with _local_lock:
+        obj = _local.get(name)
+        if obj is None:
+            obj = _local[name] = factory()
+        return obj
+
+
+def _pattern_owner():
+    from backend.core.pattern.owner import PatternOwner
+    return _singleton("pattern_owner", PatternOwner)
+
+
+def _batches():
+    from backend.core.edid.batch import BatchService
+    return _singleton("batches", BatchService)
+
+
+_manager_class = None
+
+
+def _hardware_manager():
+    """
+    The BaseManager subclass serving the shared objects. Built on first use:
+    multiprocessing.managers is one of the slower imports at startup.
+    """
+    global _manager_class
+    if _manager_class is None:
+        from multiprocessing.managers import BaseManager
+
+        class HardwareManager(BaseManager):
+            pass
+
+        HardwareManager.register("pattern_owner", callable=_pattern_owner)
+        HardwareManager.register("batches", callable=_batches)
+        _manager_class = HardwareManager
+    return _manager_class
+
+
+# ----------------------------
+# Owner side
+# ----------------------------
+
+def serve_owner(address: str, authkey: bytes):
+    """
+    Run the owner process's manager server (blocks forever).
+    """
+    import signal
+
+    # Forked from supervise_owner(): drop its stop handlers so SIGTERM
+    # and SIGINT end the owner again
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    try:
+        os.unlink(address)
+    except FileNotFoundError:
+        pass
+
+    manager = _hardware_manager()(address=address, authkey=authkey)
+    server = manager.get_server()
+    server.serve_forever()
+
+
+def supervise_owner(address: str, authkey: bytes):
+    """
+    Run the owner process and restart it whenever it exits. Returns on
+    SIGTERM/SIGINT or when the parent (the gunicorn master) is gone.
+
+    The gunicorn master reaps every child it did not start as a worker,
+    so it cannot wait for the owner itself; this process is the owner's
+    parent instead.
+    """
+    import logging
+    import multiprocessing
+    import signal
+    import time
+    from multiprocessing.connection import wait
+
+    log = logging.getLogger("gunicorn.error")
+    parent = os.getppid()
+    stopping = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    delay = OWNER_RESTART_DELAY
+    while True:
+        owner = multiprocessing.Process(
+            target=serve_owner, args=(address, authkey), name="hardware-owner", daemon=True
+        )
+        owner.start()
+        started = time.monotonic()
+        log.info("Hardware owner process started (pid %s, %s)", owner.pid, address)
+
+        while owner.is_alive() and not stopping.is_set() and os.getppid() == parent:
+            wait([owner.sentinel], timeout=1.0)
+
+        if stopping.is_set() or os.getppid() != parent:
+            owner.terminate()
+            owner.join(5)
+            return
+
+        if time.monotonic() - started >= OWNER_STABLE_SECONDS:
+            delay = OWNER_RESTART_DELAY
+        log.error(
+            "Hardware owner process (pid %s) exited with code %s; restarting in %.0f s",
+            owner.pid, owner.exitcode, delay,
+        )
+        if stopping.wait(delay):
+            return
+        delay = min(delay * 2, OWNER_RESTART_DELAY_MAX)
+
+
+# ----------------------------
+# Worker side
+# ----------------------------
+
+class _RemoteObject:
+    """
+    Proxy wrapper that follows the owner process across restarts.
+
+    A restarted owner binds a new socket file, so a changed file is
+    noticed (and the proxy rebuilt) before a call is sent. A call that
+    fails without reaching the owner is retried once; one that was cut
+    off mid-way is retried only if it is in READ_ONLY_CALLS, since it may
+    already have run.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._proxy = None
+        self._socket_id = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        address = os.environ[OWNER_SOCKET_ENV]
+        try:
+            st = os.stat(address)
+        except FileNotFoundError:
+            raise OwnerUnavailable("Hardware owner process is not running") from None
+        socket_id = (st.st_ino, st.st_ctime_ns)
+
+        with self._lock:
+            if self._proxy is not None and socket_id != self._socket_id:
+                self._close_connection(self._proxy)  # the owner was restarted
+                self._proxy = None
+            if self._proxy is None:
+                manager = _hardware_manager()(
+                    address=address,
+                    authkey=bytes.fromhex(os.environ[OWNER_AUTHKEY_ENV]),
+                )
+                try:
+                    manager.connect()
+                    self._proxy = getattr(manager, self._name)()
+                except (OSError, EOFError) as exc:
+                    self._proxy = None
+                    raise OwnerUnavailable(
+                        f"Cannot reach the hardware owner process: {exc}"
+                    ) from None
+                self._socket_id = socket_id
+            return self._proxy
+
+    @staticmethod
+    def _close_connection(proxy):
+        # Proxies share one connection per thread and owner address, so a
+        # dead one would be picked up again by the next proxy
+        conn = getattr(proxy._tls, "connection", None)
+        if conn is not None:
+            del proxy._tls.connection
+            conn.close()
+
+    def _drop(self, proxy):
+        self._close_connection(proxy)
+        with self._lock:
+            if self._proxy is proxy:
+                self._proxy = None
+
+    def __getattr__(self, attr):
+        def call(*args, **kwargs):
+            for _ in range(2):
+                proxy = self._get()
+                try:
+                    return getattr(proxy, attr)(*args, **kwargs)
+                except (BrokenPipeError, ConnectionRefusedError):
+                    # Failed connecting or sending: the request never arrived
+                    self._drop(proxy)
+                except (ConnectionError, EOFError):
+                    self._drop(proxy)
+                    if attr not in READ_ONLY_CALLS:
+                        raise OwnerUnavailable(
+                            "Lost the hardware owner process during the request; "
+                            "check the state before retrying"
+                        ) from None
+            raise OwnerUnavailable("Cannot reach the hardware owner process")
+        return call
+
+
+_remote = {}
+
+
+def _resolve(name, local_factory):
+    if not os.environ.get(OWNER_SOCKET_ENV):
+        return local_factory()
+    with _local_lock:
+        obj = _remote.get(name)
+        if obj is None:
+            obj = _remote[name] = _RemoteObject(name)
+        return obj
+
+
+def pattern_owner():
+    """
+    The machine-wide PatternOwner (remote proxy or in-process).
+    """
+    return _resolve("pattern_owner", _pattern_owner)
+
+
+def batches():
+    """
+    The machine-wide EDID BatchService (remote proxy or in-process).
+    """
+    return _resolve("batches", _batches)
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from backend.core.pattern.state import set_state, get_state
-from backend.core.edid.drm import list_connectors
+from backend.core.edid.hotplug import connector_monitor
 
 bp = Blueprint("pattern", __name__, url_prefix="/api/pattern")
 
@@ -9,7 +9,7 @@ bp = Blueprint("pattern", __name__, url_prefix="/api/pattern")
 #---------------------------------------
 @bp.route("/outputs")
 def outputs():
-    return jsonify(list_connectors())
+    return jsonify(connector_monitor.connectors())
     
 #---------------------------------------
 # Set Solid Colour
@@ -0,0 +1,379 @@
+"""
+Test-pattern frame library.
+
+Every pattern is built with NumPy at the exact output size as an RGB
+image, then packed into the scanout pixel format:
+
+    XR24  XRGB8888, uint32 0xFFRRGGBB (DRM_FORMAT_XRGB8888)
+    XB24  XBGR8888, uint32 0xFFBBGGRR
+    RG16  RGB565, uint16
+
+Rendered frames are kept in an LRU cache keyed by (pattern, width,
+height, format) with a byte budget, so selecting a pattern again costs a
+dict lookup. Cached frames are read-only.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.core.metrics import pattern_frames
+
+CACHE_BYTES = int(float(os.environ.get("PATTERN_FRAME_CACHE_MB", "64")) * 1024 * 1024)
+FRAME_DIR = os.environ.get(
+    "PATTERN_FRAME_DIR", os.path.join(tempfile.gettempdir(), "amuse-frames")
+)
+
+PIXEL_FORMATS = ("XR24", "XB24", "RG16")
+# GStreamer caps format with the same memory layout
+GST_FORMATS = {"XR24": "BGRx", "XB24": "RGBx", "RG16": "RGB16"}
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+# ----------------------------
+# Helpers
+# ----------------------------
+
+def _canvas(width, height, value=0):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def _mono(mask, level=255):
+    """
+    level where mask is true, black elsewhere. mask may be any shape that
+    broadcasts to (height, width).
+    """
+    grey = np.where(mask, np.uint8(level), np.uint8(0))
+    return np.stack([grey, grey, grey], axis=-1)
+
+
+def _parity(length, period=1):
+    """
+    0/1 per pixel, alternating every period pixels (uint8 keeps the 2-D
+    combinations cheap).
+    """
+    return (np.arange(length) // period % 2).astype(np.uint8)
+
+
+def _colors(values):
+    return np.asarray(values, dtype=np.uint8)
+
+
+def _bars(width, colors):
+    """
+    One row of len(colors) equal-width bars, as (width, 3).
+    """
+    index = np.arange(width) * len(colors) // width
+    return _colors(colors)[index]
+
+
+def _ramp(length):
+    return (np.arange(length) * 255 // max(length - 1, 1)).astype(np.uint8)
+
+
+def _grid_mask(width, height, spacing, thickness=1):
+    """
+    True on lines every spacing pixels, including the last row/column.
+    """
+    x = np.arange(width)
+    y = np.arange(height)
+    cols = (x % spacing < thickness) | (x >= width - thickness)
+    rows = (y % spacing < thickness) | (y >= height - thickness)
+    return rows[:, None] | cols[None, :]
+
+
+def _cell(width, height, divisions=16):
+    """
+    Grid spacing giving about divisions cells across the short side of
+    a 16:9 screen, with square cells.
+    """
+    return max(min(width, height * 16 // 9) // divisions, 4)
+
+
+def _rect(frame, x0, y0, x1, y1, color, thickness=1):
+    frame[y0:y0 + thickness, x0:x1] = color
+    frame[y1 - thickness:y1, x0:x1] = color
+    frame[y0:y1, x0:x0 + thickness] = color
+    frame[y0:y1, x1 - thickness:x1] = color
+
+
+def _centre_cross(frame, color, size=None, thickness=1):
+    height, width = frame.shape[:2]
+    size = size or min(width, height) // 20
+    cx, cy = width // 2, height // 2
+    t0, t1 = thickness // 2, thickness - thickness // 2
+    frame[cy - t0:cy + t1, cx - size:cx + size] = color
+    frame[cy - size:cy + size, cx - t0:cx + t1] = color
+
+
+# ----------------------------
+# Patterns
+# ----------------------------
+
+WHITE_75 = (191, 191, 191)
+BARS_75 = [
+    WHITE_75, (191, 191, 0), (0, 191, 191), (0, 191, 0),
+    (191, 0, 191), (191, 0, 0), (0, 0, 191),
+]
+
+
+def smpte(width, height):
+    """
+    SMPTE EG 1 bars: 75% bars, reverse castellations, -I / white / +Q
+    and PLUGE.
+    """
+    frame = _canvas(width, height)
+    top = height * 2 // 3
+    middle = top + height // 12
+    frame[:top] = _bars(width, BARS_75)
+    frame[top:middle] = _bars(width, [
+        (0, 0, 191), (0, 0, 0), (191, 0, 191), (0, 0, 0),
+        (0, 191, 191), (0, 0, 0), WHITE_75,
+    ])
+
+    # Bottom row in 1/84ths of the width (a bar is 12): -I, 100% white
+    # and +Q 15 each, then black. PLUGE sits under the red bar; in full
+    # range RGB the below-black strip is black, so only +4% shows.
+    bottom = np.zeros((width, 3), dtype=np.uint8)
+    x = np.arange(width) * 84 // width
+    bottom[x < 15] = (0, 33, 76)
+    bottom[(x >= 15) & (x < 30)] = (255, 255, 255)
+    bottom[(x >= 30) & (x < 45)] = (50, 0, 106)
+    bottom[(x >= 68) & (x < 72)] = (10, 10, 10)
+    frame[middle:] = bottom
+    return frame
+
+
+def ebu(width, height):
+    """
+    EBU 100/0/75/0 bars.
+    """
+    frame = _canvas(width, height)
+    frame[:] = _bars(width, [(255, 255, 255)] + BARS_75[1:] + [(0, 0, 0)])
+    return frame
+
+
+def ramp(width, height):
+    """
+    Horizontal 0-255 ramps in four bands: grey, red, green, blue.
+    """
+    frame = _canvas(width, height)
+    values = _ramp(width)
+    band = height // 4
+    frame[:band] = values[:, None]
+    for i in range(3):
+        frame[band * (i + 1):band * (i + 2) if i < 2 else height, :, i] = values
+    return frame
+
+
+def steps(width, height):
+    """
+    11-step greyscale (0, 10, ... 100%).
+    """
+    frame = _canvas(width, height)
+    frame[:] = _bars(width, [(v, v, v) for v in np.linspace(0, 255, 11).round()])
+    return frame
+
+
+def checkerboard(width, height):
+    cell = _cell(width, height, 8)
+    x = _parity(width, cell)
+    y = _parity(height, cell)
+    return _mono((y[:, None] ^ x[None, :]) == 0)
+
+
+def crosshatch(width, height):
+    """
+    White 1 px grid on black with a centre cross, for geometry and
+    convergence.
+    """
+    frame = _mono(_grid_mask(width, height, _cell(width, height)))
+    _centre_cross(frame, 255, thickness=3)
+    return frame
+
+
+def convergence(width, height):
+    """
+    Crosshatch with a dot at the centre of every cell.
+    """
+    frame = crosshatch(width, height)
+    cell = _cell(width, height)
+    half = cell // 2
+    ys = np.arange(half, height - half, cell)
+    xs = np.arange(half, width - half, cell)
+    for dy in (0, 1):
+        for dx in (0, 1):
+            frame[np.ix_(ys + dy, xs + dx)] = 255
+    return frame
+
+
+def pixel_pitch(width, height):
+    """
+    Quadrants of 1 px vertical lines, 1 px horizontal lines, 1 px
+    checkerboard and 2 px checkerboard. Any scaling shows up as moire.
+    """
+    hw, hh = width // 2, height // 2
+    x1, y1 = _parity(width), _parity(height)
+    x2, y2 = _parity(width, 2), _parity(height, 2)
+
+    off = np.empty((height, width), dtype=np.uint8)
+    off[:hh, :hw] = x1[None, :hw]
+    off[:hh, hw:] = y1[:hh, None]
+    off[hh:, :hw] = y1[hh:, None] ^ x1[None, :hw]
+    off[hh:, hw:] = y2[hh:, None] ^ x2[None, hw:]
+    return _mono(off == 0)
+
+
+def overscan(width, height):
+    """
+    Borders at the panel edge (white), 2.5% (red), 5% action safe
+    (yellow) and 10% title safe (green), plus a centre cross.
+    """
+    frame = _canvas(width, height)
+    for percent, color in ((0, (255, 255, 255)), (2.5, (255, 0, 0)),
+                           (5, (255, 255, 0)), (10, (0, 255, 0))):
+        dx = int(width * percent / 100)
+        dy = int(height * percent / 100)
+        _rect(frame, dx, dy, width - dx, height - dy, color, thickness=2 if percent else 1)
+    _centre_cross(frame, 255)
+    return frame
+
+
+GAMMAS = (1.8, 2.0, 2.2, 2.4, 2.6)
+
+
+def gamma(width, height):
+    """
+    Alternating black/white lines (50% light) behind solid grey patches
+    for each gamma in GAMMAS; the patch that disappears from a distance
+    is the display gamma.
+    """
+    frame = _canvas(width, height)
+    frame[::2] = 255
+
+    patch_w = width // (len(GAMMAS) * 2 + 1)
+    patch_h = height // 3
+    y0 = (height - patch_h) // 2
+    for i, g in enumerate(GAMMAS):
+        x0 = patch_w * (i * 2 + 1)
+        level = round(255 * 0.5 ** (1 / g))
+        frame[y0:y0 + patch_h, x0:x0 + patch_w] = level
+    return frame
+
+
+def uniformity(width, height):
+    """
+    50% grey field with markers at the nine standard measurement points.
+    """
+    frame = _canvas(width, height, 128)
+    size = min(width, height) // 40
+    for fy in (1, 3, 5):
+        for fx in (1, 3, 5):
+            cx, cy = width * fx // 6, height * fy // 6
+            frame[cy, cx - size:cx + size] = 0
+            frame[cy - size:cy + size, cx] = 0
+    return frame
+
+
+PATTERNS = {
+    "smpte": smpte,
+    "ebu": ebu,
+    "ramp": ramp,
+    "steps": steps,
+    "checkerboard": checkerboard,
+    "crosshatch": crosshatch,
+    "convergence": convergence,
+    "pixel-pitch": pixel_pitch,
+    "overscan": overscan,
+    "gamma": gamma,
+    "uniformity": uniformity,
+}
+
+
+# ----------------------------
+# Pixel formats
+# ----------------------------
+
+def pack(rgb, fmt: str):
+    """
+    (height, width, 3) uint8 RGB -> (height, width) in fmt.
+    """
+    r, g, b = (rgb[..., i] for i in range(3))
+    if fmt == "XR24":
+        return (0xFF000000 | r.astype(np.uint32) << 16 | g.astype(np.uint32) << 8 | b).astype(np.uint32)
+    if fmt == "XB24":
+        return (0xFF000000 | b.astype(np.uint32) << 16 | g.astype(np.uint32) << 8 | r).astype(np.uint32)
+    if fmt == "RG16":
+        return (
+            (r.astype(np.uint16) >> 3) << 11
+            | (g.astype(np.uint16) >> 2) << 5
+            | b.astype(np.uint16) >> 3
+        ).astype(np.uint16)
+    raise ValueError(f"unsupported pixel format {fmt!r}")
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+
+def render(pattern: str, width: int, height: int, fmt: str = "XR24"):
+    """
+    The pattern frame at width x height in fmt (cached, read-only).
+    """
+    global _cache_bytes
+
+    if pattern not in PATTERNS:
+        raise ValueError(f"unknown pattern {pattern!r}")
+    if fmt not in PIXEL_FORMATS:
+        raise ValueError(f"unsupported pixel format {fmt!r}")
+
+    key = (pattern, int(width), int(height), fmt)
+    with _cache_lock:
+        frame = _cache.get(key)
+        if frame is not None:
+            _cache.move_to_end(key)
+            pattern_frames.inc(result="hit")
+            return frame
+
+    frame = pack(PATTERNS[pattern](key[1], key[2]), fmt)
+    frame.flags.writeable = False
+    pattern_frames.inc(result="miss")
+
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = frame
+            _cache_bytes += frame.nbytes
+            # Always keep the newest frame, even if it alone is over budget
+            while _cache_bytes > CACHE_BYTES and len(_cache) > 1:
+                _, old = _cache.popitem(last=False)
+                _cache_bytes -= old.nbytes
+        return _cache[key]
+
+
+def cache_info() -> dict:
+    with _cache_lock:
+        return {
+            "frames": [list(key) for key in _cache],
+            "bytes": _cache_bytes,
+            "budget_bytes": CACHE_BYTES,
+        }
+
+
+def frame_file(pattern: str, width: int, height: int, fmt: str = "XR24") -> str:
+    """
+    The frame as a raw file under FRAME_DIR, for GStreamer filesrc.
+    """
+    path = os.path.join(FRAME_DIR, f"{pattern}-{width}x{height}-{fmt}.raw")
+    if not os.path.exists(path):
+        os.makedirs(FRAME_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(render(pattern, width, height, fmt).tobytes())
+        os.replace(tmp, path)
+    return path
@@ -0,0 +1,141 @@
+"""
+Output modes from the connector's EDID.
+
+Patterns are rendered and scanned out at the monitor's native mode, so
+neither kmssink nor the monitor scales them. The native mode is the
+preferred detailed timing (interlaced ones skipped), else a CEA native
+VIC, else the largest advertised mode.
+
+Mode lists are cached per EDID hash: the same monitors are plugged in
+over and over, and a different monitor on the connector has a different
+hash.
+"""
+
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+
+from backend.core.edid.compare import edid_hash
+from backend.core.edid.hotplug import connector_monitor
+
+# Pixel clocks are stored in 10 kHz steps, so computed rates are a little
+# off the nominal N or N/1.001 Hz; within this tolerance they are snapped
+RATE_TOLERANCE = 0.0005
+
+_MODE_CACHE_SIZE = 64
+_mode_cache = OrderedDict()
+_mode_cache_lock = threading.Lock()
+
+
+def _framerate(mode) -> str:
+    """
+    Refresh as a GStreamer fraction (60/1, 60000/1001).
+    """
+    if mode.get("pixel_clock_khz") and "hblank" in mode:
+        rate = Fraction(
+            mode["pixel_clock_khz"] * 1000,
+            (mode["width"] + mode["hblank"]) * (mode["height"] + mode["vblank"]),
+        )
+    else:
+        rate = Fraction(str(mode["refresh_hz"]))
+    nominal = round(rate)
+    if nominal and abs(rate - nominal) / nominal < RATE_TOLERANCE:
+        return f"{nominal}/1"
+    ntsc = round(rate * Fraction(1001, 1000))
+    if ntsc and abs(rate - Fraction(ntsc * 1000, 1001)) / rate < RATE_TOLERANCE:
+        return f"{ntsc * 1000}/1001"
+    rate = rate.limit_denominator(1000)
+    return f"{rate.numerator}/{rate.denominator}"
+
+
+def _mode(mode, source, preferred=False) -> dict:
+    return {
+        "width": mode["width"],
+        "height": mode["height"],
+        "refresh_hz": mode["refresh_hz"],
+        "framerate": _framerate(mode),
+        "interlaced": bool(mode.get("interlaced")),
+        "source": source,
+        "preferred": preferred,
+    }
+
+
+def _modes(decoded) -> list:
+    base = decoded["base"]
+    modes = [
+        _mode(t, "detailed_timing", bool(t.get("preferred")))
+        for t in base["detailed_timings"]
+    ]
+    for ext in decoded["extensions"]:
+        modes += [_mode(t, "detailed_timing", bool(t.get("preferred")))
+                  for t in ext.get("detailed_timings", ())]
+        for block in ext.get("data_blocks", ()):
+            modes += [_mode(m, "cea_vic", bool(m.get("native")))
+                      for m in block.get("modes", ()) if "width" in m]
+    modes += [_mode(t, "standard_timing") for t in base["standard_timings"]]
+    modes += [_mode(t, "established_timing") for t in base["established_timings"]]
+    return modes
+
+
+def _native(modes):
+    progressive = [m for m in modes if not m["interlaced"]]
+    for source in ("detailed_timing", "cea_vic"):
+        for mode in progressive:
+            if mode["source"] == source and mode["preferred"]:
+                return mode
+    if not progressive:
+        return None
+    return max(progressive, key=lambda m: (m["width"] * m["height"], m["refresh_hz"]))
+
+
+def edid_modes(edid: bytes) -> dict:
+    """
+    {"native": mode or None, "modes": [mode, ...]} for an EDID. Cached per
+    EDID hash; treat the result as read-only.
+    """
+    key = edid_hash(edid)
+    with _mode_cache_lock:
+        result = _mode_cache.get(key)
+        if result is not None:
+            _mode_cache.move_to_end(key)
+            return result
+
+    from backend.core.edid.decode import decode_edid
+
+    modes = _modes(decode_edid(edid))
+    unique = []
+    seen = set()
+    for mode in modes:
+        ident = (mode["width"], mode["height"], mode["framerate"], mode["interlaced"])
+        if ident not in seen:
+            seen.add(ident)
+            unique.append(mode)
+
+    result = {"edid_hash": key, "native": _native(unique), "modes": unique}
+    with _mode_cache_lock:
+        _mode_cache[key] = result
+        while len(_mode_cache) > _MODE_CACHE_SIZE:
+            _mode_cache.popitem(last=False)
+    return result
+
+
+def connector_modes(connector_id: int):
+    """
+    edid_modes() for the monitor on a connector, or None when the
+    connector is unknown or has no usable EDID.
+    """
+    entry = connector_monitor.by_id(connector_id)
+    if entry is None or not entry.get("edid_valid"):
+        return None
+    edid = connector_monitor.edid(entry["name"])
+    if not edid:
+        return None
+    try:
+        return edid_modes(edid)
+    except (ValueError, IndexError):
+        return None
+
+
+def native_mode(connector_id: int):
+    modes = connector_modes(connector_id)
+    return modes["native"] if modes else None
@@ -0,0 +1,158 @@
+import os
+import subprocess
+import threading
+
+from backend.core.pattern.playlist import PlaylistScheduler
+
+DISPLAY_MANAGER_SERVICE = os.environ.get("PATTERN_DISPLAY_MANAGER_SERVICE", "lightdm")
+# Optional fallback for environments that require DRM master handover.
+FORCE_GLOBAL_DRM_CONTROL = os.environ.get("PATTERN_FORCE_GLOBAL_DRM_CONTROL", "0") == "1"
+
+
+class PatternOwnershipError(RuntimeError):
+    """
+    Raised when a connector is driven without being taken first.
+    """
+
+
+class PatternOwner:
+    """
+    Connector ownership, display manager handover and the running pattern
+    pipelines. There must be exactly one per machine: in production it
+    lives in the hardware owner process and web workers reach it through
+    a proxy (backend/core/owner.py).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owned = set()
+        self._display_manager_stopped = False
+
+        from backend.core.pattern.worker import PatternWorker
+        self._worker = PatternWorker()
+        self._playlists = PlaylistScheduler(self._show)
+
+    # ----------------------------
+    # Ownership
+    # ----------------------------
+
+    def owned(self):
+        with self._lock:
+            return sorted(self._owned)
+
+    def take(self, connector_id: int, global_drm: bool = False):
+        with self._lock:
+            if global_drm:
+                self._ensure_global_drm_control(requested=True)
+            self._owned.add(connector_id)
+            return sorted(self._owned)
+
+    def release(self, connector_id: int, global_drm: bool = False):
+        with self._lock:
+            self._playlists.cancel(connector_id)
+            self._worker.stop(connector_id)
+            self._owned.discard(connector_id)
+            if global_drm or FORCE_GLOBAL_DRM_CONTROL:
+                self._maybe_release_global_drm_control(requested=global_drm)
+            return sorted(self._owned)
+
+    # ----------------------------
+    # Pattern output
+    # ----------------------------
+
+    def _check_owned(self, connector_id):
+        with self._lock:
+            if connector_id not in self._owned:
+                raise PatternOwnershipError(
+                    "connector is not taken. Use Take Display Control first."
+                )
+            self._ensure_global_drm_control(requested=False)
+
+    def _show(self, connector_id, step):
+        mode = step.get("mode")
+        if mode == "solid":
+            self._worker.start_solid_color(connector_id, step.get("color") or "#ffffff")
+        elif mode == "pattern":
+            self._worker.start_frame(connector_id, step.get("pattern"))
+        else:
+            self._worker.start_colorbars(connector_id)
+
+    def start(self, connector_id: int, mode: str = "colorbars", color=None, pattern=None):
+        self._check_owned(connector_id)
+        # A manual pattern replaces the connector's playlist
+        self._playlists.cancel(connector_id)
+        self._show(connector_id, {"mode": mode, "color": color, "pattern": pattern})
+
+    def stop(self, connector_id=None):
+        self._playlists.cancel(connector_id)
+        self._worker.stop(connector_id)
+
+    # ----------------------------
+    # Playlists
+    # ----------------------------
+
+    def start_playlist(self, connector_id: int, playlist: dict):
+        """
+        Run a parsed playlist (playlist.parse_playlist) on the connector.
+        """
+        from backend.core.pattern.frames import PATTERNS
+
+        self._check_owned(connector_id)
+        # Pattern steps go to start_frame, which only takes library patterns
+        for i, step in enumerate(playlist["steps"]):
+            if step["mode"] == "pattern" and step["pattern"] not in PATTERNS:
+                raise ValueError(f"step {i}: unknown pattern {step['pattern']!r}")
+        return self._playlists.start(connector_id, playlist)
+
+    def stop_playlist(self, connector_id=None):
+        """
+        Stop the playlist; the current step stays on screen.
+        """
+        self._playlists.cancel(connector_id)
+
+    def playlist_status(self, connector_id=None):
+        return self._playlists.status(connector_id)
+
+    def output_modes(self):
+        return self._worker.output_modes()
+
+    def patterns(self):
+        return self._worker.patterns()
+
+    # ----------------------------
+    # Global DRM handover
+    # ----------------------------
+
+    @staticmethod
+    def _set_display_manager(enabled):
+        action = "start" if enabled else "stop"
+        result = subprocess.run(["systemctl", action, DISPLAY_MANAGER_SERVICE], check=False)
+        return result.returncode == 0
+
+    def _ensure_global_drm_control(self, requested=False):
+        if not (FORCE_GLOBAL_DRM_CONTROL or requested):
+            return
+
+        if self._display_manager_stopped:
+            return
+
+        if not self._set_display_manager(enabled=False):
+            raise RuntimeError(
+                f"failed to stop display manager service '{DISPLAY_MANAGER_SERVICE}'"
+            )
+
+        self._display_manager_stopped = True
+
+    def _maybe_release_global_drm_control(self, requested=False):
+        if not (FORCE_GLOBAL_DRM_CONTROL or requested):
+            return
+
+        if not self._display_manager_stopped or self._owned:
+            return
+
+        if not self._set_display_manager(enabled=True):
+            raise RuntimeError(
+                f"failed to start display manager service '{DISPLAY_MANAGER_SERVICE}'"
+            )
+
+        self._display_manager_stopped = False
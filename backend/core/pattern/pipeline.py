@@ -0,0 +1,134 @@
+"""
+Long-lived GStreamer pipelines for pattern output.
+
+One pipeline per connector runs inside this process through the
+GStreamer Python bindings (gi):
+
+    videotestsrc name=src is-live=true ! capsfilter name=caps ! kmssink
+
+Switching pattern or colour only sets properties on the running
+videotestsrc, which takes effect from the next frame it produces.
+Resolution and frame rate changes update the capsfilter and renegotiate
+in place. The pipeline is not torn down between patterns, so the screen
+does not blank.
+
+Frames from the pattern library (frames.py) are shown with a
+filesrc ! rawvideoparse ! imagefreeze source instead (frame_source()).
+"""
+
+import threading
+
+_gst = None
+_gst_lock = threading.Lock()
+
+
+def gst():
+    """
+    The initialised Gst module, or None when the bindings are missing.
+    Imported on first use: gi is slow to load.
+    """
+    global _gst
+    with _gst_lock:
+        if _gst is None:
+            try:
+                import gi
+                gi.require_version("Gst", "1.0")
+                from gi.repository import Gst
+                Gst.init(None)
+                _gst = Gst
+            except (ImportError, ValueError):
+                _gst = False
+        return _gst or None
+
+
+def caps_string(width=None, height=None, framerate="30/1") -> str:
+    caps = f"video/x-raw,framerate={framerate}"
+    if width and height:
+        caps += f",width={int(width)},height={int(height)}"
+    return caps
+
+
+TEST_SOURCE = "videotestsrc name=src is-live=true ! capsfilter name=caps"
+
+
+def frame_source(path, width, height, gst_format, framerate="30/1") -> str:
+    """
+    Source description repeating the raw frame in path.
+    """
+    return (
+        f"filesrc location={path} "
+        f"! rawvideoparse width={int(width)} height={int(height)} "
+        f"format={gst_format.lower()} framerate={framerate} "
+        "! imagefreeze is-live=true"
+    )
+
+
+def sink_description(connector_id) -> str:
+    return f"kmssink connector-id={int(connector_id)} sync=false"
+
+
+class LivePipeline:
+    """
+    A running source -> kmssink pipeline for one connector. With the
+    default TEST_SOURCE, show() and set_caps() switch it in place.
+    """
+
+    def __init__(self, connector_id: int, source: str = TEST_SOURCE):
+        Gst = gst()
+        if Gst is None:
+            raise RuntimeError("GStreamer Python bindings (python3-gi) are not available")
+
+        self.connector_id = connector_id
+        self.source = source
+        self._Gst = Gst
+        self._error = None
+        self._caps = None
+
+        try:
+            self._pipeline = Gst.parse_launch(
+                f"{source} ! {sink_description(connector_id)}"
+            )
+        except Exception as exc:
+            raise RuntimeError(f"failed to build pattern pipeline: {exc}") from exc
+
+        self._src = self._pipeline.get_by_name("src")
+        self._capsfilter = self._pipeline.get_by_name("caps")
+
+        # Handle messages as they are posted instead of letting them queue
+        # up on the bus for the lifetime of the pipeline
+        self._pipeline.get_bus().set_sync_handler(self._on_message)
+
+    def _on_message(self, bus, message):
+        Gst = self._Gst
+        if message.type == Gst.MessageType.ERROR:
+            err, _debug = message.parse_error()
+            self._error = err.message
+        elif message.type == Gst.MessageType.EOS:
+            self._error = "pipeline reached end of stream"
+        return Gst.BusSyncReply.DROP
+
+    def start(self):
+        Gst = self._Gst
+        if self._pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            self.stop()
+            raise RuntimeError(self._error or "failed to start pattern pipeline")
+
+    def stop(self):
+        self._pipeline.set_state(self._Gst.State.NULL)
+
+    def alive(self) -> bool:
+        return self._error is None
+
+    def show(self, pattern: str, color: int = None):
+        """
+        Switch the running source to pattern (a videotestsrc pattern nick).
+        """
+        self._Gst.util_set_object_arg(self._src, "pattern", pattern)
+        if color is not None:
+            self._src.set_property("foreground-color", color)
+
+    def set_caps(self, width=None, height=None, framerate="30/1"):
+        caps = caps_string(width, height, framerate)
+        if caps != self._caps:
+            self._capsfilter.set_property("caps", self._Gst.Caps.from_string(caps))
+            self._caps = caps
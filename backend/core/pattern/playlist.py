@@ -0,0 +1,311 @@
+"""
+Pattern playlists.
+
+A playlist is an ordered list of steps, each shown for dwell seconds,
+repeated loops times (0 = until stopped):
+
+    {"name": "burn-in", "loops": 0, "steps": [
+        {"mode": "solid", "color": "#ff0000", "dwell": 300},
+        {"mode": "pattern", "pattern": "crosshatch", "dwell": 60},
+        {"mode": "colorbars", "dwell": 60},
+    ]}
+
+Each connector runs at most one playlist. A single scheduler thread
+drives all of them from a heap of deadlines. Deadlines are absolute:
+step n ends at start + the sum of the dwells before it, not "now + dwell"
+after the previous switch. Time spent switching patterns therefore does
+not build up over a long burn-in. If the scheduler falls behind (e.g. the
+host was suspended), steps that are already over are skipped. When the
+last loop ends, its last step stays on screen.
+"""
+
+import heapq
+import math
+import threading
+import time
+
+MODES = ("solid", "colorbars", "pattern")
+MIN_DWELL_SECONDS = 0.1
+MAX_DWELL_SECONDS = 7 * 24 * 3600
+
+BUILTIN_PLAYLISTS = {
+    "burn-in": {
+        "name": "burn-in",
+        "loops": 0,
+        "steps": [
+            {"mode": "solid", "color": color, "dwell": 300}
+            for color in ("#ffffff", "#ff0000", "#00ff00", "#0000ff", "#000000")
+        ],
+    },
+    "screensaver": {
+        "name": "screensaver",
+        "loops": 0,
+        "steps": [
+            {"mode": "solid", "color": "#000000", "dwell": 240},
+            {"mode": "solid", "color": "#202020", "dwell": 60},
+        ],
+    },
+    "geometry": {
+        "name": "geometry",
+        "loops": 1,
+        "steps": [
+            {"mode": "pattern", "pattern": name, "dwell": 30}
+            for name in ("crosshatch", "convergence", "overscan", "pixel-pitch")
+        ],
+    },
+}
+
+
+def parse_playlist(data) -> dict:
+    """
+    A validated playlist from a builtin name or a request dict. Raises
+    ValueError with a message for the client.
+    """
+    if isinstance(data, str):
+        playlist = BUILTIN_PLAYLISTS.get(data)
+        if playlist is None:
+            raise ValueError(f"unknown playlist {data!r}")
+        return playlist
+
+    if not isinstance(data, dict):
+        raise ValueError("playlist must be a name or an object")
+
+    steps = data.get("steps")
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("playlist needs a non-empty steps list")
+
+    try:
+        loops = int(data.get("loops", 1))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("loops must be an integer") from None
+    if loops < 0:
+        raise ValueError("loops must be 0 (forever) or more")
+
+    parsed = []
+    for i, step in enumerate(steps):
+        if not isinstance(step, dict):
+            raise ValueError(f"step {i}: must be an object")
+        mode = step.get("mode")
+        if mode not in MODES:
+            raise ValueError(f"step {i}: mode must be one of {', '.join(MODES)}")
+        try:
+            dwell = float(step.get("dwell"))
+        except (TypeError, ValueError):
+            raise ValueError(f"step {i}: dwell (seconds) is required") from None
+        # NaN compares false both ways and would never come due
+        if not math.isfinite(dwell) or not MIN_DWELL_SECONDS <= dwell <= MAX_DWELL_SECONDS:
+            raise ValueError(
+                f"step {i}: dwell must be {MIN_DWELL_SECONDS} to {MAX_DWELL_SECONDS} s"
+            )
+
+        entry = {"mode": mode, "dwell": dwell}
+        if mode == "solid":
+            entry["color"] = str(step.get("color") or "#ffffff")
+        elif mode == "pattern":
+            if not step.get("pattern"):
+                raise ValueError(f"step {i}: pattern is required for mode 'pattern'")
+            entry["pattern"] = str(step["pattern"])
+        parsed.append(entry)
+
+    return {"name": str(data.get("name") or "custom"), "loops": loops, "steps": parsed}
+
+
+class _Run:
+    """
+    One connector's playlist in progress.
+    """
+
+    def __init__(self, connector_id, playlist, generation, now):
+        self.connector_id = connector_id
+        self.playlist = playlist
+        self.generation = generation
+        self.index = 0
+        self.loop = 1
+        self.started = now
+        self.step_started = now
+        self.deadline = now + playlist["steps"][0]["dwell"]
+        self.finished = False
+        self.late = 0.0
+        self.error = None
+
+    def advance(self):
+        """
+        Move to the next step. False when the last loop is done.
+        """
+        steps = self.playlist["steps"]
+        self.index += 1
+        if self.index == len(steps):
+            loops = self.playlist["loops"]
+            if loops and self.loop >= loops:
+                self.index -= 1
+                self.finished = True
+                return False
+            self.index = 0
+            self.loop += 1
+        self.step_started = self.deadline
+        self.deadline += steps[self.index]["dwell"]
+        return True
+
+
+class PlaylistScheduler:
+    """
+    Runs playlists on connectors. apply(connector_id, step) shows a step;
+    it is never called for two steps at once.
+    """
+
+    def __init__(self, apply):
+        self._apply_step = apply
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._apply_lock = threading.Lock()
+        self._runs = {}
+        self._heap = []
+        self._generation = 0
+        self._thread = None
+
+    # ----------------------------
+    # Control
+    # ----------------------------
+
+    def start(self, connector_id, playlist):
+        """
+        Start playlist on connector_id (replacing any running one) and
+        show its first step now.
+        """
+        with self._lock:
+            self._generation += 1
+            run = _Run(connector_id, playlist, self._generation, time.monotonic())
+            self._runs[connector_id] = run
+            heapq.heappush(self._heap, (run.deadline, run.generation, connector_id))
+            self._ensure_thread()
+            self._wakeup.notify()
+
+        self._apply(run, run.generation)
+        return self.status(connector_id)
+
+    def cancel(self, connector_id=None):
+        """
+        Stop playlists. Waits for a step being applied, so none lands
+        after this returns.
+        """
+        with self._apply_lock, self._lock:
+            if connector_id is None:
+                self._runs.clear()
+            else:
+                self._runs.pop(connector_id, None)
+            # Entries for cancelled runs are dropped when they come due
+            self._wakeup.notify()
+
+    def running(self, connector_id) -> bool:
+        with self._lock:
+            run = self._runs.get(connector_id)
+            return run is not None and not run.finished
+
+    # ----------------------------
+    # Status
+    # ----------------------------
+
+    def _describe(self, run, now):
+        step = run.playlist["steps"][run.index]
+        wall = time.time() - now
+        return {
+            "connector_id": run.connector_id,
+            "playlist": run.playlist["name"],
+            "state": "finished" if run.finished else ("error" if run.error else "running"),
+            "loop": run.loop,
+            "loops": run.playlist["loops"],
+            "step_index": run.index,
+            "step_count": len(run.playlist["steps"]),
+            "step": dict(step),
+            "started_at": round(run.started + wall, 3),
+            "step_started_at": round(run.step_started + wall, 3),
+            "next_change_in": None if run.finished else round(max(run.deadline - now, 0.0), 3),
+            "last_switch_late_ms": round(run.late * 1000, 3),
+            "error": run.error,
+        }
+
+    def status(self, connector_id=None):
+        """
+        One connector's playlist status (None if none ran), or all of them.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if connector_id is not None:
+                run = self._runs.get(connector_id)
+                return self._describe(run, now) if run else None
+            return [self._describe(run, now) for _, run in sorted(self._runs.items())]
+
+    # ----------------------------
+    # Scheduler thread
+    # ----------------------------
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run_forever, name="pattern-playlists", daemon=True
+            )
+            self._thread.start()
+
+    def _due(self):
+        """
+        Wait for the next deadline; return the runs whose step is over.
+        """
+        with self._lock:
+            while True:
+                while self._heap:
+                    _, generation, connector_id = self._heap[0]
+                    run = self._runs.get(connector_id)
+                    if run is None or run.generation != generation or run.finished:
+                        heapq.heappop(self._heap)  # cancelled or replaced
+                        continue
+                    break
+
+                if not self._heap:
+                    self._wakeup.wait()
+                    continue
+
+                now = time.monotonic()
+                deadline = self._heap[0][0]
+                if deadline > now:
+                    self._wakeup.wait(deadline - now)
+                    continue
+
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, generation, connector_id = heapq.heappop(self._heap)
+                    run = self._runs.get(connector_id)
+                    if run is None or run.generation != generation:
+                        continue
+                    shown = (run.loop, run.index)
+                    # Skip steps that ended while we were not running
+                    while run.deadline <= now and run.advance():
+                        pass
+                    if not run.finished:
+                        heapq.heappush(self._heap, (run.deadline, generation, connector_id))
+                        due.append((run, generation))
+                    elif (run.loop, run.index) != shown:
+                        # Finished while behind: its last step is not on screen yet
+                        due.append((run, generation))
+                return due
+
+    def _run_forever(self):
+        while True:
+            for run, generation in self._due():
+                self._apply(run, generation)
+
+    def _apply(self, run, generation):
+        with self._apply_lock:
+            with self._lock:
+                if self._runs.get(run.connector_id) is not run or run.generation != generation:
+                    return
+                step = run.playlist["steps"][run.index]
+                # How far behind its scheduled start the switch happens
+                late = time.monotonic() - run.step_started
+            try:
+                self._apply_step(run.connector_id, step)
+                error = None
+            except Exception as exc:
+                error = str(exc)
+            with self._lock:
+                run.late = late
+                run.error = error
@@ -0,0 +1,166 @@
+"""
+Static single-frame scanout.
+
+A frame that never changes (a solid colour, a library test pattern
+from frames.py) does not need a pipeline
+producing 30 copies of it per second. Here it is drawn once into a DRM
+dumb buffer and committed to the connector's CRTC; the display
+controller keeps scanning it out with no CPU involvement until the next
+show().
+
+Frames are XRGB8888 (DRM "XR24"): a 2-D NumPy uint32 array of
+0xXXRRGGBB values at the scanout size, or anything that broadcasts to it
+(a single np.uint32 fills the screen).
+
+Backends:
+- KmsScanout: pykms (kmsxx) dumb buffers, double-buffered so a change
+  is one commit and never shows a half-drawn frame.
+- OffscreenScanout: keeps the committed frame in memory. For testing
+  without a display (PATTERN_STATIC_SCANOUT=offscreen).
+"""
+
+import os
+import threading
+
+import numpy as np
+
+PIXEL_FORMAT = "XR24"
+OFFSCREEN_SIZE = os.environ.get("PATTERN_OFFSCREEN_SIZE", "1920x1080")
+
+_pykms = None
+_pykms_lock = threading.Lock()
+
+
+def pykms():
+    """
+    The pykms module, or None when kmsxx's Python bindings are missing.
+    """
+    global _pykms
+    with _pykms_lock:
+        if _pykms is None:
+            try:
+                import pykms as module
+                _pykms = module
+            except ImportError:
+                _pykms = False
+        return _pykms or None
+
+
+class OffscreenScanout:
+    """
+    In-memory stand-in for a connector.
+    """
+
+    backend = "offscreen"
+    pixel_format = PIXEL_FORMAT
+
+    def __init__(self, connector_id: int, width: int = None, height: int = None):
+        if not (width and height):
+            width, height = (int(v) for v in OFFSCREEN_SIZE.lower().split("x"))
+        self.connector_id = connector_id
+        self.size = (width, height)
+        self.frame = np.zeros((height, width), dtype=np.uint32)
+        self.commits = 0
+
+    def show(self, frame):
+        self.frame[...] = frame
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class KmsScanout:
+    """
+    One connector driven directly through pykms.
+    """
+
+    backend = "kms"
+    pixel_format = PIXEL_FORMAT
+
+    def __init__(self, connector_id: int, width: int = None, height: int = None,
+                 refresh: int = None):
+        kms = pykms()
+        if kms is None:
+            raise RuntimeError("pykms is not available")
+
+        self.connector_id = connector_id
+        self._kms = kms
+        self._card = kms.Card()
+        self._atomic = self._card.has_atomic
+        res = kms.ResourceManager(self._card)
+
+        connector = next((c for c in self._card.connectors if c.id == connector_id), None)
+        if connector is None:
+            raise RuntimeError(f"connector {connector_id} not found")
+        self._connector = res.reserve_connector(connector.fullname)
+        self._crtc = res.reserve_crtc(self._connector)
+        self._plane = res.reserve_generic_plane(self._crtc) if self._atomic else None
+        if self._crtc is None or (self._atomic and self._plane is None):
+            raise RuntimeError(f"no free CRTC/plane for connector {connector_id}")
+
+        self._mode = None
+        if width and height:
+            try:
+                self._mode = self._connector.get_mode(width, height, refresh or 60, False)
+            except (RuntimeError, ValueError):
+                pass  # the kernel's mode list lacks it; use its default
+        if self._mode is None:
+            self._mode = self._connector.get_default_mode()
+        self.size = (self._mode.hdisplay, self._mode.vdisplay)
+
+        self._buffers = [
+            kms.DumbFramebuffer(self._card, *self.size, PIXEL_FORMAT) for _ in range(2)
+        ]
+        self._front = None
+
+    def _pixels(self, fb):
+        width, height = self.size
+        stride = fb.stride(0) // 4
+        pixels = np.frombuffer(fb.map(0), dtype=np.uint32, count=stride * height)
+        return pixels.reshape(height, stride)[:, :width]
+
+    def _commit(self, fb):
+        width, height = self.size
+        if not self._atomic:
+            if self._front is None:
+                self._crtc.set_mode(self._connector, fb, self._mode)
+            else:
+                self._crtc.set_plane(self._crtc.primary_plane, fb, 0, 0, width, height,
+                                     0, 0, width, height)
+            return
+
+        req = self._kms.AtomicReq(self._card)
+        if self._front is None:
+            mode_blob = self._mode.to_blob(self._card)
+            req.add(self._connector, "CRTC_ID", self._crtc.id)
+            req.add(self._crtc, {"ACTIVE": 1, "MODE_ID": mode_blob.id})
+            req.add(self._plane, {
+                "CRTC_ID": self._crtc.id,
+                "SRC_X": 0, "SRC_Y": 0,
+                "SRC_W": width << 16, "SRC_H": height << 16,
+                "CRTC_X": 0, "CRTC_Y": 0,
+                "CRTC_W": width, "CRTC_H": height,
+            })
+        req.add(self._plane, "FB_ID", fb.id)
+        if req.commit_sync(allow_modeset=self._front is None):
+            raise RuntimeError(f"atomic commit failed on connector {self.connector_id}")
+
+    def show(self, frame):
+        back = 0 if self._front != 0 else 1
+        fb = self._buffers[back]
+        self._pixels(fb)[...] = frame
+        self._commit(fb)
+        self._front = back
+
+    def close(self):
+        # Dropping the card closes its fd, which releases the CRTC and
+        # turns the output off
+        self._buffers = []
+        self._card = None
+
+
+def open_scanout(backend: str, connector_id: int, width=None, height=None, refresh=None):
+    if backend == "offscreen":
+        return OffscreenScanout(connector_id, width, height)
+    return KmsScanout(connector_id, width, height, refresh)
@@ -1,69 +1,293 @@
+import os
+import shlex
 import shutil
 import signal
 import subprocess
 import threading
+import time
+
+from backend.core.metrics import (
+    pattern_process_lifetime_seconds,
+    pattern_process_restarts,
+    pattern_process_starts,
+)
+from backend.core.pattern import frames
+from backend.core.pattern.modes import native_mode
+from backend.core.pattern.pipeline import (
+    TEST_SOURCE,
+    LivePipeline,
+    caps_string,
+    frame_source,
+    gst,
+    sink_description,
+)
+
+# auto: in-process pipelines when the GStreamer Python bindings are
+# installed, gst-launch-1.0 child processes otherwise.
+# live / process: force one of the two.
+PATTERN_PIPELINE = os.environ.get("PATTERN_PIPELINE", "auto").strip().lower()
+
+# Unchanging frames (solid colours) are drawn once and scanned out from a
+# DRM dumb buffer instead of running a pipeline.
+# auto: when pykms is installed; kms / offscreen / off: force.
+PATTERN_STATIC_SCANOUT = os.environ.get("PATTERN_STATIC_SCANOUT", "auto").strip().lower()
+
+# Output size for library patterns when the connector's EDID gives no
+# native mode (GStreamer path without a static scanout)
+PATTERN_FRAME_SIZE = os.environ.get("PATTERN_FRAME_SIZE", "1920x1080")
+DEFAULT_FRAMERATE = "30/1"
 
 
 class PatternWorker:
     def __init__(self):
         self._lock = threading.Lock()
         self._procs = {}
+        self._pipelines = {}
+        self._scanouts = {}
+        self._scanout_modes = {}
+        self._started = {}
         self._has_gstreamer = None
 
     def start_solid_color(self, connector_id, color_hex="#ffffff"):
         color = self._hex_to_uint32(color_hex)
-        cmd = [
-            "gst-launch-1.0",
-            "-q",
-            "videotestsrc",
-            "is-live=true",
-            "pattern=solid-color",
-            f"foreground-color={color}",
-            "!",
-            "video/x-raw,framerate=30/1",
-            "!",
-            "kmssink",
-            f"connector-id={connector_id}",
-            "sync=false",
-        ]
-        self._start(connector_id, cmd)
+        with self._lock:
+            backend = self._static_scanout_backend()
+            if backend:
+                import numpy as np
+                self._show_static(connector_id, backend, lambda scanout: np.uint32(color))
+                return
+            self._start_locked(connector_id, "solid-color", color)
 
     def start_colorbars(self, connector_id):
+        self._start(connector_id, "smpte")
+
+    def start_frame(self, connector_id, pattern):
+        """
+        Show a pattern from the frame library (frames.PATTERNS).
+        """
+        if pattern not in frames.PATTERNS:
+            raise ValueError(f"unknown pattern {pattern!r}")
+
+        with self._lock:
+            backend = self._static_scanout_backend()
+            if backend:
+                self._show_static(
+                    connector_id, backend,
+                    lambda scanout: frames.render(pattern, *scanout.size, scanout.pixel_format),
+                )
+                return
+
+            if connector_id in self._scanouts:
+                self._stop_locked(connector_id)
+            mode = self._output_mode(connector_id)
+            if mode:
+                width, height, framerate = mode["width"], mode["height"], mode["framerate"]
+            else:
+                width, height = (int(v) for v in PATTERN_FRAME_SIZE.lower().split("x"))
+                framerate = DEFAULT_FRAMERATE
+            path = frames.frame_file(pattern, width, height, "XR24")
+            source = frame_source(path, width, height, frames.GST_FORMATS["XR24"], framerate)
+            if self._use_live_pipeline():
+                if self._live_pipeline(connector_id, source) is None:
+                    self._run_live(connector_id, LivePipeline(connector_id, source))
+            else:
+                self._start_process(connector_id, [
+                    "gst-launch-1.0", "-q",
+                    *shlex.split(source), "!", *shlex.split(sink_description(connector_id)),
+                ])
+
+    def patterns(self):
+        return ["colorbars", "solid", *frames.PATTERNS]
+
+    def stop(self, connector_id=None):
+        with self._lock:
+            if connector_id is None:
+                for cid in set(self._procs) | set(self._pipelines) | set(self._scanouts):
+                    self._stop_locked(cid)
+                return
+            self._stop_locked(connector_id)
+
+    def output_modes(self):
+        """
+        pipeline: "live" (switch in place) or "process" (respawn
+        gst-launch-1.0); static_scanout: "kms", "offscreen" or None.
+        """
+        modes = {}
+        try:
+            modes["pipeline"] = "live" if self._use_live_pipeline() else "process"
+        except RuntimeError:
+            modes["pipeline"] = "unavailable"
+        try:
+            modes["static_scanout"] = self._static_scanout_backend()
+        except RuntimeError:
+            modes["static_scanout"] = "unavailable"
+        return modes
+
+    def _start(self, connector_id, pattern, color=None):
+        with self._lock:
+            self._start_locked(connector_id, pattern, color)
+
+    def _start_locked(self, connector_id, pattern, color=None):
+        if connector_id in self._scanouts:
+            self._stop_locked(connector_id)
+
+        # Render at the monitor's native mode; kmssink sets the mode that
+        # matches the caps, so nothing is scaled
+        mode = self._output_mode(connector_id)
+        if mode:
+            width, height, framerate = mode["width"], mode["height"], mode["framerate"]
+        else:
+            width = height = None
+            framerate = DEFAULT_FRAMERATE
+
+        if self._use_live_pipeline():
+            self._show_live(connector_id, pattern, color, width, height, framerate)
+        else:
+            self._start_process(
+                connector_id,
+                self._launch_command(connector_id, pattern, color, width, height, framerate),
+            )
+
+    @staticmethod
+    def _output_mode(connector_id):
+        """
+        The connector's native mode from its EDID, or None if unknown.
+        """
+        try:
+            return native_mode(connector_id)
+        except OSError:
+            return None
+
+    def _use_live_pipeline(self):
+        if PATTERN_PIPELINE == "process":
+            return False
+        if gst() is not None:
+            return True
+        if PATTERN_PIPELINE == "live":
+            raise RuntimeError(
+                "PATTERN_PIPELINE=live but the GStreamer Python bindings are not installed"
+            )
+        return False
+
+    def _static_scanout_backend(self):
+        if PATTERN_STATIC_SCANOUT == "off":
+            return None
+        if PATTERN_STATIC_SCANOUT == "offscreen":
+            return "offscreen"
+        from backend.core.pattern.scanout import pykms
+        if pykms() is not None:
+            return "kms"
+        if PATTERN_STATIC_SCANOUT == "kms":
+            raise RuntimeError("PATTERN_STATIC_SCANOUT=kms but pykms is not installed")
+        return None
+
+    # ----------------------------
+    # Static scanout
+    # ----------------------------
+
+    def _show_static(self, connector_id, backend, frame_for):
+        from backend.core.pattern.scanout import open_scanout
+
+        mode = self._output_mode(connector_id)
+        scanout = self._scanouts.get(connector_id)
+        if scanout is not None and self._scanout_modes.get(connector_id) != mode:
+            # A different monitor was plugged in: set its native mode
+            self._stop_locked(connector_id)
+            scanout = None
+
+        if scanout is None:
+            # The connector's pipeline has to let go of the CRTC first
+            self._stop_locked(connector_id)
+            if mode:
+                scanout = open_scanout(backend, connector_id, mode["width"], mode["height"],
+                                       round(mode["refresh_hz"]))
+            else:
+                scanout = open_scanout(backend, connector_id)
+            self._scanouts[connector_id] = scanout
+            self._scanout_modes[connector_id] = mode
+            self._started[connector_id] = time.monotonic()
+            pattern_process_starts.inc(connector=connector_id)
+        scanout.show(frame_for(scanout))
+
+    # ----------------------------
+    # In-process pipelines
+    # ----------------------------
+
+    def _live_pipeline(self, connector_id, source):
+        """
+        The connector's running pipeline if it was built from source.
+        """
+        pipeline = self._pipelines.get(connector_id)
+        if pipeline is None:
+            return None
+        if not pipeline.alive():
+            # Display unplugged or DRM error: build a fresh pipeline
+            self._stop_locked(connector_id)
+            pattern_process_restarts.inc(connector=connector_id)
+            return None
+        if pipeline.source != source:
+            self._stop_locked(connector_id)
+            return None
+        return pipeline
+
+    def _show_live(self, connector_id, pattern, color, width, height, framerate):
+        pipeline = self._live_pipeline(connector_id, TEST_SOURCE)
+        if pipeline is not None:
+            pipeline.show(pattern, color)
+            pipeline.set_caps(width, height, framerate)
+            return
+
+        pipeline = LivePipeline(connector_id)
+        pipeline.show(pattern, color)
+        pipeline.set_caps(width, height, framerate)
+        self._run_live(connector_id, pipeline)
+
+    def _run_live(self, connector_id, pipeline):
+        pipeline.start()
+        self._pipelines[connector_id] = pipeline
+        self._started[connector_id] = time.monotonic()
+        pattern_process_starts.inc(connector=connector_id)
+
+    # ----------------------------
+    # gst-launch-1.0 child processes
+    # ----------------------------
+
+    @staticmethod
+    def _launch_command(connector_id, pattern, color, width, height, framerate):
         cmd = [
             "gst-launch-1.0",
             "-q",
             "videotestsrc",
             "is-live=true",
-            "pattern=smpte",
+            f"pattern={pattern}",
+        ]
+        if color is not None:
+            cmd.append(f"foreground-color={color}")
+        cmd += [
             "!",
-            "video/x-raw,framerate=30/1",
+            caps_string(width, height, framerate),
             "!",
             "kmssink",
             f"connector-id={connector_id}",
             "sync=false",
         ]
-        self._start(connector_id, cmd)
-
-    def stop(self, connector_id=None):
-        with self._lock:
-            if connector_id is None:
-                for cid in list(self._procs):
-                    self._stop_locked(cid)
-                return
-            self._stop_locked(connector_id)
+        return cmd
 
-    def _start(self, connector_id, cmd):
-        with self._lock:
-            self._ensure_gstreamer_available()
-            self._stop_locked(connector_id)
-            try:
-                self._procs[connector_id] = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                )
-            except FileNotFoundError as exc:
-                raise RuntimeError("gst-launch-1.0 is not installed or not in PATH") from exc
+    def _start_process(self, connector_id, cmd):
+        self._ensure_gstreamer_available()
+        if connector_id in self._procs:
+            pattern_process_restarts.inc(connector=connector_id)
+        self._stop_locked(connector_id)
+        try:
+            self._procs[connector_id] = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as exc:
+            raise RuntimeError("gst-launch-1.0 is not installed or not in PATH") from exc
+        self._started[connector_id] = time.monotonic()
+        pattern_process_starts.inc(connector=connector_id)
 
     def _ensure_gstreamer_available(self):
         if self._has_gstreamer is None:
@@ -85,14 +309,27 @@ class PatternWorker:
         return (0xFF << 24) | rgb
 
     def _stop_locked(self, connector_id):
-        proc = self._procs.get(connector_id)
-        if not proc:
+        pipeline = self._pipelines.pop(connector_id, None)
+        proc = self._procs.pop(connector_id, None)
+        scanout = self._scanouts.pop(connector_id, None)
+        self._scanout_modes.pop(connector_id, None)
+        if pipeline is None and proc is None and scanout is None:
             return
 
-        proc.send_signal(signal.SIGINT)
         try:
-            proc.wait(timeout=2)
-        except subprocess.TimeoutExpired:
-            proc.kill()
+            if scanout is not None:
+                scanout.close()
+            if pipeline is not None:
+                pipeline.stop()
+            if proc is not None:
+                proc.send_signal(signal.SIGINT)
+                try:
+                    proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
         finally:
-            self._procs.pop(connector_id, None)
+            started = self._started.pop(connector_id, None)
+            if started is not None:
+                pattern_process_lifetime_seconds.observe(
+                    time.monotonic() - started, connector=connector_id
+                )
@@ -0,0 +1,121 @@
+"""
+Cold-start timing.
+
+Records how long each startup phase and blueprint import took and when
+the first request was served, so a slow boot on the kiosk can be traced
+to a module. Served at /system/startup; scripts/bench_startup.py turns
+it into a regression check.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Taken when app.py first imports this module, before any blueprint
+_T0 = time.perf_counter()
+
+# Modules that should only load when their feature is first used
+HEAVY_MODULES = (
+    "numpy",
+    "smbus",
+    "backend.core.edid.write",
+    "backend.core.edid.i2c",
+    "backend.core.pattern.worker",
+    "gi",
+)
+
+
+def _process_age():
+    """
+    Seconds since the kernel started this process, or None off Linux.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError):
+        return None
+
+    # Field 22 (starttime); the fields after "(comm)" start at field 3
+    start_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+    return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+class StartupReport:
+    def __init__(self):
+        self._lock = threading.Lock()
+        age = _process_age()
+        self._before_app = _ms(age) if age is not None else None
+        self._phases = []
+        self._imports = []
+        self._first_request = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases.append({
+                    "name": name,
+                    "ms": _ms(time.perf_counter() - start),
+                })
+
+    def timed_import(self, name: str):
+        """
+        Import a module, recording its cost and how many modules it pulled in.
+        """
+        before = len(sys.modules)
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._imports.append({
+                "module": name,
+                "ms": _ms(elapsed),
+                "modules_loaded": len(sys.modules) - before,
+            })
+        return module
+
+    @property
+    def served(self) -> bool:
+        return self._first_request is not None
+
+    def first_request(self, path: str):
+        if self._first_request is not None:
+            return
+        elapsed = time.perf_counter() - _T0
+        with self._lock:
+            if self._first_request is None:
+                self._first_request = {
+                    "path": path,
+                    "ms_since_app_import": _ms(elapsed),
+                    "ms_since_process_start": (
+                        round(self._before_app + _ms(elapsed), 1)
+                        if self._before_app is not None
+                        else None
+                    ),
+                }
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "ms_before_app_import": self._before_app,
+                "phases": list(self._phases),
+                "imports": sorted(self._imports, key=lambda i: -i["ms"]),
+                "first_request": self._first_request,
+                "modules_loaded": len(sys.modules),
+                "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+            }
+
+
+startup = StartupReport()
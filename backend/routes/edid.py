@@ -2,11 +2,16 @@ from flask import Blueprint, jsonify, request
 from pathlib import Path
 import os
 
+from backend.core.edid import drm
 from backend.core.edid.read import read_edid_drm
 from backend.core.edid.compare import find_matching_edid
-from backend.core.edid.decode import decode_basic, edid_to_hex
-from backend.core.edid.write_i2c import write_edid_for_connector
-from backend.core.edid.exceptions import EDIDWriteError
+from backend.core.edid.hotplug import connector_monitor
+from backend.core.edid.decode import decode_edid as decode_edid_bytes, edid_to_hex, format_decoded
+from backend.core.edid.diff import diff_many
+from backend.core.edid.library import open_library
+from backend.core.edid.similar import find_similar_edid
+from backend.core.edid.exceptions import EDIDError, EDIDWriteError
+from backend.core.owner import batches
 
 bp = Blueprint("edid", __name__, url_prefix="/edid")
 
@@ -19,6 +24,18 @@ EDID_DIR = (
 )
 
 
+def _library_edid(filename):
+    """
+    EDID bytes for a library filename, or None if there is no such EDID.
+    """
+    if not filename or not isinstance(filename, str):
+        return None
+    try:
+        return open_library(EDID_DIR).read(filename)
+    except (KeyError, EDIDError):
+        return None
+
+
 
 # --------------------------------------------------
 # READ EDID FROM DRM CONNECTOR
@@ -30,7 +47,7 @@ def read_edid():
     if not connector:
         return jsonify({"error": "No connector specified"}), 400
 
-    path = f"/sys/class/drm/{connector}/edid"
+    path = f"{drm.DRM_SYSFS_PATH}/{connector}/edid"
 
     if not os.path.exists(path):
         return jsonify({"error": f"EDID not found for {connector}"}), 400
@@ -61,8 +78,21 @@ def match_edid():
 
     matches = find_matching_edid(edid, EDID_DIR)
 
+    try:
+        k = int(data.get("k", 5))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid k"}), 400
+
+    try:
+        similar = find_similar_edid(
+            edid, EDID_DIR, k=k, metric=data.get("metric", "field")
+        )
+    except EDIDError as e:
+        return jsonify({"error": str(e)}), 400
+
     return jsonify({
-        "matches": matches
+        "matches": matches,
+        "similar": similar,
     })
 
 @bp.route("/save", methods=["POST"])
@@ -78,14 +108,14 @@ def save_edid():
     if not filename.lower().endswith(".bin"):
         return jsonify({"error": "Filename must end with .bin"}), 400
 
-    target = EDID_DIR / filename
+    library = open_library(EDID_DIR)
 
-    if target.exists():
+    if library.exists(filename):
         return jsonify({"error": "File already exists"}), 400
 
     try:
         edid = bytes.fromhex(edid_hex)
-        target.write_bytes(edid)
+        library.add(filename, edid)
         return jsonify({"saved": True, "filename": filename})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -96,22 +126,13 @@ def save_edid():
 # --------------------------------------------------
 @bp.route("/connectors")
 def list_connectors():
-    drm_path = "/sys/class/drm"
-    connectors = []
-
-    for entry in os.listdir(drm_path):
-        edid_path = os.path.join(drm_path, entry, "edid")
-        if not os.path.exists(edid_path):
-            continue
-
-        try:
-            # Validate EDID header only
-            read_edid_drm(edid_path)
-            connectors.append(entry)
-        except Exception:
-            pass
-
-    return jsonify(connectors)
+    # Served from the hotplug monitor's snapshot: no sysfs I/O here
+    connectors = [
+        c["sysfs_name"]
+        for c in connector_monitor.connectors()
+        if c["edid_valid"]
+    ]
+    return jsonify(sorted(connectors))
 
 
 
@@ -129,23 +150,20 @@ def decode_edid():
     try:
         edid = bytes.fromhex(edid_hex)
 
-        basic = decode_basic(edid)
+        decoded = decode_edid_bytes(edid)
 
         decoded_text = (
             "Decoded EDID\n"
             "============================\n\n"
-            f"Manufacturer      : {basic['manufacturer']}\n"
-            f"Product Code      : {basic['product_code']}\n"
-            f"Serial Number     : {basic['serial']}\n"
-            f"Manufactured Date : Week {basic['week']} / {basic['year']}\n"
-            f"Extensions        : {basic['extensions']}\n\n"
+            f"{format_decoded(decoded)}\n\n"
             "Raw EDID Hex Dump\n"
             "----------------------------\n"
             f"{edid_to_hex(edid)}"
         )
 
         return jsonify({
-            "decoded": decoded_text
+            "decoded": decoded_text,
+            "fields": decoded,
         })
 
     except Exception as e:
@@ -157,10 +175,7 @@ def decode_edid():
 # ----------------------------------------------------      
 @bp.route("/files")
 def list_edid_files():
-    files = sorted(
-        f.name for f in EDID_DIR.glob("*.bin")
-    )
-    return jsonify(files)
+    return jsonify(open_library(EDID_DIR).names())
     
     
 # ----------------------------------------------------
@@ -173,6 +188,8 @@ def write_edid():
     connector = data.get("connector")
     filename = data.get("filename")
     force = bool(data.get("force", False))
+    model = data.get("model") or None
+    delta = bool(data.get("delta", False))
 
     if isinstance(connector, dict):
         connector = connector.get("name")
@@ -180,25 +197,148 @@ def write_edid():
     if not connector or not isinstance(connector, str):
         return jsonify(error="Invalid connector"), 400
 
-    path = EDID_DIR / filename
-    if not path.exists():
+    edid = _library_edid(filename)
+    if edid is None:
         return jsonify({"error": "EDID file not found"}), 404
 
-    edid = path.read_bytes()
+    # smbus and the write path load on first write, not at startup
+    from backend.core.edid.write_i2c import write_edid_for_connector
 
     try:
         result = write_edid_for_connector(
             connector=connector,
             edid=edid,
             force=force,
+            model=model,
+            delta=delta,
         )
         return jsonify({
             "connector": result["connector"],
             "bus": result["bus"],
             "bytes_written": result["bytes_written"],
-            "verified_i2c": result.get("verified", False),
+            "bytes_skipped": result["bytes_skipped"],
+            "delta": result["delta"],
+            "verified_i2c": result.get("verified_i2c", False),
             "verified_drm": True,  # DRM re-read is authoritative
+            "timing": result["timing"],
+        })
+
+    except EDIDWriteError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+# ----------------------------------------------------
+# Field-aware diff (one reference against one or more EDIDs)
+# ----------------------------------------------------
+def _diff_source(item):
+    """
+    A diff operand is either {"filename": ...} from the library or
+    {"edid_hex": ...}. Returns (label, bytes) or raises ValueError.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Invalid diff operand")
+
+    if item.get("edid_hex"):
+        return item.get("label") or "edid_hex", bytes.fromhex(item["edid_hex"])
+
+    filename = item.get("filename")
+    edid = _library_edid(filename)
+    if edid is None:
+        raise ValueError(f"EDID file not found: {filename}")
+    return filename, edid
+
+
+@bp.route("/diff", methods=["POST"])
+def diff_edids():
+    data = request.get_json() or {}
+    others = data.get("targets")
+
+    if not isinstance(others, list) or not others:
+        return jsonify({"error": "No diff targets supplied"}), 400
+
+    try:
+        ref_label, reference = _diff_source(data.get("reference"))
+        sources = [_diff_source(item) for item in others]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = diff_many(reference, [edid for _, edid in sources])
+    for (label, _), result in zip(sources, results):
+        result["target"] = label
+
+    return jsonify({
+        "reference": ref_label,
+        "results": results,
+    })
+
+
+# ----------------------------------------------------
+# EEPROM write throughput per emulator model
+# ----------------------------------------------------
+@bp.route("/write_stats")
+def write_stats():
+    from backend.core.edid.write import get_write_stats
+
+    return jsonify(get_write_stats())
+
+
+# ----------------------------------------------------
+# Batch programming (flashing station)
+# ----------------------------------------------------
+@bp.route("/batch", methods=["POST"])
+def batch_write():
+    data = request.get_json() or {}
+    requested = data.get("targets")
+
+    if not isinstance(requested, list) or not requested:
+        return jsonify({"error": "No targets supplied"}), 400
+
+    targets = []
+    for t in requested:
+        if not isinstance(t, dict):
+            return jsonify({"error": "Invalid target"}), 400
+
+        filename = t.get("filename")
+        edid = _library_edid(filename)
+        if edid is None:
+            return jsonify({"error": f"EDID file not found: {filename}"}), 404
+
+        bus = t.get("bus")
+        if bus is not None:
+            try:
+                bus = int(bus)
+            except (TypeError, ValueError):
+                return jsonify({"error": f"Invalid bus: {bus}"}), 400
+
+        targets.append({
+            "connector": t.get("connector"),
+            "bus": bus,
+            "filename": filename,
+            "edid": edid,
         })
 
+    try:
+        status = batches().start(
+            targets,
+            verify=bool(data.get("verify", True)),
+            delta=bool(data.get("delta", False)),
+            force=bool(data.get("force", False)),
+            model=data.get("model") or None,
+        )
     except EDIDWriteError as e:
         return jsonify({"error": str(e)}), 400
+
+    return jsonify(status), 202
+
+
+@bp.route("/batch")
+def batch_list():
+    return jsonify(batches().list())
+
+
+@bp.route("/batch/<int:job_id>")
+def batch_status(job_id):
+    status = batches().status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown batch job"}), 404
+    return jsonify(status)
@@ -0,0 +1,64 @@
+import os
+import queue
+import threading
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from backend.core.events import event_bus, format_sse
+
+bp = Blueprint("events", __name__)
+
+# Comment line sent when idle so proxies and the browser keep the stream open
+KEEPALIVE_SECONDS = 15
+
+# Each open stream holds a worker thread for as long as the page is open.
+# Past this many per worker process the rest get a 503 and the pages poll
+# instead, so streams cannot take every thread.
+MAX_STREAMS = int(os.environ.get("AMUSE_EVENT_STREAMS", "4"))
+RETRY_AFTER_SECONDS = 30
+
+_streams = threading.BoundedSemaphore(MAX_STREAMS)
+
+
+# ----------------------------
+# SERVER-SENT EVENTS
+# ----------------------------
+
+@bp.route("/events")
+def events():
+    topics = [
+        t.strip() for t in request.args.get("topics", "").split(",")
+        if t.strip()
+    ]
+    if not _streams.acquire(blocking=False):
+        response = jsonify({"error": "Too many open event streams; poll instead"})
+        response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+        return response, 503
+
+    q = event_bus.subscribe(topics or None)
+
+    def stream():
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                topic, data = q.get(timeout=KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(topic, data)
+
+    def close():
+        event_bus.unsubscribe(q)
+        _streams.release()
+
+    response = Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+    # Runs even if the client went away before the stream started
+    response.call_on_close(close)
+    return response
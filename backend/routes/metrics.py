@@ -0,0 +1,10 @@
+from flask import Blueprint, Response
+
+from backend.core.metrics import render
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics")
+def metrics():
+    return Response(render(), mimetype="text/plain; version=0.0.4")
@@ -1,25 +1,21 @@
 import os
-import subprocess
-import threading
 
 from flask import Blueprint, request, jsonify
 
-from backend.core.edid.drm import list_connectors
-from backend.core.pattern.service import pattern_worker
+from backend.core.edid.hotplug import connector_monitor
+from backend.core.owner import pattern_owner
+from backend.core.pattern.owner import (
+    FORCE_GLOBAL_DRM_CONTROL as _FORCE_GLOBAL_DRM_CONTROL,
+    PatternOwnershipError,
+)
+from backend.core.pattern.playlist import BUILTIN_PLAYLISTS, parse_playlist
 
 pattern_bp = Blueprint("pattern_api", __name__, url_prefix="/pattern")
-_DISPLAY_MANAGER_SERVICE = os.environ.get("PATTERN_DISPLAY_MANAGER_SERVICE", "lightdm")
-# Optional fallback for environments that require DRM master handover.
-_FORCE_GLOBAL_DRM_CONTROL = os.environ.get("PATTERN_FORCE_GLOBAL_DRM_CONTROL", "0") == "1"
 _ALLOW_GLOBAL_DRM_CONTROL = _FORCE_GLOBAL_DRM_CONTROL or os.environ.get("PATTERN_ALLOW_GLOBAL_DRM_CONTROL", "0") == "1"
 _PROTECTED_CONNECTORS = {
     name.strip() for name in os.environ.get("PATTERN_PROTECTED_CONNECTORS", "DSI-1").split(",") if name.strip()
 }
 
-_ownership_lock = threading.Lock()
-_owned_connectors = set()
-_display_manager_stopped = False
-
 
 def _global_drm_requested(data):
     if _FORCE_GLOBAL_DRM_CONTROL:
@@ -43,10 +39,8 @@ def _parse_connector_id(data, default=None):
 
 
 def _connector_name_by_id(connector_id):
-    for output in list_connectors():
-        if output.get("connector_id") == connector_id:
-            return output.get("name")
-    return None
+    output = connector_monitor.by_id(connector_id)
+    return output["name"] if output else None
 
 
 def _is_protected_connector(connector_id):
@@ -56,49 +50,26 @@ def _is_protected_connector(connector_id):
     return name in _PROTECTED_CONNECTORS, name
 
 
-def _set_display_manager(enabled):
-    action = "start" if enabled else "stop"
-    result = subprocess.run(["systemctl", action, _DISPLAY_MANAGER_SERVICE], check=False)
-    return result.returncode == 0
-
-
-def _ensure_global_drm_control(requested=False):
-    global _display_manager_stopped
-
-    if not (_FORCE_GLOBAL_DRM_CONTROL or requested):
-        return True, None
-
-    if _display_manager_stopped:
-        return True, None
-
-    dm_ok = _set_display_manager(enabled=False)
-    if not dm_ok:
-        return False, f"failed to stop display manager service '{_DISPLAY_MANAGER_SERVICE}'"
-
-    _display_manager_stopped = True
-    return True, None
-
-
-def _maybe_release_global_drm_control(requested=False):
-    global _display_manager_stopped
-
-    if not (_FORCE_GLOBAL_DRM_CONTROL or requested):
-        return True, None
-
-    if not _display_manager_stopped or _owned_connectors:
-        return True, None
+@pattern_bp.route("/outputs", methods=["GET"])
+def outputs():
+    return jsonify(connector_monitor.connectors())
 
-    dm_ok = _set_display_manager(enabled=True)
-    if not dm_ok:
-        return False, f"failed to start display manager service '{_DISPLAY_MANAGER_SERVICE}'"
 
-    _display_manager_stopped = False
-    return True, None
+@pattern_bp.route("/modes", methods=["GET"])
+def modes():
+    connector_id, error_response, code = _parse_connector_id(request.args)
+    if error_response:
+        return error_response, code
 
+    from backend.core.pattern.modes import connector_modes
 
-@pattern_bp.route("/outputs", methods=["GET"])
-def outputs():
-    return jsonify(list_connectors())
+    result = connector_modes(connector_id)
+    if result is None:
+        return jsonify({
+            "ok": False,
+            "error": "no usable EDID on this connector; patterns use the default size",
+        }), 404
+    return jsonify({"ok": True, "connector_id": connector_id, **result})
 
 
 @pattern_bp.route("/capabilities", methods=["GET"])
@@ -106,6 +77,8 @@ def capabilities():
     protected = sorted(_PROTECTED_CONNECTORS)
     return jsonify({
         "renderer": "gstreamer-kmssink",
+        **pattern_owner().output_modes(),
+        "patterns": pattern_owner().patterns(),
         "display_control_scope": "per-connector-reservation",
         "global_drm_handover_scope": "all-displays",
         "supports_connector_selection": True,
@@ -147,46 +120,42 @@ def control():
             "error": f"connector '{connector_name}' is protected and cannot be taken over",
         }), 403
 
-    with _ownership_lock:
-        if action == "take":
-            if use_global_drm_control:
-                ok, err = _ensure_global_drm_control(requested=True)
-                if not ok:
-                    return jsonify({"ok": False, "error": err}), 500
-
-            _owned_connectors.add(connector_id)
-            return jsonify({
-                "ok": True,
-                "action": action,
-                "connector_id": connector_id,
-                "owned_connectors": sorted(_owned_connectors),
-                "global_drm_control": use_global_drm_control,
-                "warning": "Global DRM handover stops the display manager and affects all displays."
-                if use_global_drm_control
-                else None,
-                "message": "Connector reserved for pattern output."
-                if not use_global_drm_control
-                else "Connector reserved and global DRM control acquired.",
-            })
-
-        pattern_worker.stop(connector_id)
-        _owned_connectors.discard(connector_id)
-
-        ok, err = (True, None)
-        if use_global_drm_control or _FORCE_GLOBAL_DRM_CONTROL:
-            ok, err = _maybe_release_global_drm_control(requested=use_global_drm_control)
-        if not ok:
-            return jsonify({"ok": False, "error": err}), 500
+    owner = pattern_owner()
+
+    if action == "take":
+        try:
+            owned = owner.take(connector_id, global_drm=use_global_drm_control)
+        except RuntimeError as exc:
+            return jsonify({"ok": False, "error": str(exc)}), 500
 
         return jsonify({
             "ok": True,
             "action": action,
             "connector_id": connector_id,
-            "owned_connectors": sorted(_owned_connectors),
-            "global_drm_control": use_global_drm_control or _FORCE_GLOBAL_DRM_CONTROL,
-            "message": "Connector released.",
+            "owned_connectors": owned,
+            "global_drm_control": use_global_drm_control,
+            "warning": "Global DRM handover stops the display manager and affects all displays."
+            if use_global_drm_control
+            else None,
+            "message": "Connector reserved for pattern output."
+            if not use_global_drm_control
+            else "Connector reserved and global DRM control acquired.",
         })
 
+    try:
+        owned = owner.release(connector_id, global_drm=use_global_drm_control)
+    except RuntimeError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 500
+
+    return jsonify({
+        "ok": True,
+        "action": action,
+        "connector_id": connector_id,
+        "owned_connectors": owned,
+        "global_drm_control": use_global_drm_control or _FORCE_GLOBAL_DRM_CONTROL,
+        "message": "Connector released.",
+    })
+
 
 @pattern_bp.route("/start", methods=["POST"])
 def start():
@@ -204,23 +173,16 @@ def start():
         }), 403
 
     mode = data.get("mode", "colorbars")
-
-    with _ownership_lock:
-        if connector_id not in _owned_connectors:
-            return jsonify({
-                "ok": False,
-                "error": "connector is not taken. Use Take Display Control first.",
-            }), 409
-
-        ok, err = _ensure_global_drm_control(requested=False)
-        if not ok:
-            return jsonify({"ok": False, "error": err}), 500
+    pattern = data.get("pattern")
+    if mode == "pattern" and not pattern:
+        return jsonify({"ok": False, "error": "pattern is required for mode 'pattern'"}), 400
 
     try:
-        if mode == "solid":
-            pattern_worker.start_solid_color(connector_id, data.get("color", "#ffffff"))
-        else:
-            pattern_worker.start_colorbars(connector_id)
+        pattern_owner().start(connector_id, mode, data.get("color", "#ffffff"), pattern)
+    except PatternOwnershipError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 409
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
     except RuntimeError as exc:
         return jsonify({"ok": False, "error": str(exc)}), 500
 
@@ -228,6 +190,7 @@ def start():
         "ok": True,
         "connector_id": connector_id,
         "mode": mode,
+        "pattern": pattern if mode == "pattern" else None,
         "global_drm_control": _FORCE_GLOBAL_DRM_CONTROL,
     })
 
@@ -238,12 +201,77 @@ def stop():
     connector_id = data.get("connector_id")
 
     if connector_id is None:
-        pattern_worker.stop()
+        pattern_owner().stop()
         return jsonify({"ok": True, "scope": "all"})
 
     connector_id, error_response, code = _parse_connector_id(data)
     if error_response:
         return error_response, code
 
-    pattern_worker.stop(connector_id)
+    pattern_owner().stop(connector_id)
     return jsonify({"ok": True, "connector_id": connector_id})
+
+
+@pattern_bp.route("/playlists", methods=["GET"])
+def playlists():
+    return jsonify(BUILTIN_PLAYLISTS)
+
+
+@pattern_bp.route("/playlist/start", methods=["POST"])
+def playlist_start():
+    data = request.get_json(silent=True) or {}
+
+    connector_id, error_response, code = _parse_connector_id(data)
+    if error_response:
+        return error_response, code
+
+    protected, connector_name = _is_protected_connector(connector_id)
+    if protected:
+        return jsonify({
+            "ok": False,
+            "error": f"connector '{connector_name}' is protected and cannot be driven by pattern output",
+        }), 403
+
+    try:
+        playlist = parse_playlist(data.get("playlist"))
+        status = pattern_owner().start_playlist(connector_id, playlist)
+    except PatternOwnershipError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 409
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
+    except RuntimeError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 500
+
+    return jsonify({"ok": True, "status": status})
+
+
+@pattern_bp.route("/playlist/stop", methods=["POST"])
+def playlist_stop():
+    data = request.get_json(silent=True) or {}
+
+    if data.get("connector_id") is None:
+        pattern_owner().stop_playlist()
+        return jsonify({"ok": True, "scope": "all"})
+
+    connector_id, error_response, code = _parse_connector_id(data)
+    if error_response:
+        return error_response, code
+
+    pattern_owner().stop_playlist(connector_id)
+    return jsonify({"ok": True, "connector_id": connector_id})
+
+
+@pattern_bp.route("/playlist/status", methods=["GET"])
+def playlist_status():
+    if request.args.get("connector_id") is None:
+        return jsonify({"ok": True, "playlists": pattern_owner().playlist_status()})
+
+    connector_id, error_response, code = _parse_connector_id(request.args)
+    if error_response:
+        return error_response, code
+
+    return jsonify({
+        "ok": True,
+        "connector_id": connector_id,
+        "status": pattern_owner().playlist_status(connector_id),
+    })
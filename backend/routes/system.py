@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify
 import subprocess
 
+from backend.core.startup import startup
+
 bp = Blueprint("system", __name__, url_prefix="/system")
 
 
@@ -25,6 +27,7 @@ def update():
     """
     Safe update:
       - pull latest code
+      - rebuild fingerprinted static assets
       - preserve runtime files
       - restart service
     """
@@ -34,8 +37,15 @@ def update():
     set -e
     cd ~/AmuseTechTools
     git pull origin main
+    PY=python3; [ -x .venv/bin/python ] && PY=.venv/bin/python
+    "$PY" scripts/build_assets.py || true
     nohup bash -lc "sleep 1; systemctl --user restart amuse-tech-tools.service" >/dev/null 2>&1 &
     """
 
     subprocess.Popen(["bash", "-lc", cmd])
     return jsonify({"status": "ok", "mode": "pull"})
+
+
+@bp.route("/startup")
+def startup_report():
+    return jsonify(startup.report())
@@ -1,48 +1,96 @@
 from flask import Blueprint, jsonify, request
 from pathlib import Path
 import os
-import shutil
-import hashlib
+
+from backend.core.edid.bundle import (
+    BUNDLE_FILENAME,
+    read_bundle_index,
+    read_entries,
+    write_bundle,
+)
+from backend.core.edid.exceptions import EDIDError
+from backend.core.edid.index import EDIDIndex
+from backend.core.edid.library import open_library
+from backend.core.metrics import usb_bytes_copied
+from backend.core.mounts import mount_monitor
 
 bp = Blueprint("usb", __name__, url_prefix="/usb")
 
-EDID_DIR = Path("edid_files")
-USB_MOUNT_BASES = ["/media", "/mnt"]
+EDID_DIR = (
+    Path(__file__)
+    .resolve()
+    .parents[2]   # backend/routes → backend → repo root
+    / "edid_files"
+)
 
 
 # ----------------------------
 # Helpers
 # ----------------------------
 
-def file_hash(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        h.update(f.read())
-    return h.hexdigest()
-
-
-def list_usb_mounts():
-    mounts = []
-
-    for base in USB_MOUNT_BASES:
-        base_path = Path(base)
-        if not base_path.exists():
+def usb_manifest(mount) -> dict:
+    """
+    {name: {"hash", "size", "mtime_ns"}} for the .bin files on a stick.
+
+    The manifest lives on the stick itself (.edid_index.json), so only
+    files added or changed since the last sync are read and hashed. A
+    fresh index is used per call: a different stick may now be mounted
+    at the same path.
+    """
+    index = EDIDIndex(mount, source="usb")
+    index.refresh(force=True)
+    return index.entries()
+
+
+def local_manifest() -> dict:
+    library = open_library(EDID_DIR)
+    library.refresh(force=True)
+    return library.entries()
+
+
+def sync_delta(src: dict, dst: dict) -> list:
+    """
+    Names in src missing from dst or present there with other content.
+    """
+    return sorted(
+        name for name, entry in src.items()
+        if name not in dst or dst[name]["hash"] != entry["hash"]
+    )
+
+
+def export_files(mount: Path, local: dict, names) -> dict:
+    """
+    Write names from the library to the stick; return {name: hash} of
+    what was written, for updating the stick manifest without rereading.
+    """
+    library = open_library(EDID_DIR)
+    written = {}
+    for name in names:
+        data = library.read(name)
+        (mount / name).write_bytes(data)
+        usb_bytes_copied.inc(len(data), direction="export")
+        written[name] = local[name]["hash"]
+    return written
+
+
+def bundle_delta(bundle: dict, local: dict, exclude=()) -> dict:
+    """
+    {name: hash} of bundle entries whose content is not already held
+    locally, one name per distinct hash.
+    """
+    have = {e["hash"] for e in local.values()} | set(exclude)
+    wanted = {}
+    for name, entry in sorted(bundle.items()):
+        if entry["hash"] in have:
             continue
+        have.add(entry["hash"])
+        wanted[name] = entry["hash"]
+    return wanted
 
-        for user_dir in base_path.iterdir():
-            if not user_dir.is_dir():
-                continue
-
-            # If this dir itself is a mount, include it
-            mounts.append(str(user_dir))
-
-            # Also scan one level deeper (common auto-mount layout)
-            for p in user_dir.iterdir():
-                if p.is_dir():
-                    mounts.append(str(p))
 
-    # Remove duplicates + non-mounted paths
-    return sorted(set(mounts))
+def list_usb_mounts():
+    # Mounted removable block devices, kept current by the mount monitor
+    return [m["path"] for m in mount_monitor.mounts()]
 
 
 # ----------------------------
@@ -51,16 +99,7 @@ def list_usb_mounts():
 
 @bp.route("/status")
 def usb_status():
-    mounts = list_usb_mounts()
-    result = []
-
-    for m in mounts:
-        result.append({
-            "path": m,
-            "name": os.path.basename(m),
-        })
-
-    return jsonify(result)
+    return jsonify(mount_monitor.mounts())
 
 
 # ----------------------------
@@ -73,22 +112,28 @@ def usb_scan():
     if not mount or not os.path.isdir(mount):
         return jsonify({"error": "Invalid mount"}), 400
 
-    mount_path = Path(mount)
-
-    usb_bins = list(mount_path.glob("*.bin"))
-    local_hashes = {
-        file_hash(f): f.name
-        for f in EDID_DIR.glob("*.bin")
-    }
+    local_hashes = {e["hash"] for e in local_manifest().values()}
 
     files = []
-    for f in usb_bins:
-        h = file_hash(f)
+    for name, entry in sorted(usb_manifest(mount).items()):
         files.append({
-            "name": f.name,
-            "exists": h in local_hashes,
+            "name": name,
+            "exists": entry["hash"] in local_hashes,
         })
 
+    bundle_path = Path(mount) / BUNDLE_FILENAME
+    if bundle_path.is_file():
+        try:
+            bundle = read_bundle_index(bundle_path)
+        except EDIDError as e:
+            return jsonify({"error": str(e)}), 400
+        for name, entry in sorted(bundle.items()):
+            files.append({
+                "name": name,
+                "exists": entry["hash"] in local_hashes,
+                "bundle": True,
+            })
+
     return jsonify(files)
 
 # ----------------------------
@@ -101,19 +146,13 @@ def usb_scan_local():
     if not mount or not os.path.isdir(mount):
         return jsonify({"error": "Invalid mount"}), 400
 
-    mount_path = Path(mount)
-
-    usb_hashes = {
-        file_hash(f): f.name
-        for f in mount_path.glob("*.bin")
-    }
+    usb_hashes = {e["hash"] for e in usb_manifest(mount).values()}
 
     files = []
-    for f in EDID_DIR.glob("*.bin"):
-        h = file_hash(f)
+    for name, entry in sorted(local_manifest().items()):
         files.append({
-            "name": f.name,
-            "exists": h in usb_hashes,
+            "name": name,
+            "exists": entry["hash"] in usb_hashes,
         })
 
     return jsonify(files)
@@ -131,23 +170,46 @@ def usb_import():
     if not mount or not os.path.isdir(mount):
         return jsonify({"error": "Invalid mount"}), 400
 
-    imported = []
-    skipped = []
-
-    for src in Path(mount).glob("*.bin"):
-        dst = EDID_DIR / src.name
-
-        if dst.exists() and file_hash(src) == file_hash(dst):
-            skipped.append(src.name)
-            continue
-
-        imported.append(src.name)
-        if not dry_run:
-            shutil.copy2(src, dst)
-
+    usb = usb_manifest(mount)
+    local = local_manifest()
+    imported = sync_delta(usb, local)
+
+    # Bundle entries: read from its index, deduplicated by content hash
+    bundle_path = Path(mount) / BUNDLE_FILENAME
+    from_bundle = {}
+    bundle_total = 0
+    if bundle_path.is_file():
+        try:
+            bundle = read_bundle_index(bundle_path)
+        except EDIDError as e:
+            return jsonify({"error": str(e)}), 400
+        bundle_total = len(bundle)
+        from_bundle = bundle_delta(
+            bundle, local, exclude=(usb[n]["hash"] for n in imported)
+        )
+        from_bundle = {
+            n: h for n, h in from_bundle.items() if n not in imported
+        }
+
+    if not dry_run and (imported or from_bundle):
+        incoming = {
+            name: (Path(mount) / name).read_bytes() for name in imported
+        }
+        try:
+            if from_bundle:
+                incoming.update(read_entries(bundle_path, from_bundle))
+            open_library(EDID_DIR).add_many(incoming, overwrite=True)
+        except EDIDError as e:
+            return jsonify({"error": str(e)}), 400
+        usb_bytes_copied.inc(
+            sum(len(d) for d in incoming.values()), direction="import"
+        )
+
+    files = sorted(imported + list(from_bundle))
     return jsonify({
-        "new": len(imported),
-        "skipped": len(skipped)
+        "new": len(files),
+        "skipped": len(usb) + bundle_total - len(files),
+        "files": files,
     })
 
 # ----------------------------
@@ -163,21 +225,47 @@ def usb_export():
     if not mount or not os.path.isdir(mount):
         return jsonify({"error": "Invalid mount"}), 400
 
-    exported = []
-    skipped = []
+    local = local_manifest()
 
-    for src in EDID_DIR.glob("*.bin"):
-        dst = Path(mount) / src.name
+    if data.get("format") == "bundle":
+        return _export_bundle(Path(mount), local, dry_run)
 
-        if dst.exists() and file_hash(src) == file_hash(dst):
-            skipped.append(src.name)
-            continue
+    usb_index = EDIDIndex(mount, source="usb")
+    usb_index.refresh(force=True)
+    exported = sync_delta(local, usb_index.entries())
+
+    if not dry_run and exported:
+        written = export_files(Path(mount), local, exported)
+        usb_index.add_many(written)
+
+    return jsonify({
+        "new": len(exported),
+        "skipped": len(local) - len(exported),
+        "files": exported,
+    })
+
+
+def _export_bundle(mount: Path, local: dict, dry_run: bool):
+    """
+    Write the whole library as one bundle file. Counts are relative to
+    the bundle already on the stick, which is left alone if unchanged.
+    """
+    bundle_path = mount / BUNDLE_FILENAME
+    try:
+        previous = read_bundle_index(bundle_path) if bundle_path.is_file() else {}
+    except EDIDError:
+        previous = {}
+
+    exported = sync_delta(local, previous)
+    stale = set(previous) - set(local)
 
-        exported.append(src.name)
-        if not dry_run:
-            shutil.copy2(src, dst)
+    if not dry_run and (exported or stale):
+        write_bundle(bundle_path, local, open_library(EDID_DIR).read)
+        usb_bytes_copied.inc(bundle_path.stat().st_size, direction="export")
 
     return jsonify({
         "new": len(exported),
-        "skipped": len(skipped)
+        "skipped": len(local) - len(exported),
+        "files": exported,
+        "bundle": BUNDLE_FILENAME,
     })
@@ -38,36 +38,82 @@ function formatHexEdid(hexString) {
 // Connector handling
 // ==============================
 function loadConnectors(isRefresh = false) {
+    fetch("/edid/connectors")
+        .then(res => res.json())
+        .then(connectors => renderConnectors(connectors, isRefresh))
+        .catch(err => console.error("Connector load failed:", err));
+}
+
+function renderConnectors(connectors, keepSelection = true) {
     const portSelect = getEl("port");
     if (!portSelect) return;
 
     const previous = portSelect.value;
+    portSelect.innerHTML = "";
 
-    fetch("/edid/connectors")
-        .then(res => res.json())
-        .then(connectors => {
-            portSelect.innerHTML = "";
+    if (!connectors.length) {
+        const opt = document.createElement("option");
+        opt.text = "No EDID ports found";
+        opt.disabled = true;
+        portSelect.appendChild(opt);
+        return;
+    }
 
-            if (!connectors.length) {
-                const opt = document.createElement("option");
-                opt.text = "No EDID ports found";
-                opt.disabled = true;
-                portSelect.appendChild(opt);
-                return;
-            }
+    connectors.forEach(c => {
+        const opt = document.createElement("option");
+        opt.value = c;
+        opt.text = c;
+        portSelect.appendChild(opt);
+    });
 
-            connectors.forEach(c => {
-                const opt = document.createElement("option");
-                opt.value = c;
-                opt.text = c;
-                portSelect.appendChild(opt);
-            });
+    if (keepSelection && connectors.includes(previous)) {
+        portSelect.value = previous;
+    }
+}
 
-            if (isRefresh && connectors.includes(previous)) {
-                portSelect.value = previous;
-            }
-        })
-        .catch(err => console.error("Connector load failed:", err));
+// Hotplug: the server pushes the connector snapshot whenever it changes.
+// Without a stream (no EventSource, or the server is at its stream limit
+// and answered 503) the page polls instead.
+const EVENTS_POLL_MS = 10000;
+
+function watchEvents() {
+    if (!window.EventSource) {
+        pollEvents();
+        return;
+    }
+
+    const source = new EventSource("/events?topics=connectors,usb");
+    source.addEventListener("connectors", e => {
+        const connectors = JSON.parse(e.data)
+            .filter(c => c.edid_valid)
+            .map(c => c.sysfs_name)
+            .sort();
+        renderConnectors(connectors);
+    });
+    source.addEventListener("usb", e => renderUsbDrives(JSON.parse(e.data)));
+    source.addEventListener("error", () => {
+        // CLOSED: refused for good (network drops reconnect by themselves)
+        if (source.readyState === EventSource.CLOSED) pollEvents();
+    });
+}
+
+function pollEvents() {
+    const last = {};
+    // Re-render only on change, so status messages are not overwritten
+    const poll = (url, render) =>
+        fetch(url)
+            .then(res => res.text())
+            .then(text => {
+                if (text === last[url]) return;
+                last[url] = text;
+                render(JSON.parse(text));
+            })
+            .catch(err => console.error("Poll failed:", err));
+
+    setInterval(() => {
+        poll("/edid/connectors", connectors => renderConnectors(connectors));
+        poll("/usb/status", renderUsbDrives);
+    }, EVENTS_POLL_MS);
 }
 
 
@@ -121,7 +167,12 @@ function readEdid() {
                 if (matchDiv) matchDiv.innerText = `✔ Match found: ${names}`;
                 if (saveBtn) saveBtn.disabled = true;
             } else {
-                if (matchDiv) matchDiv.innerText = "❌ No matching EDID found";
+                const closest = result.similar && result.similar[0];
+                if (matchDiv) {
+                    matchDiv.innerText = closest
+                        ? `❌ No matching EDID found (closest: ${closest.filename}, ${Math.round(closest.similarity * 100)}% similar)`
+                        : "❌ No matching EDID found";
+                }
                 if (saveBtn) saveBtn.disabled = false;
             }
         })
@@ -255,35 +306,44 @@ function saveEdid() {
 // ==============================
 //Load USB Drives
 function loadUsbDrives() {
-    const sel = getEl("usbDrive");
     const status = getEl("usbStatus");
-    if (!sel || !status) return;
 
     fetch("/usb/status")
         .then(r => r.json())
-        .then(drives => {
-            sel.innerHTML = "";
-
-            if (!drives.length) {
-                status.innerText = "No USB drives found";
-                return;
-            }
-
-            drives.forEach(d => {
-                const opt = document.createElement("option");
-                opt.value = d.path;   // ✅ MUST be string
-                opt.textContent = d.name;
-                sel.appendChild(opt);
-            });
-
-            status.innerText = "USB ready";
-        })
+        .then(drives => renderUsbDrives(drives))
         .catch(err => {
             console.error(err);
-            status.innerText = "USB scan failed";
+            if (status) status.innerText = "USB scan failed";
         });
 }
 
+function renderUsbDrives(drives) {
+    const sel = getEl("usbDrive");
+    const status = getEl("usbStatus");
+    if (!sel || !status) return;
+
+    const previous = sel.value;
+    sel.innerHTML = "";
+
+    if (!drives.length) {
+        status.innerText = "No USB drives found";
+        return;
+    }
+
+    drives.forEach(d => {
+        const opt = document.createElement("option");
+        opt.value = d.path;   // ✅ MUST be string
+        opt.textContent = d.name;
+        sel.appendChild(opt);
+    });
+
+    if (drives.some(d => d.path === previous)) {
+        sel.value = previous;
+    }
+
+    status.innerText = "USB ready";
+}
+
 
 //IMPORT
 
@@ -337,6 +397,7 @@ Proceed?`;
 function exportEdids() {
     const mount = getEl("usbDrive")?.value;
     const status = getEl("usbStatus");
+    const format = getEl("usbBundle")?.checked ? "bundle" : "files";
 
     if (!mount) {
         alert("Please select a USB drive");
@@ -347,7 +408,7 @@ function exportEdids() {
     fetch("/usb/export", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ mount, dry_run: true })
+        body: JSON.stringify({ mount, format, dry_run: true })
     })
     .then(r => r.json())
     .then(summary => {
@@ -365,7 +426,7 @@ Proceed?`;
         return fetch("/usb/export", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ mount, dry_run: false })
+            body: JSON.stringify({ mount, format, dry_run: false })
         });
     })
     .then(r => r?.json())
@@ -442,7 +503,8 @@ function writeEdid() {
         body: JSON.stringify({
             connector: connector,
             filename: filename,
-            force: true
+            force: true,
+            delta: true
         })
     })
     .then(r => r.json())
@@ -456,6 +518,7 @@ function writeEdid() {
 			"EDID written successfully!\n\n" +
 			`Connector: ${res.connector}\n` +
 			`I2C bus: ${res.bus}\n` +
+			`Bytes written: ${res.bytes_written} (skipped ${res.bytes_skipped} unchanged)\n` +
 			`Verified (I2C): ${res.verified_i2c ? "Yes" : "No"}\n` +
 			`Verified (DRM): ${res.verified_drm ? "Yes" : "No"}`
 
@@ -481,6 +544,7 @@ window.navBack = function () {
 // ==============================
 document.addEventListener("DOMContentLoaded", () => {
     loadConnectors();
+    watchEvents();
 	loadUsbDrives();
 	loadEdidFiles();
 });
@@ -0,0 +1,69 @@
+"""
+gunicorn settings for AmuseTechTools.
+
+Several threaded workers serve the web UI so a slow I2C write or USB scan
+only occupies one thread. Hardware state that must exist once per machine
+(pattern ownership and pipelines, EDID batch jobs) lives in a separate
+owner process started here; workers reach it over a Unix socket (see
+backend/core/owner.py).
+"""
+
+import multiprocessing
+import os
+import secrets
+import shutil
+import tempfile
+
+bind = os.environ.get("AMUSE_BIND", "0.0.0.0:8080")
+worker_class = "gthread"
+workers = int(os.environ.get("AMUSE_WORKERS", "2"))
+threads = int(os.environ.get("AMUSE_THREADS", "8"))
+# SSE streams and EEPROM writes hold a request open for a long time
+timeout = 120
+graceful_timeout = 10
+
+# Same as backend.core.metrics.METRICS_DIR_ENV
+METRICS_DIR_ENV = "METRICS_DIR"
+
+_owner = None
+
+
+def on_starting(server):
+    global _owner
+    from backend.core.owner import OWNER_AUTHKEY_ENV, OWNER_SOCKET_ENV, supervise_owner
+
+    # Every process (workers and owner) leaves a metrics snapshot here.
+    # backend.core.metrics is deliberately not imported in the master, so
+    # each forked process starts its own snapshot writer.
+    metrics_dir = os.environ.get(METRICS_DIR_ENV) or os.path.join(
+        tempfile.gettempdir(), f"amuse-metrics-{os.getpid()}"
+    )
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.environ[METRICS_DIR_ENV] = metrics_dir
+
+    address = os.environ.get(OWNER_SOCKET_ENV) or os.path.join(
+        tempfile.gettempdir(), f"amuse-owner-{os.getpid()}.sock"
+    )
+    authkey = secrets.token_hex(16)
+    os.environ[OWNER_SOCKET_ENV] = address
+    os.environ[OWNER_AUTHKEY_ENV] = authkey
+
+    # The supervisor restarts the owner if it dies. Not a daemon: daemonic
+    # processes cannot start children.
+    _owner = multiprocessing.Process(
+        target=supervise_owner,
+        args=(address, bytes.fromhex(authkey)),
+        name="hardware-owner-supervisor",
+    )
+    _owner.start()
+
+
+def on_exit(server):
+    if _owner is not None:
+        # The master reaps its children itself, so is_alive() is not
+        # reliable here; terminate() is harmless if it already exited
+        _owner.terminate()
+        _owner.join(10)
+    metrics_dir = os.environ.get(METRICS_DIR_ENV)
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
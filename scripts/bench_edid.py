@@ -0,0 +1,443 @@
+"""
+EDID path benchmark suite on simulated hardware.
+
+Runs read, write, verify, match, save, connector listing and USB
+scan/import/export against a fake /sys/class/drm tree, simulated SMBus
+EEPROMs at 0x50 (scripts/sim_hardware.py) and a fake USB mount, for
+several EDID library sizes. Reports throughput and latency percentiles
+and, given a baseline, fails if any scenario got slower than the
+threshold allows.
+
+    python3 scripts/bench_edid.py --sizes 10,1000,10000 --save-baseline bench.json
+    python3 scripts/bench_edid.py --baseline bench.json --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import sim_hardware as sim
+
+DEFAULT_SIZES = (10, 1000, 10000)
+DEFAULT_ITERATIONS = 20
+# EDIDs added per iteration to the stick / library in the import and
+# export scenarios
+SYNC_BATCH = 10
+
+HDMI_BUS = 20
+HDMI2_BUS = 21
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1,
+                      round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def measure(fn, iterations, setup=None, warmup=1):
+    """
+    Time fn() iterations times. setup(i), if given, runs untimed before
+    each call. The first warmup calls are timed separately as cold_ms.
+    """
+    cold = []
+    samples = []
+    for i in range(warmup + iterations):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        (cold if i < warmup else samples).append(elapsed)
+
+    samples.sort()
+    total_s = sum(samples) / 1000
+    return {
+        "n": len(samples),
+        "ops_per_s": round(len(samples) / total_s, 1) if total_s else None,
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p90_ms": round(_percentile(samples, 90), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "max_ms": round(samples[-1], 3),
+        "cold_ms": round(cold[0], 3) if cold else None,
+    }
+
+
+def _ok(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.request.path}: {response.status_code} {response.get_data(as_text=True)}")
+    return response.get_json()
+
+
+# ----------------------------
+# Environment
+# ----------------------------
+
+class Bench:
+    def __init__(self, workdir, latency, write_cycle, backend):
+        self.workdir = workdir
+        self.template = open(sim.TEMPLATE_EDID, "rb").read()
+        self.next_id = 1_000_000
+
+        # Must be in place before the backend modules are imported
+        os.environ["DRM_SYSFS_PATH"] = os.path.join(workdir, "drm")
+        os.environ["EDID_LIBRARY_BACKEND"] = backend
+        os.environ["I2C_BUS_LOCK_DIR"] = workdir
+        sim.install_simulated_bus()
+
+        self.hdmi_edid = self.edid(1)
+        sim.buses[HDMI_BUS] = sim.SimulatedEEPROM(
+            self.hdmi_edid, latency=latency, write_cycle=write_cycle,
+        )
+        sim.buses[HDMI2_BUS] = sim.SimulatedEEPROM(
+            self.edid(2), latency=latency, write_cycle=write_cycle,
+        )
+        sim.build_drm_tree(os.environ["DRM_SYSFS_PATH"], [
+            ("HDMI-A-1", 32, True, self.hdmi_edid, HDMI_BUS),
+            ("HDMI-A-2", 40, True, self.edid(2), HDMI2_BUS),
+            ("DP-1", 45, False, b"", None),
+            ("DSI-1", 50, True, self.edid(3), None),
+        ])
+
+        self.mount, mountinfo, sys_block = sim.build_usb_mount(workdir)
+
+        from backend.core import mounts
+
+        mounts.MOUNTINFO_PATH = mountinfo
+        mounts.SYS_DEV_BLOCK = sys_block
+
+        from app import create_app
+
+        self.client = create_app().test_client()
+
+    def edid(self, i):
+        return sim.make_edid(i, self.template)
+
+    def fresh_edid(self):
+        self.next_id += 1
+        return self.edid(self.next_id)
+
+    def use_library(self, size):
+        """
+        Point the app at a new library of size EDIDs and a stick holding
+        half of them plus as many unknown ones.
+        """
+        from backend.core.edid.library import open_library
+        from backend.routes import edid as edid_routes
+        from backend.routes import usb as usb_routes
+
+        directory = os.path.join(self.workdir, f"library-{size}")
+        library = open_library(directory)
+        library.add_many(
+            {f"sim_{i:06d}.bin": self.edid(i) for i in range(size)},
+            overwrite=True,
+        )
+        edid_routes.EDID_DIR = directory
+        usb_routes.EDID_DIR = directory
+
+        shutil.rmtree(self.mount, ignore_errors=True)
+        os.makedirs(self.mount)
+        for i in range(size // 2):
+            self._stick_write(f"sim_{i:06d}.bin", self.edid(i))
+        for i in range(size // 2):
+            self._stick_write(f"usb_{i:06d}.bin", self.fresh_edid())
+
+        self.library_dir = directory
+        self.known_edid = self.edid(size // 2)
+        return library
+
+    def _stick_write(self, name, data):
+        with open(os.path.join(self.mount, name), "wb") as f:
+            f.write(data)
+
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+
+def hardware_scenarios(bench, iterations):
+    from backend.core.edid.diff import diff_edid
+    from backend.core.edid.drm import list_connectors
+    from backend.core.edid.hotplug import connector_monitor
+    from backend.core.edid.i2c import read_edid_i2c
+    from backend.core.edid.write_i2c import write_edid_for_connector
+
+    writes = max(3, iterations // 4)
+    full = [bench.edid(10), bench.edid(11)]
+    # Same EDID apart from the serial number: a handful of bytes differ
+    delta = [bench.edid(12), bytearray(bench.edid(12))]
+    delta[1][12] ^= 0xFF
+    delta[1][127] = (-sum(delta[1][:127])) & 0xFF
+    delta[1] = bytes(delta[1])
+
+    state = {"i": 0}
+
+    def alternate(pair):
+        state["i"] += 1
+        return pair[state["i"] % 2]
+
+    def verify():
+        observed = read_edid_i2c(HDMI_BUS, length=128, strict=False)["edid"]
+        diff_edid(observed, observed)
+
+    return {
+        "connectors.list": measure(list_connectors, iterations),
+        "connectors.rescan": measure(
+            lambda: connector_monitor.rescan(publish=False), iterations
+        ),
+        "connectors.route": measure(
+            lambda: _ok(bench.client.get("/edid/connectors")), iterations
+        ),
+        "read.drm": measure(
+            lambda: _ok(bench.client.get("/edid/read?connector=card0-HDMI-A-1")),
+            iterations,
+        ),
+        "read.i2c": measure(
+            lambda: read_edid_i2c(HDMI_BUS, length=None), iterations
+        ),
+        "read.i2c_block": measure(
+            lambda: read_edid_i2c(HDMI_BUS, length=None, method="block"),
+            iterations,
+        ),
+        "write.full": measure(
+            lambda: write_edid_for_connector(
+                "HDMI-A-1", alternate(full), verify=False
+            ),
+            writes,
+        ),
+        "write.delta_verify": measure(
+            lambda: write_edid_for_connector(
+                "HDMI-A-1", alternate(delta), delta=True
+            ),
+            writes,
+        ),
+        "verify": measure(verify, iterations),
+    }
+
+
+def library_scenarios(bench, size, iterations):
+    from backend.core.edid.compare import find_matching_edid
+    from backend.core.edid.save import save_edid
+    from backend.core.edid.similar import find_similar_edid
+    from backend.core.mounts import mount_monitor
+
+    bench.use_library(size)
+    client = bench.client
+    mount = bench.mount
+    pending = {}
+
+    def next_save(_):
+        pending["edid"] = bench.fresh_edid()
+
+    def stick_batch(_):
+        for _ in range(SYNC_BATCH):
+            bench.next_id += 1
+            bench._stick_write(f"usb_{bench.next_id}.bin", bench.edid(bench.next_id))
+
+    def library_batch(_):
+        from backend.core.edid.library import open_library
+
+        open_library(bench.library_dir).add_many({
+            f"new_{bench.next_id + i}.bin": bench.edid(bench.next_id + i)
+            for i in range(1, SYNC_BATCH + 1)
+        })
+        bench.next_id += SYNC_BATCH
+
+    unknown = bench.fresh_edid()
+    return {
+        "match.exact": measure(
+            lambda: find_matching_edid(bench.known_edid, bench.library_dir),
+            iterations,
+        ),
+        "match.similar": measure(
+            lambda: find_similar_edid(unknown, bench.library_dir, k=5),
+            iterations,
+        ),
+        "match.route": measure(
+            lambda: _ok(client.post("/edid/match", json={"edid_hex": unknown.hex()})),
+            iterations,
+        ),
+        "save": measure(
+            lambda: save_edid(
+                pending["edid"], f"saved_{bench.next_id}", bench.library_dir
+            ),
+            iterations,
+            setup=next_save,
+        ),
+        "files.route": measure(
+            lambda: _ok(client.get("/edid/files")), iterations
+        ),
+        "usb.mounts": measure(
+            lambda: mount_monitor.rescan(publish=False), iterations
+        ),
+        "usb.scan": measure(
+            lambda: _ok(client.get(f"/usb/scan?mount={mount}")), iterations
+        ),
+        "usb.import_dry_run": measure(
+            lambda: _ok(client.post("/usb/import", json={"mount": mount, "dry_run": True})),
+            iterations,
+        ),
+        "usb.import": measure(
+            lambda: _ok(client.post("/usb/import", json={"mount": mount})),
+            iterations,
+            setup=stick_batch,
+        ),
+        "usb.export": measure(
+            lambda: _ok(client.post("/usb/export", json={"mount": mount})),
+            iterations,
+            setup=library_batch,
+        ),
+        "usb.export_bundle": measure(
+            lambda: _ok(client.post(
+                "/usb/export", json={"mount": mount, "format": "bundle"}
+            )),
+            max(3, iterations // 4),
+            setup=library_batch,
+        ),
+    }
+
+
+# ----------------------------
+# Reporting
+# ----------------------------
+
+def _flatten(results):
+    flat = {}
+    for name, stats in results["hardware"].items():
+        flat[f"hardware/{name}"] = stats
+    for size, scenarios in results["library"].items():
+        for name, stats in scenarios.items():
+            flat[f"library-{size}/{name}"] = stats
+    return flat
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Scenarios whose p50 or p90 grew by more than threshold (fraction)
+    and min_delta_ms over the baseline.
+    """
+    current = _flatten(results)
+    previous = _flatten(baseline)
+    regressions = []
+    for key, stats in sorted(current.items()):
+        old = previous.get(key)
+        if not old:
+            continue
+        for metric in ("p50_ms", "p90_ms"):
+            before, after = old[metric], stats[metric]
+            if after > before * (1 + threshold) and after - before > min_delta_ms:
+                regressions.append({
+                    "scenario": key,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": round(after / before - 1, 3) if before else None,
+                })
+    return regressions
+
+
+def print_table(title, scenarios):
+    print(f"\n{title}")
+    print(f"  {'scenario':<22}{'ops/s':>10}{'p50 ms':>10}{'p90 ms':>10}"
+          f"{'p99 ms':>10}{'max ms':>10}{'cold ms':>10}")
+    for name, s in scenarios.items():
+        cold = f"{s['cold_ms']:.3f}" if s["cold_ms"] is not None else "-"
+        print(f"  {name:<22}{s['ops_per_s']:>10}{s['p50_ms']:>10.3f}"
+              f"{s['p90_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}"
+              f"{cold:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated EDID library sizes")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--latency-us", type=float, default=100.0,
+                        help="simulated time per i2c transaction")
+    parser.add_argument("--write-cycle-ms", type=float, default=5.0,
+                        help="simulated EEPROM internal write cycle")
+    parser.add_argument("--backend", choices=("dir", "pack"), default="dir",
+                        help="EDID library storage backend")
+    parser.add_argument("--baseline", help="compare against this result file")
+    parser.add_argument("--save-baseline", help="write results to this file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="ignore slowdowns smaller than this")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = tempfile.mkdtemp(prefix="edid-bench-")
+    try:
+        bench = Bench(
+            workdir,
+            latency=args.latency_us / 1e6,
+            write_cycle=args.write_cycle_ms / 1000,
+            backend=args.backend,
+        )
+        results = {
+            "config": {
+                "sizes": sizes,
+                "iterations": args.iterations,
+                "latency_us": args.latency_us,
+                "write_cycle_ms": args.write_cycle_ms,
+                "backend": args.backend,
+                "python": sys.version.split()[0],
+            },
+            "hardware": hardware_scenarios(bench, args.iterations),
+            "library": {},
+        }
+        for size in sizes:
+            results["library"][str(size)] = library_scenarios(
+                bench, size, args.iterations
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(
+                results, json.load(f), args.threshold, args.min_delta_ms
+            )
+        results["regressions"] = regressions
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        cfg = results["config"]
+        print(f"Simulated i2c: {cfg['latency_us']} us/transaction, "
+              f"{cfg['write_cycle_ms']} ms write cycle; backend {cfg['backend']}")
+        print_table("Hardware", results["hardware"])
+        for size, scenarios in results["library"].items():
+            print_table(f"Library: {size} EDIDs", scenarios)
+
+        for r in regressions:
+            print(f"\n✖ {r['scenario']} {r['metric']}: {r['baseline']} -> "
+                  f"{r['current']} ms (+{r['change'] * 100:.0f}%)")
+        if args.baseline and not regressions:
+            print(f"\n✔ No regressions beyond {args.threshold * 100:.0f}%")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
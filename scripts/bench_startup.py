@@ -0,0 +1,139 @@
+"""
+Cold-start benchmark.
+
+Starts a fresh interpreter several times; each one imports app.py, builds
+the app and serves "/" through the test client. Reports the median time
+to first request, the slowest imports (python -X importtime), and fails
+if the budget is exceeded or a hardware module was loaded at startup.
+
+    python3 scripts/bench_startup.py [--runs 5] [--budget-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous for a Pi 3; tighten once a baseline has been recorded there
+DEFAULT_BUDGET_MS = 1500
+
+CHILD = """
+import json
+import app
+client = app.create_app().test_client()
+client.get("/")
+print(json.dumps(client.get("/system/startup").get_json()))
+"""
+
+
+def _parse_importtime(stderr: str, depth: int = 1):
+    """
+    Cumulative microseconds per import from -X importtime output, for
+    imports nested at most depth levels deep (0 = top level).
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Each nesting level adds two spaces of indentation
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level > depth:
+            continue
+        totals[name.strip()] = int(cumulative)
+    return totals
+
+
+def run_once(importtime: bool = False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", CHILD]
+
+    result = subprocess.run(
+        cmd, cwd=REPO_DIR, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = _parse_importtime(result.stderr) if importtime else {}
+    return report, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(
+        os.environ.get("STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)
+    ))
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of slowest imports to list")
+    parser.add_argument("--json", action="store_true",
+                        help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    reports = [run_once()[0] for _ in range(args.runs)]
+    _, imports = run_once(importtime=True)
+
+    since_start = [
+        r["first_request"]["ms_since_process_start"]
+        or r["first_request"]["ms_since_app_import"]
+        for r in reports
+    ]
+    since_import = [r["first_request"]["ms_since_app_import"] for r in reports]
+    heavy = sorted({m for r in reports for m in r["heavy_modules_loaded"]})
+    median = statistics.median(since_start)
+
+    result = {
+        "runs": args.runs,
+        "budget_ms": args.budget_ms,
+        "first_request_ms": {
+            "median": median,
+            "min": min(since_start),
+            "max": max(since_start),
+        },
+        "app_import_to_first_request_ms": statistics.median(since_import),
+        "blueprints": reports[-1]["imports"],
+        "slowest_imports_ms": [
+            {"module": name, "ms": round(us / 1000, 1)}
+            for name, us in sorted(imports.items(), key=lambda i: -i[1])[:args.top]
+        ],
+        "heavy_modules_loaded": heavy,
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"First request after process start: median {median:.1f} ms "
+              f"(min {min(since_start):.1f}, max {max(since_start):.1f}, "
+              f"{args.runs} runs, budget {args.budget_ms:.0f} ms)")
+        print(f"app import -> first request: {result['app_import_to_first_request_ms']:.1f} ms")
+        print("\nBlueprint imports:")
+        for b in result["blueprints"]:
+            print(f"  {b['ms']:8.1f} ms  {b['module']} (+{b['modules_loaded']} modules)")
+        print("\nSlowest imports:")
+        for i in result["slowest_imports_ms"]:
+            print(f"  {i['ms']:8.1f} ms  {i['module']}")
+
+    failed = False
+    if median > args.budget_ms:
+        print(f"\n✖ Cold start over budget: {median:.1f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    if heavy:
+        print(f"\n✖ Loaded at startup (should be lazy): {', '.join(heavy)}")
+        failed = True
+    if not failed and not args.json:
+        print("\n✔ Within cold-start budget")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
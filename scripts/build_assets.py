@@ -0,0 +1,28 @@
+"""
+Fingerprint and precompress frontend/static into frontend/static/dist.
+Run after every install or update; the app picks up the new manifest on
+its next start.
+
+    python3 scripts/build_assets.py
+"""
+
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from backend.core.assets import DIST_DIRNAME, brotli, build_assets
+
+STATIC_DIR = os.path.join(REPO_DIR, "frontend", "static")
+
+
+def main():
+    manifest = build_assets(STATIC_DIR)
+    print(f"✔ {len(manifest)} assets written to {os.path.join(STATIC_DIR, DIST_DIRNAME)}")
+    if brotli is None:
+        print("  (brotli module not installed: gzip variants only)")
+
+
+if __name__ == "__main__":
+    main()
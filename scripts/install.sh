@@ -124,6 +124,8 @@ fi
 sudo apt install -y \
   python3 python3-venv python3-pip \
   python3-smbus i2c-tools \
+  python3-gi gir1.2-gstreamer-1.0 gstreamer1.0-tools python3-kms++ \
+  gstreamer1.0-plugins-base gstreamer1.0-plugins-bad \
   "${CHROMIUM_PKG}" \
   dbus-user-session \
   x11-utils \
@@ -153,6 +155,9 @@ fi
 # Ensure smbus support exists in venv
 run_as_target_user "${VENV_DIR}/bin/pip" install smbus2
 
+log "Building fingerprinted static assets..."
+run_as_target_user "${VENV_DIR}/bin/python" "${APP_DIR}/scripts/build_assets.py"
+
 log "Writing kiosk start script..."
 
 mkdir -p "$(dirname "${START_SCRIPT}")"
@@ -194,7 +199,12 @@ if [[ -f "$VENV_DIR/bin/activate" ]]; then
 fi
 
 pkill -u "$USER" -f "python3 app.py" || true
-python3 app.py &
+pkill -u "$USER" -f "gunicorn -c gunicorn.conf.py" || true
+if command -v gunicorn >/dev/null 2>&1; then
+    gunicorn -c gunicorn.conf.py wsgi:app &
+else
+    python3 app.py &
+fi
 BACKEND_PID=$!
 
 # Wait for backend
@@ -0,0 +1,244 @@
+"""
+Simulated hardware for running the EDID code path without a Pi.
+
+- SimulatedEEPROM: a 24C02-style EDID EEPROM at 0x50 with page writes,
+  a write cycle during which it NAKs, and a fixed latency per i2c
+  transaction.
+- install_simulated_bus(): registers the simulated buses as the "smbus"
+  module and as the i2c-dev combined-read path. Must run before any
+  backend.core.edid module that uses SMBus is imported.
+- build_drm_tree() / build_usb_mount(): fake /sys/class/drm connectors
+  (status, edid, connector_id, ddc link) and a fake removable mount with
+  its mountinfo line and /sys/dev/block entry.
+- make_edid(): distinct, valid EDIDs derived from a template.
+
+Used by scripts/bench_edid.py.
+"""
+
+import errno
+import os
+import sys
+import threading
+import time
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_EDID = os.path.join(REPO_DIR, "edid_files", "HDMI_EDID_Emulator.bin")
+
+EDID_I2C_ADDR = 0x50
+EEPROM_SIZE = 256
+EEPROM_PAGE_SIZE = 8
+SMBUS_BLOCK_MAX = 32
+
+
+def _nak():
+    return OSError(errno.EREMOTEIO, "Remote I/O error (simulated NAK)")
+
+
+class SimulatedEEPROM:
+    """
+    In-memory EEPROM. Every transaction costs latency seconds; a write
+    starts an internal cycle of write_cycle seconds during which the
+    device does not acknowledge its address.
+    """
+
+    def __init__(self, data: bytes = b"", latency: float = 0.0,
+                 write_cycle: float = 0.005, page_size: int = EEPROM_PAGE_SIZE):
+        self.memory = bytearray(EEPROM_SIZE)
+        self.memory[:len(data)] = data[:EEPROM_SIZE]
+        self.latency = latency
+        self.write_cycle = write_cycle
+        self.page_size = page_size
+        self.pointer = 0
+        self.transactions = 0
+        self._busy_until = 0.0
+        self._lock = threading.Lock()
+
+    def _transaction(self, addr: int):
+        self.transactions += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if addr != EDID_I2C_ADDR or time.monotonic() < self._busy_until:
+            raise _nak()
+
+    def read(self, addr: int, offset: int, length: int) -> bytes:
+        with self._lock:
+            self._transaction(addr)
+            out = bytes(
+                self.memory[(offset + i) % EEPROM_SIZE] for i in range(length)
+            )
+            self.pointer = (offset + length) % EEPROM_SIZE
+            return out
+
+    def read_current(self, addr: int) -> int:
+        with self._lock:
+            self._transaction(addr)
+            value = self.memory[self.pointer]
+            self.pointer = (self.pointer + 1) % EEPROM_SIZE
+            return value
+
+    def write(self, addr: int, offset: int, data):
+        with self._lock:
+            self._transaction(addr)
+            # Page writes wrap within the page, as on real parts
+            page = offset - offset % self.page_size
+            for i, value in enumerate(data):
+                pos = page + (offset - page + i) % self.page_size
+                self.memory[pos] = value
+            self.pointer = offset
+            self._busy_until = time.monotonic() + self.write_cycle
+
+
+# bus number -> SimulatedEEPROM
+buses = {}
+
+
+class SimulatedSMBus:
+    """
+    The subset of smbus.SMBus used by backend.core.edid.
+    """
+
+    def __init__(self, bus: int):
+        if bus not in buses:
+            raise FileNotFoundError(errno.ENOENT, f"/dev/i2c-{bus}")
+        self._dev = buses[bus]
+
+    def close(self):
+        pass
+
+    def read_byte(self, addr):
+        return self._dev.read_current(addr)
+
+    def read_byte_data(self, addr, offset):
+        return self._dev.read(addr, offset, 1)[0]
+
+    def read_i2c_block_data(self, addr, offset, length=SMBUS_BLOCK_MAX):
+        return list(self._dev.read(addr, offset, min(length, SMBUS_BLOCK_MAX)))
+
+    def write_byte_data(self, addr, offset, value):
+        self._dev.write(addr, offset, [value])
+
+    def write_i2c_block_data(self, addr, offset, data):
+        self._dev.write(addr, offset, list(data)[:SMBUS_BLOCK_MAX])
+
+
+def _read_rdwr(bus: int, segment: int, offset: int, length: int) -> bytes:
+    """
+    Simulated I2C_RDWR combined read: one transaction.
+    """
+    if bus not in buses:
+        raise FileNotFoundError(errno.ENOENT, f"/dev/i2c-{bus}")
+    if segment:
+        raise _nak()  # single-segment part
+    return buses[bus].read(EDID_I2C_ADDR, offset, length)
+
+
+def install_simulated_bus():
+    """
+    Route SMBus and i2c-dev access in backend.core.edid to the simulated
+    buses.
+    """
+    module = types.ModuleType("smbus")
+    module.SMBus = SimulatedSMBus
+    sys.modules["smbus"] = module
+
+    from backend.core.edid import i2c
+
+    i2c._read_rdwr = _read_rdwr
+    i2c._bus_methods.clear()
+
+
+# ----------------------------
+# EDIDs
+# ----------------------------
+
+def _fix_checksums(edid: bytearray):
+    for block in range(len(edid) // 128):
+        end = block * 128 + 127
+        edid[end] = (-sum(edid[block * 128:end])) & 0xFF
+
+
+def make_edid(i: int, template: bytes = None) -> bytes:
+    """
+    A valid EDID unique to i: product code, serial, monitor name and the
+    first detailed timing's pixel clock vary.
+    """
+    if template is None:
+        with open(TEMPLATE_EDID, "rb") as f:
+            template = f.read()
+
+    edid = bytearray(template)
+    edid[10:12] = (i & 0xFFFF).to_bytes(2, "little")
+    edid[12:16] = (i & 0xFFFFFFFF).to_bytes(4, "little")
+
+    clock = int.from_bytes(edid[54:56], "little") + i % 7
+    edid[54:56] = clock.to_bytes(2, "little")
+
+    # Monitor name descriptor (tag 0xFC) if the template has one
+    for pos in (72, 90, 108):
+        if edid[pos:pos + 5] == b"\x00\x00\x00\xfc\x00":
+            name = f"SIM{i:06d}"[:13].encode() + b"\n"
+            edid[pos + 5:pos + 18] = name.ljust(13, b" ")
+            break
+
+    _fix_checksums(edid)
+    return bytes(edid)
+
+
+# ----------------------------
+# Filesystem fixtures
+# ----------------------------
+
+def build_drm_tree(root: str, connectors):
+    """
+    Create cardN-<name> connector directories under root.
+
+    connectors: iterable of (name, connector_id, connected, edid, ddc_bus).
+    """
+    os.makedirs(root, exist_ok=True)
+    for name, connector_id, connected, edid, ddc_bus in connectors:
+        card = os.path.join(root, f"card0-{name}")
+        os.makedirs(card, exist_ok=True)
+        with open(os.path.join(card, "status"), "w") as f:
+            f.write("connected\n" if connected else "disconnected\n")
+        with open(os.path.join(card, "connector_id"), "w") as f:
+            f.write(f"{connector_id}\n")
+        with open(os.path.join(card, "edid"), "wb") as f:
+            f.write(edid if connected else b"")
+        if ddc_bus is not None:
+            link = os.path.join(card, "ddc")
+            if not os.path.islink(link):
+                os.symlink(f"../../i2c-{ddc_bus}", link)
+    return root
+
+
+def build_usb_mount(root: str, device: str = "8:1"):
+    """
+    A fake removable mount: returns (mount_point, mountinfo_path,
+    sys_dev_block_path) for backend.core.mounts.
+    """
+    mount_point = os.path.join(root, "media", "SIMUSB")
+    os.makedirs(mount_point, exist_ok=True)
+
+    block = os.path.join(root, "sys", "dev", "block")
+    disk = os.path.join(root, "sys", "devices", "usb1", "1-1", "block", "sda")
+    part = os.path.join(disk, "sda1")
+    os.makedirs(part, exist_ok=True)
+    os.makedirs(block, exist_ok=True)
+    with open(os.path.join(disk, "removable"), "w") as f:
+        f.write("1\n")
+    with open(os.path.join(part, "partition"), "w") as f:
+        f.write("1\n")
+    link = os.path.join(block, device)
+    if not os.path.islink(link):
+        os.symlink(part, link)
+
+    mountinfo = os.path.join(root, "mountinfo")
+    with open(mountinfo, "w") as f:
+        f.write("22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/root rw\n")
+        f.write(
+            f"90 22 {device} / {mount_point} rw,nosuid,nodev,relatime "
+            f"shared:50 - vfat /dev/sda1 rw,fmask=0022\n"
+        )
+
+    return mount_point, mountinfo, block
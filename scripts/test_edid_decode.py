@@ -0,0 +1,40 @@
+"""
+POST /edid/decode check without hardware: decodes every library EDID
+through the route and checks for a 200 with decoded fields.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app
+
+EDID_DIR = os.path.join(ROOT, "edid_files")
+
+
+def main():
+    client = create_app().test_client()
+
+    files = sorted(f for f in os.listdir(EDID_DIR) if f.lower().endswith(".bin"))
+    if not files:
+        print("✖ No library EDIDs in", EDID_DIR)
+        return 1
+
+    failed = False
+    for filename in files:
+        with open(os.path.join(EDID_DIR, filename), "rb") as f:
+            edid_hex = f.read().hex()
+        resp = client.post("/edid/decode", json={"edid_hex": edid_hex})
+        body = resp.get_json() or {}
+        ok = resp.status_code == 200 and bool(body.get("fields"))
+        failed |= not ok
+        detail = "fields ok" if ok else body.get("error", "no fields")
+        print(f"{'✔' if ok else '✖'} {filename}: {resp.status_code}, {detail}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ from backend.core.edid import (
     edid_to_hex,
     edid_hash,
     diff_edid,
+    format_diff,
     EDIDError,
 )
 
@@ -44,11 +45,11 @@ def main():
 
         banner("SELF DIFF TEST")
         diff = diff_edid(edid, edid)
-        print("✔ Diff empty" if not diff else diff)
+        print("✔ Diff empty" if diff["identical"] else format_diff(diff))
 
 
         diff = diff_edid(edid, edid)
-        print("✔ Diff empty" if not diff else diff)
+        print("✔ Diff empty" if diff["identical"] else format_diff(diff))
 
         banner("ALL TESTS PASSED")
         return 0
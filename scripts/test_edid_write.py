@@ -4,7 +4,7 @@ import sys
 from pathlib import Path
 
 from backend.core.edid.checksum import validate_edid
-from backend.core.edid.diff import diff_edid
+from backend.core.edid.diff import diff_edid, format_diff
 from backend.core.edid.write import write_edid_i2c
 from backend.core.edid.i2c import read_edid_i2c
 from backend.core.edid.exceptions import EDIDWriteError
@@ -58,10 +58,9 @@ def main():
         banner("VERIFY WRITTEN EDID (I2C)")
 
         diff = diff_edid(edid, rb_edid)
-        if diff:
+        if not diff["identical"]:
             print("❌ I2C EDID mismatch detected:")
-            for line in diff:
-                print(line)
+            print(format_diff(diff))
             sys.exit(1)
 
         print("✔ I2C EDID verified successfully")
@@ -0,0 +1,49 @@
+"""
+Static scanout check without a display: shows solid colours through the
+offscreen backend, checks the committed pixels and that nothing runs
+while a colour is on screen.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PATTERN_STATIC_SCANOUT", "offscreen")
+
+from backend.core.pattern.worker import PatternWorker
+
+CONNECTOR_ID = 1
+IDLE_SECONDS = 2.0
+# CPU time allowed while idling (scheduler noise)
+IDLE_CPU_BUDGET = 0.02
+
+
+def main():
+    worker = PatternWorker()
+    print("Modes:", worker.output_modes())
+
+    failed = False
+    for color in ("#ff0000", "#00ff00", "#0000ff", "#ffffff"):
+        worker.start_solid_color(CONNECTOR_ID, color)
+        scanout = worker._scanouts[CONNECTOR_ID]
+        expected = 0xFF000000 | int(color[1:], 16)
+        ok = bool((scanout.frame == expected).all())
+        failed |= not ok
+        print(f"{'✔' if ok else '✖'} {color}: {scanout.size[0]}x{scanout.size[1]}, "
+              f"{scanout.commits} commits")
+
+    cpu = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    cpu = time.process_time() - cpu
+    ok = cpu <= IDLE_CPU_BUDGET
+    failed |= not ok
+    print(f"{'✔' if ok else '✖'} CPU while showing a colour for {IDLE_SECONDS:.0f} s: "
+          f"{cpu * 1000:.1f} ms")
+
+    worker.stop()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())